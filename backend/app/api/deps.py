@@ -0,0 +1,15 @@
+"""
+Shared service instances for the API routes
+"""
+from app.services.sheets_service import SheetsService
+
+# Lazy initialization: authenticating and opening the spreadsheet costs several
+# Google round-trips, so one client is shared across requests and routers
+_sheets_service = None
+
+
+def get_sheets_service():
+    global _sheets_service
+    if _sheets_service is None:
+        _sheets_service = SheetsService()
+    return _sheets_service
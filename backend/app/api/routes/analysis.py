@@ -1,12 +1,16 @@
 """
 Analysis endpoints for trends, forecasts, and insights
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from functools import lru_cache
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from typing import Optional, Tuple
 
 from app.models.analysis import TrendData, ForecastData, CategoryAnalysis, BudgetStatus
 from app.services.analysis_service import AnalysisService
+from app.api.deps import get_sheets_service
 from app.services.sheets_service import SheetsService
+from app.utils.http_cache import build_etag, not_modified
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
@@ -21,8 +25,18 @@ def get_analysis_service():
     return _analysis_service
 
 
-@router.get("/trends", response_model=TrendData)
+@lru_cache(maxsize=256)
+def _parse_categories(categories: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a comma-separated category filter into a tuple (cached per distinct string)"""
+    if not categories:
+        return None
+    return tuple(c.strip() for c in categories.split(',') if c.strip()) or None
+
+
+@router.get("/trends", response_model=TrendData, response_class=ORJSONResponse)
 async def get_trends(
+    request: Request,
+    response: Response,
     period: str = Query("monthly", regex="^(monthly|weekly)$"),
     date_filter: Optional[str] = Query(None, regex="^(all|this_month|last_month|last_7|last_30|last_90|this_year|custom)$"),
     start_date: Optional[str] = Query(None),
@@ -40,17 +54,18 @@ async def get_trends(
     Returns:
         TrendData with time series by category
     """
-    try:
-        analysis = get_analysis_service()
-        trends = analysis.get_trends(
-            period=period,
-            date_filter=date_filter,
-            start_date=start_date,
-            end_date=end_date
-        )
-        return trends
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calculating trends: {str(e)}")
+    unchanged = not_modified(request, response, build_etag(SheetsService.get_revision_id()))
+    if unchanged:
+        return unchanged
+
+    analysis = get_analysis_service()
+    trends = analysis.get_trends(
+        period=period,
+        date_filter=date_filter,
+        start_date=start_date,
+        end_date=end_date
+    )
+    return trends
 
 
 @router.get("/forecast", response_model=ForecastData)
@@ -61,15 +76,12 @@ async def get_forecast():
     Returns:
         ForecastData with projected spending by category
     """
-    try:
-        analysis = get_analysis_service()
-        forecast = analysis.get_forecast()
-        return forecast
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calculating forecast: {str(e)}")
+    analysis = get_analysis_service()
+    forecast = analysis.get_forecast()
+    return forecast
 
 
-@router.get("/categorization", response_model=CategoryAnalysis)
+@router.get("/categorization", response_model=CategoryAnalysis, response_class=ORJSONResponse)
 async def get_categorization(
     period: Optional[str] = Query(None, regex="^(all|this_month|last_month|last_7|last_30|last_90|this_year|custom)$"),
     start_date: Optional[str] = Query(None),
@@ -92,27 +104,16 @@ async def get_categorization(
     Returns:
         CategoryAnalysis with spending by category
     """
-    try:
-        analysis = get_analysis_service()
-
-        # Parse categories if provided
-        category_list = None
-        if categories:
-            category_list = [c.strip() for c in categories.split(',') if c.strip()]
-
-        result = analysis.get_category_analysis(
-            period=period or "all",
-            start_date=start_date,
-            end_date=end_date,
-            categories=category_list,
-            min_amount=min_amount,
-            max_amount=max_amount,
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error analyzing categories: {str(e)}"
-        )
+    analysis = get_analysis_service()
+    result = analysis.get_category_analysis(
+        period=period or "all",
+        start_date=start_date,
+        end_date=end_date,
+        categories=_parse_categories(categories),
+        min_amount=min_amount,
+        max_amount=max_amount,
+    )
+    return result
 
 
 @router.get("/budget-status", response_model=BudgetStatus)
@@ -123,14 +124,9 @@ async def get_budget_status():
     Returns:
         BudgetStatus with current vs budget spending
     """
-    try:
-        analysis = get_analysis_service()
-        status = analysis.get_budget_status()
-        return status
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error calculating budget status: {str(e)}"
-        )
+    analysis = get_analysis_service()
+    status = analysis.get_budget_status()
+    return status
 
 
 @router.get("/sheets-url")
@@ -141,14 +137,9 @@ async def get_sheets_url():
     Returns:
         Dictionary with spreadsheet URL
     """
-    try:
-        sheets_service = SheetsService()
-        url = sheets_service.get_spreadsheet_url()
-        if url:
-            return {"url": url}
-        else:
-            raise HTTPException(status_code=404, detail="Spreadsheet URL not available")
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error getting spreadsheet URL: {str(e)}"
-        )
+    sheets_service = get_sheets_service()
+    url = sheets_service.get_spreadsheet_url()
+    if url:
+        return {"url": url}
+    else:
+        raise HTTPException(status_code=404, detail="Spreadsheet URL not available")
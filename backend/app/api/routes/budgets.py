@@ -1,201 +1,200 @@
 """
 Budget and Goals CRUD endpoints
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from typing import List
 
 from app.models.analysis import Budget, Goal, Category, GoalTransaction
+from app.api.deps import get_sheets_service
 from app.services.sheets_service import SheetsService
+from app.utils.ttl_cache import TTLCache
+from app.utils.http_cache import build_etag, not_modified
 
 router = APIRouter(prefix="/budgets", tags=["budgets"])
 
-# Lazy initialization
-_sheets_service = None
+# Short-lived cache for GET reads, keyed by (name, data revision). Every write through
+# SheetsService (including receipt saves and /sheets edits) bumps the revision.
+_cache = TTLCache(ttl=30, maxsize=16)
 
-
-def get_sheets_service():
-    global _sheets_service
-    if _sheets_service is None:
-        _sheets_service = SheetsService()
-    return _sheets_service
+# Fallback categories when the Categories sheet can't be read (built once at import)
+DEFAULT_CATEGORIES: tuple[Category, ...] = (
+    Category(id="1", name="Groceries", icon="🛒", color="#10b981", is_default=True),
+    Category(id="2", name="Dining", icon="🍽️", color="#f59e0b", is_default=True),
+    Category(id="3", name="Transport", icon="🚗", color="#3b82f6", is_default=True),
+    Category(id="4", name="Utilities", icon="💡", color="#8b5cf6", is_default=True),
+    Category(id="5", name="Entertainment", icon="🎬", color="#ec4899", is_default=True),
+    Category(id="6", name="Shopping", icon="🛍️", color="#06b6d4", is_default=True),
+    Category(id="7", name="Health", icon="⚕️", color="#ef4444", is_default=True),
+    Category(id="8", name="Other", icon="📦", color="#6b7280", is_default=True),
+)
 
 
 # Budget endpoints
 @router.post("", response_model=dict)
 async def create_budget(budget: Budget):
     """Create a new budget"""
-    try:
-        sheets = get_sheets_service()
-        success = sheets.save_budget(budget)
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to save budget")
-        return {"success": True, "message": "Budget created successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating budget: {str(e)}")
+    sheets = get_sheets_service()
+    success = await asyncio.to_thread(sheets.save_budget, budget)
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to save budget")
+    return {"success": True, "message": "Budget created successfully"}
 
 
-@router.get("", response_model=List[Budget])
-async def get_budgets():
+@router.get("", response_model=List[Budget], response_class=ORJSONResponse)
+async def get_budgets(request: Request, response: Response):
     """Get all budgets"""
-    try:
-        sheets = get_sheets_service()
-        budget_data = sheets.get_all_budgets()
-        budgets = [
-            Budget(
-                id=b.get("ID"),
-                category=b.get("Category"),
-                limit=float(b.get("Limit", 0)),
-                period=b.get("Period", "monthly"),
-            )
-            for b in budget_data
-        ]
-        return budgets
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching budgets: {str(e)}")
+    # The ETag and cached payload share one revision read, so the tag always matches the body
+    revision = SheetsService.get_revision_id()
+    unchanged = not_modified(request, response, build_etag(revision))
+    if unchanged:
+        return unchanged
+
+    cache_key = ("budgets", revision)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    sheets = get_sheets_service()
+    budget_data = await asyncio.to_thread(sheets.get_all_budgets)
+    # Rows come from our own writes, so skip Pydantic validation
+    budgets = [
+        Budget.model_construct(
+            id=b.get("ID"),
+            category=b.get("Category"),
+            limit=float(b.get("Limit", 0)),
+            period=b.get("Period", "monthly"),
+        )
+        for b in budget_data
+    ]
+    _cache.set(cache_key, budgets)
+    return budgets
 
 
 @router.put("/{budget_id}", response_model=dict)
 async def update_budget(budget_id: str, budget: Budget):
     """Update an existing budget"""
-    try:
-        budget.id = budget_id
-        sheets = get_sheets_service()
-        success = sheets.save_budget(budget)
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to update budget")
-        return {"success": True, "message": "Budget updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error updating budget: {str(e)}")
+    budget.id = budget_id
+    sheets = get_sheets_service()
+    success = await asyncio.to_thread(sheets.save_budget, budget)
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to update budget")
+    return {"success": True, "message": "Budget updated successfully"}
 
 
 @router.delete("/{budget_id}", response_model=dict)
 async def delete_budget(budget_id: str):
     """Delete a budget"""
-    try:
-        sheets = get_sheets_service()
-        success = sheets.delete_budget(budget_id)
-        if not success:
-            raise HTTPException(status_code=404, detail="Budget not found")
-        return {"success": True, "message": "Budget deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deleting budget: {str(e)}")
+    sheets = get_sheets_service()
+    success = await asyncio.to_thread(sheets.delete_budget, budget_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    return {"success": True, "message": "Budget deleted successfully"}
 
 
 # Goal endpoints
 @router.post("/goals", response_model=dict)
 async def create_goal(goal: Goal):
     """Create a new goal"""
-    try:
-        sheets = get_sheets_service()
-        success = sheets.save_goal(goal)
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to save goal")
-        return {"success": True, "message": "Goal created successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating goal: {str(e)}")
+    sheets = get_sheets_service()
+    success = await asyncio.to_thread(sheets.save_goal, goal)
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to save goal")
+    return {"success": True, "message": "Goal created successfully"}
 
 
-@router.get("/goals", response_model=List[Goal])
-async def get_goals():
+@router.get("/goals", response_model=List[Goal], response_class=ORJSONResponse)
+async def get_goals(request: Request, response: Response):
     """Get all goals with auto-calculated progress"""
-    try:
-        sheets = get_sheets_service()
-        goal_data = sheets.get_all_goals()
-        goals = []
-        for g in goal_data:
-            target_amount = float(g.get("Target Amount", 0))
-            goal_type = g.get("Goal Type", "savings")
-            auto_track = g.get("Auto Track", "False") == "True"
-
-            # Create goal object
-            goal = Goal(
-                id=g.get("ID"),
-                name=g.get("Name"),
-                target_amount=target_amount,
-                current_amount=float(g.get("Current Amount", 0)),
-                target_date=g.get("Target Date"),
-                category=g.get("Category") or None,
-                progress_percentage=0,  # Will calculate below
-                goal_type=goal_type,
-                auto_track=auto_track,
-            )
+    revision = SheetsService.get_revision_id()
+    unchanged = not_modified(request, response, build_etag(revision))
+    if unchanged:
+        return unchanged
+
+    cache_key = ("goals", revision)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    sheets = get_sheets_service()
+    goal_data = await asyncio.to_thread(sheets.get_all_goals)
+    goals = [
+        Goal.model_construct(
+            id=g.get("ID"),
+            name=g.get("Name"),
+            target_amount=float(g.get("Target Amount", 0)),
+            current_amount=float(g.get("Current Amount", 0)),
+            target_date=g.get("Target Date"),
+            category=g.get("Category") or None,
+            progress_percentage=0,  # Will calculate below
+            goal_type=g.get("Goal Type", "savings"),
+            auto_track=g.get("Auto Track", "False") == "True",
+        )
+        for g in goal_data
+    ]
 
-            # Auto-calculate current amount if enabled
-            if auto_track:
-                goal.current_amount = sheets.calculate_goal_progress(goal)
+    # Auto-calculate current amounts from one batched read shared by all goals
+    progress = await asyncio.to_thread(sheets.get_all_goal_progress, goals)
+    for goal in goals:
+        if goal.id in progress:
+            goal.current_amount = progress[goal.id]
 
-            # Calculate progress percentage
-            goal.progress_percentage = (
-                (goal.current_amount / target_amount * 100) if target_amount > 0 else 0
-            )
+    # Calculate progress percentage
+    for goal in goals:
+        goal.progress_percentage = (
+            (goal.current_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
+        )
 
-            goals.append(goal)
-        return goals
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching goals: {str(e)}")
+    _cache.set(cache_key, goals)
+    return goals
 
 
 @router.put("/goals/{goal_id}", response_model=dict)
 async def update_goal(goal_id: str, goal: Goal):
     """Update an existing goal"""
-    try:
-        goal.id = goal_id
-        sheets = get_sheets_service()
-        success = sheets.save_goal(goal)
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to update goal")
-        return {"success": True, "message": "Goal updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error updating goal: {str(e)}")
+    goal.id = goal_id
+    sheets = get_sheets_service()
+    success = await asyncio.to_thread(sheets.save_goal, goal)
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to update goal")
+    return {"success": True, "message": "Goal updated successfully"}
 
 
 @router.delete("/goals/{goal_id}", response_model=dict)
 async def delete_goal(goal_id: str):
     """Delete a goal"""
-    try:
-        sheets = get_sheets_service()
-        success = sheets.delete_goal(goal_id)
-        if not success:
-            raise HTTPException(status_code=404, detail="Goal not found")
-        return {"success": True, "message": "Goal deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deleting goal: {str(e)}")
+    sheets = get_sheets_service()
+    success = await asyncio.to_thread(sheets.delete_goal, goal_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    return {"success": True, "message": "Goal deleted successfully"}
 
 
 # Category endpoints
 @router.post("/categories", response_model=dict)
 async def create_category(category: Category):
     """Create a new custom category"""
-    try:
-        sheets = get_sheets_service()
-        success = sheets.save_category(category)
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to save category")
-        return {"success": True, "message": "Category created successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating category: {str(e)}")
+    sheets = get_sheets_service()
+    success = await asyncio.to_thread(sheets.save_category, category)
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to save category")
+    return {"success": True, "message": "Category created successfully"}
 
 
-@router.get("/categories", response_model=List[Category])
+@router.get("/categories", response_model=List[Category], response_class=ORJSONResponse)
 async def get_categories():
     """Get all categories"""
-    # Default categories
-    default_categories = [
-        Category(id="1", name="Groceries", icon="🛒", color="#10b981", is_default=True),
-        Category(id="2", name="Dining", icon="🍽️", color="#f59e0b", is_default=True),
-        Category(id="3", name="Transport", icon="🚗", color="#3b82f6", is_default=True),
-        Category(id="4", name="Utilities", icon="💡", color="#8b5cf6", is_default=True),
-        Category(id="5", name="Entertainment", icon="🎬", color="#ec4899", is_default=True),
-        Category(id="6", name="Shopping", icon="🛍️", color="#06b6d4", is_default=True),
-        Category(id="7", name="Health", icon="⚕️", color="#ef4444", is_default=True),
-        Category(id="8", name="Other", icon="📦", color="#6b7280", is_default=True),
-    ]
+    cache_key = ("categories", SheetsService.get_revision_id())
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
         sheets = get_sheets_service()
-        category_data = sheets.get_all_categories()
+        category_data = await asyncio.to_thread(sheets.get_all_categories)
         categories = [
-            Category(
+            Category.model_construct(
                 id=c.get("ID"),
                 name=c.get("Name"),
                 icon=c.get("Icon", "📦"),
@@ -204,81 +203,79 @@ async def get_categories():
             )
             for c in category_data
         ]
+        _cache.set(cache_key, categories)
         return categories
     except Exception as e:
         print(f"Warning: Could not fetch categories from sheets: {e}")
         # Return default categories instead of failing
-        return default_categories
+        return list(DEFAULT_CATEGORIES)
 
 
 # Goal Transaction endpoints
 @router.post("/goals/{goal_id}/transactions", response_model=dict)
 async def add_goal_transaction(goal_id: str, transaction: GoalTransaction):
     """Add a manual transaction to a savings goal"""
-    try:
-        transaction.goal_id = goal_id
-        sheets = get_sheets_service()
-        success = sheets.save_goal_transaction(transaction)
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to save transaction")
-        return {"success": True, "message": "Transaction added successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error adding transaction: {str(e)}")
+    transaction.goal_id = goal_id
+    sheets = get_sheets_service()
+    success = await asyncio.to_thread(sheets.save_goal_transaction, transaction)
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to save transaction")
+    return {"success": True, "message": "Transaction added successfully"}
 
 
 @router.get("/goals/{goal_id}/transactions", response_model=List[dict])
-async def get_goal_transactions(goal_id: str):
-    """Get transaction history for a specific goal"""
-    try:
-        sheets = get_sheets_service()
-        transactions = sheets.get_goal_transactions(goal_id)
-        return transactions
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching transactions: {str(e)}")
+async def get_goal_transactions(
+    goal_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Get transaction history for a specific goal
+
+    Args:
+        goal_id: ID of the goal
+        limit: Maximum number of transactions to return
+        offset: Number of transactions to skip
+    """
+    sheets = get_sheets_service()
+    transactions = await asyncio.to_thread(sheets.get_goal_transactions, goal_id, limit, offset)
+    return transactions
 
 
 @router.put("/goals/{goal_id}/recalculate", response_model=dict)
 async def recalculate_goal_progress(goal_id: str):
     """Force recalculation of goal progress"""
-    try:
-        sheets = get_sheets_service()
-        # Get the goal
-        goal_data = sheets.get_all_goals()
-        goal_row = next((g for g in goal_data if g.get("ID") == goal_id), None)
-
-        if not goal_row:
-            raise HTTPException(status_code=404, detail="Goal not found")
-
-        # Create goal object
-        goal = Goal(
-            id=goal_row.get("ID"),
-            name=goal_row.get("Name"),
-            target_amount=float(goal_row.get("Target Amount", 0)),
-            current_amount=float(goal_row.get("Current Amount", 0)),
-            target_date=goal_row.get("Target Date"),
-            category=goal_row.get("Category") or None,
-            progress_percentage=0,
-            goal_type=goal_row.get("Goal Type", "savings"),
-            auto_track=goal_row.get("Auto Track", "False") == "True",
-        )
-
-        # Recalculate
-        new_amount = sheets.calculate_goal_progress(goal)
-        goal.current_amount = new_amount
-        goal.progress_percentage = (
-            (new_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
-        )
-
-        # Save updated goal
-        sheets.save_goal(goal)
-
-        return {
-            "success": True,
-            "message": "Goal progress recalculated",
-            "current_amount": new_amount,
-            "progress_percentage": goal.progress_percentage,
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error recalculating progress: {str(e)}")
+    sheets = get_sheets_service()
+    # Get the goal
+    goal_row = await asyncio.to_thread(sheets.get_goal_by_id, goal_id)
+
+    if not goal_row:
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+    # Create goal object
+    goal = Goal(
+        id=goal_row.get("ID"),
+        name=goal_row.get("Name"),
+        target_amount=float(goal_row.get("Target Amount", 0)),
+        current_amount=float(goal_row.get("Current Amount", 0)),
+        target_date=goal_row.get("Target Date"),
+        category=goal_row.get("Category") or None,
+        progress_percentage=0,
+        goal_type=goal_row.get("Goal Type", "savings"),
+        auto_track=goal_row.get("Auto Track", "False") == "True",
+    )
+
+    # Recalculate and write back the new amount
+    new_amount = await asyncio.to_thread(sheets.recalculate_and_save, goal)
+    if new_amount is None:
+        raise HTTPException(status_code=500, detail="Failed to save goal progress")
+    goal.progress_percentage = (
+        (new_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
+    )
+
+    return {
+        "success": True,
+        "message": "Goal progress recalculated",
+        "current_amount": new_amount,
+        "progress_percentage": goal.progress_percentage,
+    }
@@ -2,10 +2,15 @@
 Receipt endpoints for upload, extraction, and confirmation
 """
 import os
+import time
 import uuid
-import glob
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Query, Depends
-from fastapi.responses import JSONResponse, FileResponse
+import hashlib
+import logging
+import asyncio
+import aiofiles
+import aiofiles.os
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Query, Depends, Request
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 
 from app.models.receipt import (
@@ -16,26 +21,63 @@ from app.models.receipt import (
 )
 from app.models.upload_job import UploadJobResponse, UploadStatus
 from app.services.gemini_service import GeminiService
-from app.services.sheets_service import SheetsService
+from app.api.deps import get_sheets_service
+from app.services.sheets_write_queue import SheetsWriteQueue
 from app.services.analysis_service import AnalysisService
 from app.services.upload_service import upload_service
-from app.services.supabase_service import SupabaseService
+from app.services.extraction_cache import extraction_cache, combine_digests, HASH_CHUNK_SIZE
+from app.services.supabase_service import get_supabase_service
 from app.core.config import get_settings
 from app.core.auth import get_current_user_optional
+from app.utils.ttl_cache import TTLCache
+from app.utils.http_cache import cached_file_response
+from app.utils.receipt_files import build_receipt_file_index, get_media_type
 from typing import Optional as TypingOptional
 
 router = APIRouter(prefix="/receipts", tags=["receipts"])
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 # Ensure upload directory exists
 os.makedirs(settings.upload_dir, exist_ok=True)
 
-# In-memory storage for receipts (replace with database in production)
-receipts_storage = {}
+
+# Uploaded file paths per receipt ID, so image lookups never scan the upload directory.
+# Built once at startup and kept current by the upload/confirm/delete handlers.
+receipt_files: dict[str, list[str]] = build_receipt_file_index(settings.upload_dir)
+
+
+def discard_pending_files(receipt_id: str, receipt_data: dict) -> None:
+    """Delete the uploads of a pending receipt dropped from storage unconfirmed"""
+    paths = set(receipt_files.pop(receipt_id, ()))
+    file_path = receipt_data.get("file_path")
+    if file_path:
+        paths.update(file_path if isinstance(file_path, list) else [file_path])
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# In-memory storage for unconfirmed receipts (replace with database in production).
+# Bounded and expiring so abandoned uploads don't accumulate forever; their files
+# are deleted when they're dropped.
+PENDING_RECEIPT_TTL = 60 * 60  # 1 hour
+PENDING_RECEIPT_MAX = 1000
+receipts_storage = TTLCache(ttl=PENDING_RECEIPT_TTL, maxsize=PENDING_RECEIPT_MAX, on_evict=discard_pending_files)
+
+# Response for uploads handed off to background processing; the receipt is
+# populated once the job completes. Copied per request without revalidation.
+ASYNC_UPLOAD_RESPONSE = ReceiptUploadResponse(
+    receipt_id="",
+    receipt=None,
+    extraction_log={"success": False, "message": "Processing in background"},
+    confidence=0.0,
+)
 
 # Lazy initialization of services
 _gemini_service = None
-_sheets_service = None
 _analysis_service = None
 
 
@@ -46,11 +88,8 @@ def get_gemini_service():
     return _gemini_service
 
 
-def get_sheets_service():
-    global _sheets_service
-    if _sheets_service is None:
-        _sheets_service = SheetsService()
-    return _sheets_service
+# Confirmed receipts are appended through a queue so concurrent saves share a write
+sheets_write_queue = SheetsWriteQueue(get_sheets_service)
 
 
 def get_analysis_service():
@@ -60,6 +99,113 @@ def get_analysis_service():
     return _analysis_service
 
 
+# Uploads are copied to disk in fixed-size chunks so memory stays flat; the
+# same chunks feed the content hash, so match its chunk size
+UPLOAD_CHUNK_SIZE = HASH_CHUNK_SIZE
+
+
+async def save_upload(file: UploadFile, file_path: str, digest=None) -> int:
+    """
+    Copy an uploaded file to disk chunk by chunk
+
+    Args:
+        file: Uploaded file
+        file_path: Destination path
+        digest: Optional hashlib object updated with each chunk as it is written
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        HTTPException: 413 if the file exceeds settings.max_upload_size
+    """
+    size = 0
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.max_upload_size:
+                break
+            if digest is not None:
+                digest.update(chunk)
+            await f.write(chunk)
+
+    if size > settings.max_upload_size:
+        await aiofiles.os.remove(file_path)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File {file.filename} exceeds the {settings.max_upload_size // (1024 * 1024)}MB upload limit",
+        )
+    return size
+
+
+async def hash_upload(file: UploadFile) -> bytes:
+    """
+    Hash an uploaded file without writing it to disk, then rewind it
+
+    Returns:
+        Raw SHA-256 digest of the file contents
+
+    Raises:
+        HTTPException: 413 if the file exceeds settings.max_upload_size
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > settings.max_upload_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File {file.filename} exceeds the {settings.max_upload_size // (1024 * 1024)}MB upload limit",
+            )
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.digest()
+
+
+def link_previous_upload(content_hash: str, file_path: str) -> bool:
+    """
+    Hard-link a previously stored upload with the same content to file_path
+
+    Each receipt keeps its own directory entry (so confirming or deleting one
+    never removes another's file) without copying the bytes again.
+
+    Returns:
+        True if the file is in place, False if it still has to be written
+    """
+    source = extraction_cache.get_source_file(content_hash)
+    if not source:
+        return False
+    try:
+        os.link(source, file_path)
+        return True
+    except OSError:
+        return False
+
+
+def fetch_custom_categories(user: Optional[dict]) -> Optional[list[str]]:
+    """
+    Fetch the names of the user's active custom categories
+
+    Returns:
+        Category names, or None for anonymous users / no categories / errors
+    """
+    logger.debug("User authenticated: %s", user is not None)
+    if not user:
+        logger.debug("No user authenticated, using default categories")
+        return None
+
+    logger.debug("User ID: %s", user.get('id'))
+    try:
+        supabase = get_supabase_service()
+        categories = supabase.get_category_names(user["id"])
+        custom_categories = list(categories) if categories else None
+        logger.debug("Using %s custom categories: %s", len(categories), custom_categories)
+        return custom_categories
+    except Exception:
+        logger.exception("Failed to fetch user categories")
+        return None
+
+
 def trigger_analysis_update():
     """Background task to update analysis after receipt save"""
     try:
@@ -68,9 +214,9 @@ def trigger_analysis_update():
         analysis.get_trends()
         analysis.get_forecast()
         analysis.get_category_analysis()
-        print("✅ Analysis updated in background")
+        logger.info("Analysis updated in background")
     except Exception as e:
-        print(f"❌ Error updating analysis: {e}")
+        logger.error("Error updating analysis: %s", e)
 
 
 @router.post("/upload-multiple", response_model=ReceiptUploadResponse)
@@ -94,75 +240,76 @@ async def upload_multiple_receipts(
         if len(files) > 5:
             raise HTTPException(status_code=400, detail="Maximum 5 files allowed")
 
-        print(f"📁 Multi-upload request received: {len(files)} files")
+        logger.debug("Multi-upload request received: %s files", len(files))
         for file in files:
-            print(f"  - {file.filename}, Content-Type: {file.content_type}, Size: {file.size}")
-        print(f"⚙️ Async processing: {async_processing}")
+            logger.debug("  - %s, Content-Type: %s, Size: %s", file.filename, file.content_type, file.size)
+        logger.debug("Async processing: %s", async_processing)
 
-        # Validate all files
-        file_paths = []
-        receipt_id = str(uuid.uuid4())
-
-        for idx, file in enumerate(files):
-            # Validate file type
+        # Validate all files before touching the disk
+        for file in files:
             if not (file.content_type.startswith("image/") or file.content_type == "application/pdf"):
-                print(f"❌ Invalid file type: {file.content_type}")
+                logger.warning("Invalid file type: %s", file.content_type)
                 raise HTTPException(status_code=400, detail=f"File {file.filename} must be an image or PDF")
 
-            # Save uploaded file
-            file_extension = file.filename.split(".")[-1] if file.filename else "jpg"
-            file_path = os.path.join(settings.upload_dir, f"{receipt_id}_{idx}.{file_extension}")
-            print(f"💾 Saving file to: {file_path}")
-
-            content = await file.read()
-            print(f"📄 Read {len(content)} bytes from uploaded file")
-
-            with open(file_path, "wb") as f:
-                f.write(content)
-            print(f"✅ File saved successfully")
+        receipt_id = str(uuid.uuid4())
 
-            file_paths.append(file_path)
+        # Fetch user categories (for both async and sync) while the files are saved
+        categories_task = asyncio.create_task(asyncio.to_thread(fetch_custom_categories, user))
 
-        # Get user categories if authenticated (for both async and sync)
-        custom_categories = None
-        print(f"🔐 User authenticated: {user is not None}")
-        if user:
-            print(f"👤 User ID: {user.get('id')}")
-            try:
-                supabase = SupabaseService()
-                categories = supabase.get_user_categories(user["id"])
-                print(f"📦 Fetched categories from DB: {categories}")
-                custom_categories = [cat["name"] for cat in categories] if categories else None
-                print(f"📋 Using {len(categories) if categories else 0} custom categories: {custom_categories}")
-            except Exception as e:
-                print(f"⚠️ Failed to fetch user categories: {e}")
-                import traceback
-                traceback.print_exc()
-        else:
-            print("⚠️ No user authenticated, using default categories")
+        async def save_one(idx: int, file: UploadFile) -> tuple[str, bytes]:
+            file_extension = file.filename.split(".")[-1] if file.filename else "jpg"
+            file_path = os.path.join(settings.upload_dir, f"{receipt_id}_{idx}.{file_extension}")
+            logger.debug("Saving file to: %s", file_path)
+            digest = hashlib.sha256()
+            size = await save_upload(file, file_path, digest)
+            logger.debug("File saved successfully (%s bytes)", size)
+            return file_path, digest.digest()
+
+        # Every save runs to completion, so a failed one (e.g. 413) can't leave
+        # another still writing when the saved files are removed
+        results = await asyncio.gather(
+            *(save_one(idx, file) for idx, file in enumerate(files)), return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            categories_task.cancel()
+            for result in results:
+                if not isinstance(result, BaseException):
+                    await aiofiles.os.remove(result[0])
+            raise errors[0]
+        saved = results
+        file_paths = [file_path for file_path, _ in saved]
+        custom_categories = await categories_task
+        receipt_files[receipt_id] = file_paths
 
         if async_processing:
             # Create upload job and process in background
             job = upload_service.create_job(receipt_id, file_paths, custom_categories)
             background_tasks.add_task(upload_service.process_upload, receipt_id)
-            print(f"🔄 Created async job {receipt_id} with custom categories: {custom_categories}")
+            logger.debug("Created async job %s with custom categories: %s", receipt_id, custom_categories)
 
-            return ReceiptUploadResponse(
-                receipt_id=receipt_id,
-                receipt=None,
-                extraction_log={"success": False, "message": "Processing in background"},
-                confidence=0.0,
-            )
+            return ASYNC_UPLOAD_RESPONSE.model_copy(update={"receipt_id": receipt_id})
         else:
             # Synchronous processing
-            print("🤖 Starting Gemini AI extraction...")
-
-            gemini = get_gemini_service()
-            receipt, extraction_log = gemini.extract_receipt_data_multiple(file_paths, custom_categories=custom_categories)
-            print(f"✅ Extraction completed: {extraction_log.get('success', False)}")
+            logger.debug("Starting Gemini AI extraction...")
+
+            # Hashed while the files were written, so no second pass over the disk
+            content_hash = combine_digests([file_digest for _, file_digest in saved])
+            cached = await asyncio.to_thread(extraction_cache.get, content_hash, custom_categories)
+            if cached:
+                logger.debug("Using cached extraction for identical upload")
+                receipt, extraction_log = cached
+            else:
+                gemini = get_gemini_service()
+                receipt, extraction_log = await asyncio.to_thread(
+                    gemini.extract_receipt_data_multiple, file_paths, custom_categories=custom_categories
+                )
+                if receipt:
+                    await asyncio.to_thread(extraction_cache.set, content_hash, custom_categories, receipt, extraction_log)
+            logger.debug("Extraction completed: %s", extraction_log.get('success', False))
 
             if not receipt:
-                print(f"❌ Extraction failed: {extraction_log.get('error')}")
+                logger.error("Extraction failed: %s", extraction_log.get('error'))
                 raise HTTPException(
                     status_code=422,
                     detail=f"Failed to extract receipt data: {extraction_log.get('error')}",
@@ -173,8 +320,9 @@ async def upload_multiple_receipts(
                 "receipt": receipt,
                 "file_path": file_paths,  # Store list of paths
                 "extraction_log": extraction_log,
+                "created_at": time.time(),
             }
-            print(f"💾 Receipt stored temporarily with ID: {receipt_id}")
+            logger.debug("Receipt stored temporarily with ID: %s", receipt_id)
 
             return ReceiptUploadResponse(
                 receipt_id=receipt_id,
@@ -186,9 +334,7 @@ async def upload_multiple_receipts(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Upload error: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(f"🔍 Full traceback: {traceback.format_exc()}")
+        logger.exception("Upload error")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
@@ -210,79 +356,77 @@ async def upload_receipt(
         ReceiptUploadResponse with extracted data and logs
     """
     try:
-        print(f"📁 Upload request received: {file.filename}, Content-Type: {file.content_type}, Size: {file.size}")
-        print(f"⚙️ Async processing: {async_processing}")
+        logger.debug("Upload request received: %s, Content-Type: %s, Size: %s", file.filename, file.content_type, file.size)
+        logger.debug("Async processing: %s", async_processing)
 
         # Validate file type
         if not (file.content_type.startswith("image/") or file.content_type == "application/pdf"):
-            print(f"❌ Invalid file type: {file.content_type}")
+            logger.warning("Invalid file type: %s", file.content_type)
             raise HTTPException(status_code=400, detail="File must be an image or PDF")
 
-        # Save uploaded file
         receipt_id = str(uuid.uuid4())
         file_extension = file.filename.split(".")[-1] if file.filename else "jpg"
         file_path = os.path.join(settings.upload_dir, f"{receipt_id}.{file_extension}")
-        print(f"💾 Saving file to: {file_path}")
 
-        content = await file.read()
-        print(f"📄 Read {len(content)} bytes from uploaded file")
+        # Get user categories if authenticated (for both async and sync)
+        custom_categories = await asyncio.to_thread(fetch_custom_categories, user)
 
-        with open(file_path, "wb") as f:
-            f.write(content)
-        print(f"✅ File saved successfully")
+        # For synchronous uploads, hash before writing: an identical earlier upload
+        # means the extraction is cached and its stored file can be reused
+        cached = None
+        if not async_processing:
+            content_hash = combine_digests([await hash_upload(file)])
+            cached = await asyncio.to_thread(extraction_cache.get, content_hash, custom_categories)
 
-        # Get user categories if authenticated (for both async and sync)
-        custom_categories = None
-        print(f"🔐 User authenticated: {user is not None}")
-        if user:
-            print(f"👤 User ID: {user.get('id')}")
-            try:
-                supabase = SupabaseService()
-                categories = supabase.get_user_categories(user["id"])
-                print(f"📦 Fetched categories from DB: {categories}")
-                custom_categories = [cat["name"] for cat in categories] if categories else None
-                print(f"📋 Using {len(categories) if categories else 0} custom categories: {custom_categories}")
-            except Exception as e:
-                print(f"⚠️ Failed to fetch user categories: {e}")
-                import traceback
-                traceback.print_exc()
+        if cached and await asyncio.to_thread(link_previous_upload, content_hash, file_path):
+            logger.debug("Reused stored upload for identical file: %s", file_path)
         else:
-            print("⚠️ No user authenticated, using default categories")
+            logger.debug("Saving file to: %s", file_path)
+            size = await save_upload(file, file_path)
+            logger.debug("File saved successfully (%s bytes)", size)
+        receipt_files[receipt_id] = [file_path]
 
         if async_processing:
             # Create upload job and process in background
             job = upload_service.create_job(receipt_id, file_path, custom_categories)
             background_tasks.add_task(upload_service.process_upload, receipt_id)
-            print(f"🔄 Created async job {receipt_id} with custom categories: {custom_categories}")
+            logger.debug("Created async job %s with custom categories: %s", receipt_id, custom_categories)
 
-            return ReceiptUploadResponse(
-                receipt_id=receipt_id,
-                receipt=None,  # Will be populated when processing completes
-                extraction_log={"success": False, "message": "Processing in background"},
-                confidence=0.0,
-            )
+            return ASYNC_UPLOAD_RESPONSE.model_copy(update={"receipt_id": receipt_id})
         else:
             # Synchronous processing (existing behavior)
-            print("🤖 Starting Gemini AI extraction...")
+            logger.debug("Starting Gemini AI extraction...")
 
-            gemini = get_gemini_service()
-            receipt, extraction_log = gemini.extract_receipt_data(file_path, custom_categories=custom_categories)
-            print(f"✅ Extraction completed: {extraction_log.get('success', False)}")
+            if cached:
+                logger.debug("Using cached extraction for identical upload")
+                receipt, extraction_log = cached
+            else:
+                gemini = get_gemini_service()
+                receipt, extraction_log = await asyncio.to_thread(
+                    gemini.extract_receipt_data, file_path, custom_categories=custom_categories
+                )
+                if receipt:
+                    await asyncio.to_thread(extraction_cache.set, content_hash, custom_categories, receipt, extraction_log)
+            logger.debug("Extraction completed: %s", extraction_log.get('success', False))
 
             if not receipt:
-                print(f"❌ Extraction failed: {extraction_log.get('error')}")
+                logger.error("Extraction failed: %s", extraction_log.get('error'))
                 raise HTTPException(
                     status_code=422,
                     detail=f"Failed to extract receipt data: {extraction_log.get('error')}",
                 )
 
+            # Later identical uploads can link to this file instead of writing their own
+            await asyncio.to_thread(extraction_cache.set_source_file, content_hash, file_path)
+
             # Store receipt temporarily
             receipts_storage[receipt_id] = {
                 "receipt": receipt,
                 "file_path": file_path,
                 "extraction_log": extraction_log,
+                "created_at": time.time(),
             }
-            print(f"💾 Receipt stored temporarily with ID: {receipt_id}")
+            logger.debug("Receipt stored temporarily with ID: %s", receipt_id)
 
             return ReceiptUploadResponse(
                 receipt_id=receipt_id,
@@ -294,9 +438,7 @@ async def upload_receipt(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Upload error: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(f"🔍 Full traceback: {traceback.format_exc()}")
+        logger.exception("Upload error")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
@@ -324,32 +466,24 @@ async def text_to_expense(
         if not text:
             raise HTTPException(status_code=400, detail="Text is required")
 
-        print(f"✍️ Text-to-expense request: {text[:100]}...")
+        logger.debug("Text-to-expense request: %.100s...", text)
 
         # Generate unique receipt ID
         receipt_id = str(uuid.uuid4())
 
         # Get user categories if authenticated
-        custom_categories = None
-        if user:
-            print(f"👤 User authenticated: {user.get('id')}")
-            try:
-                supabase = SupabaseService()
-                categories = supabase.get_user_categories(user["id"])
-                custom_categories = [cat["name"] for cat in categories] if categories else None
-                print(f"📋 Using {len(categories) if categories else 0} custom categories")
-            except Exception as e:
-                print(f"⚠️ Failed to fetch user categories: {e}")
+        custom_categories = await asyncio.to_thread(fetch_custom_categories, user)
 
         # Extract expense using Gemini
         gemini = get_gemini_service()
-        receipt, extraction_log = gemini.extract_expense_from_text(
+        receipt, extraction_log = await asyncio.to_thread(
+            gemini.extract_expense_from_text,
             text,
             custom_categories=custom_categories
         )
 
         if not receipt:
-            print(f"❌ Extraction failed: {extraction_log.get('error')}")
+            logger.error("Extraction failed: %s", extraction_log.get('error'))
             raise HTTPException(
                 status_code=422,
                 detail=f"Failed to extract expense: {extraction_log.get('error')}"
@@ -361,9 +495,10 @@ async def text_to_expense(
             "file_path": None,  # No file for text input
             "extraction_log": extraction_log,
             "source": "text_input",
-            "original_text": text
+            "original_text": text,
+            "created_at": time.time(),
         }
-        print(f"💾 Receipt stored temporarily with ID: {receipt_id}")
+        logger.debug("Receipt stored temporarily with ID: %s", receipt_id)
 
         return ReceiptUploadResponse(
             receipt_id=receipt_id,
@@ -375,9 +510,7 @@ async def text_to_expense(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Text-to-expense error: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(f"🔍 Full traceback: {traceback.format_exc()}")
+        logger.exception("Text-to-expense error")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
@@ -408,7 +541,7 @@ async def check_duplicates(receipt_id: str):
 
         # Check for duplicates
         sheets = get_sheets_service()
-        duplicates = sheets.find_duplicate_receipts(receipt)
+        duplicates = await asyncio.to_thread(sheets.find_duplicate_receipts, receipt)
 
         return {
             "has_duplicates": len(duplicates) > 0,
@@ -419,7 +552,7 @@ async def check_duplicates(receipt_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error checking duplicates: {e}")
+        logger.error("Error checking duplicates: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -458,14 +591,14 @@ async def confirm_receipt(
         sheets = get_sheets_service()
 
         # Check for duplicates unless force_save is True
-        print(f"🔍 Duplicate check: force_save={force_save}")
+        logger.debug("Duplicate check: force_save=%s", force_save)
         if not force_save:
-            print("🔎 Checking for duplicate receipts...")
+            logger.debug("Checking for duplicate receipts...")
             try:
-                duplicates = sheets.find_duplicate_receipts(request.receipt)
-                print(f"✅ Duplicate check complete. Found {len(duplicates)} potential duplicates")
+                duplicates = await asyncio.to_thread(sheets.find_duplicate_receipts, request.receipt)
+                logger.debug("Duplicate check complete. Found %s potential duplicates", len(duplicates))
                 if duplicates:
-                    print(f"⚠️ Returning duplicate warning with {len(duplicates)} duplicates")
+                    logger.warning("Returning duplicate warning with %s duplicates", len(duplicates))
                     return {
                         "success": False,
                         "duplicate_detected": True,
@@ -473,20 +606,18 @@ async def confirm_receipt(
                         "message": "Potential duplicate receipt detected. Please review before saving."
                     }
                 else:
-                    print("✅ No duplicates found. Proceeding with save.")
-            except Exception as e:
-                print(f"❌ Error during duplicate check: {e}")
-                import traceback
-                traceback.print_exc()
+                    logger.debug("No duplicates found. Proceeding with save.")
+            except Exception:
+                logger.exception("Error during duplicate check")
         else:
-            print("⚠️ Skipping duplicate check (force_save=true)")
+            logger.warning("Skipping duplicate check (force_save=true)")
 
         # Save to Google Sheets
-        print(f"📋 Confirming receipt {receipt_id}...")
-        success = sheets.save_receipt(request.receipt)
+        logger.debug("Confirming receipt %s...", receipt_id)
+        success = await sheets_write_queue.save_receipt(request.receipt)
 
         if not success:
-            print(f"❌ Failed to save receipt {receipt_id} to Google Sheets")
+            logger.error("Failed to save receipt %s to Google Sheets", receipt_id)
             raise HTTPException(
                 status_code=500,
                 detail="Failed to save receipt to Google Sheets. Please check server logs for details."
@@ -497,18 +628,19 @@ async def confirm_receipt(
 
         # Clean up stored receipt
         if job:
-            upload_service.delete_job(receipt_id)
+            await asyncio.to_thread(upload_service.delete_job, receipt_id)
         else:
             receipts_storage.pop(receipt_id, None)
+        receipt_files.pop(receipt_id, None)
 
         # Optionally delete uploaded file
         if file_path:
             try:
-                os.remove(file_path)
+                await aiofiles.os.remove(file_path)
             except:
                 pass
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "success": True,
                 "message": "Receipt saved successfully",
@@ -551,11 +683,12 @@ async def reprocess_receipt(receipt_id: str, request: ReceiptReprocessRequest):
         # Get current receipt data
         current_receipt_data = None
         if request.original_receipt:
-            current_receipt_data = request.original_receipt.dict()
+            current_receipt_data = request.original_receipt.model_dump(mode="json")
 
         # Re-extract with feedback
         gemini = get_gemini_service()
-        receipt, extraction_log = gemini.extract_receipt_data(
+        receipt, extraction_log = await asyncio.to_thread(
+            gemini.extract_receipt_data,
             file_path,
             user_feedback=request.user_feedback,
             current_receipt=current_receipt_data
@@ -570,14 +703,16 @@ async def reprocess_receipt(receipt_id: str, request: ReceiptReprocessRequest):
         # Update stored receipt
         if job:
             # Update async job
-            job.receipt_data = receipt.dict()
+            job.receipt_data = receipt.model_dump(mode="json")
             job.extraction_log = extraction_log
+            await asyncio.to_thread(upload_service.save_job, job)
         else:
             # Update synchronous storage
             receipts_storage[receipt_id] = {
                 "receipt": receipt,
                 "file_path": file_path,
                 "extraction_log": extraction_log,
+                "created_at": receipt_data.get("created_at", time.time()),
             }
 
         return ReceiptUploadResponse(
@@ -593,42 +728,79 @@ async def reprocess_receipt(receipt_id: str, request: ReceiptReprocessRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/", response_model=list[UploadJobResponse])
-async def list_all_receipts():
-    """Get all receipts (pending uploads and recent saved receipts)"""
-    in_queue_receipts = []
-    saved_receipts = []
+def job_response(job) -> UploadJobResponse:
+    """Build the status response for an async upload job"""
+    return UploadJobResponse(
+        job_id=job.job_id,
+        receipt_id=job.receipt_id,
+        status=job.status,
+        progress=job.progress,
+        error=job.error,
+        receipt_data=job.receipt_data,
+        extraction_log=job.extraction_log,
+    )
+
+
+def pending_response(receipt_id: str, receipt_data: dict) -> UploadJobResponse:
+    """
+    Build the status response for a synchronously extracted receipt
 
-    # Get all async jobs (pending/processing) - these are in queue
-    for receipt_id, job in upload_service.jobs.items():
-        in_queue_receipts.append(UploadJobResponse(
-            job_id=job.job_id,
-            receipt_id=job.receipt_id,
-            status=job.status,
-            progress=job.progress,
-            error=job.error,
-            receipt_data=job.receipt_data,
-            extraction_log=job.extraction_log,
-        ))
-
-    # Get all synchronous receipts (completed but not yet confirmed) - these are in queue
-    for receipt_id, receipt_data in receipts_storage.items():
-        in_queue_receipts.append(UploadJobResponse(
+    The response is memoized on the storage entry; reprocessing replaces the
+    entry and confirming removes it, so the cached copy can't go stale.
+    """
+    response = receipt_data.get("response")
+    if response is None:
+        response = UploadJobResponse(
             job_id=receipt_id,
             receipt_id=receipt_id,
             status=UploadStatus.COMPLETED,
             progress=100,
-            receipt_data=receipt_data["receipt"].dict() if receipt_data["receipt"] else None,
+            receipt_data=receipt_data["receipt"].model_dump(mode="json") if receipt_data["receipt"] else None,
             extraction_log=receipt_data["extraction_log"],
-        ))
+        )
+        receipt_data["response"] = response
+    return response
 
-    # Reverse in-queue receipts so most recent are first
-    in_queue_receipts.reverse()
+
+@router.get("/", response_model=list[UploadJobResponse])
+async def list_all_receipts(
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Get all receipts (pending uploads and recent saved receipts)
+
+    Args:
+        limit: Maximum number of in-queue receipts to return
+        offset: Number of in-queue receipts to skip (saved receipts are only
+            included on the first page)
+    """
+    saved_receipts = []
+
+    # In-queue receipts, most recent first: completed synchronous uploads
+    # (not yet confirmed) followed by async jobs (pending/processing)
+    # Sorted by upload time: the storage's own order moves on every read
+    pending = [
+        pending_response(receipt_id, receipt_data)
+        for receipt_id, receipt_data in sorted(
+            receipts_storage.items(), key=lambda item: item[1].get("created_at", 0), reverse=True
+        )
+    ]
+    in_queue_receipts = pending[offset:offset + limit]
+    if len(in_queue_receipts) < limit:
+        # Only the async jobs on this page are loaded from the job store
+        jobs = await asyncio.to_thread(
+            upload_service.jobs.recent, max(0, offset - len(pending)), limit - len(in_queue_receipts)
+        )
+        in_queue_receipts.extend(job_response(job) for job in jobs)
+
+    if offset:
+        return in_queue_receipts
 
     # Get recent saved receipts from Google Sheets (already in reverse chronological order)
     try:
         sheets = get_sheets_service()
-        recent_saved = sheets.get_recent_receipts(limit=10)
+        recent_saved = await asyncio.to_thread(sheets.get_recent_receipts, limit=10)
 
         for saved_receipt in recent_saved:
             # Convert saved receipt to UploadJobResponse format
@@ -654,7 +826,7 @@ async def list_all_receipts():
                 row_number=saved_receipt.get('_row_number')
             ))
     except Exception as e:
-        print(f"⚠️ Failed to fetch saved receipts: {e}")
+        logger.warning("Failed to fetch saved receipts: %s", e)
 
     # Return in-queue receipts first, then saved receipts
     return in_queue_receipts + saved_receipts
@@ -666,27 +838,12 @@ async def get_upload_status(receipt_id: str):
     # Check if it's an async job
     job = upload_service.get_job(receipt_id)
     if job:
-        return UploadJobResponse(
-            job_id=job.job_id,
-            receipt_id=job.receipt_id,
-            status=job.status,
-            progress=job.progress,
-            error=job.error,
-            receipt_data=job.receipt_data,
-            extraction_log=job.extraction_log,
-        )
+        return job_response(job)
 
     # Check if it's a completed synchronous upload
-    if receipt_id in receipts_storage:
-        receipt_data = receipts_storage[receipt_id]
-        return UploadJobResponse(
-            job_id=receipt_id,
-            receipt_id=receipt_id,
-            status=UploadStatus.COMPLETED,
-            progress=100,
-            receipt_data=receipt_data["receipt"].dict() if receipt_data["receipt"] else None,
-            extraction_log=receipt_data["extraction_log"],
-        )
+    receipt_data = receipts_storage.get(receipt_id)
+    if receipt_data is not None:
+        return pending_response(receipt_id, receipt_data)
 
     raise HTTPException(status_code=404, detail="Receipt not found")
 
@@ -718,48 +875,32 @@ async def get_receipt(receipt_id: str):
     }
 
 
-def get_media_type(file_path: str) -> str:
-    """Determine media type based on file extension"""
-    if file_path.lower().endswith('.pdf'):
-        return "application/pdf"
-    elif file_path.lower().endswith('.png'):
-        return "image/png"
-    elif file_path.lower().endswith('.gif'):
-        return "image/gif"
-    elif file_path.lower().endswith('.webp'):
-        return "image/webp"
-    else:
-        return "image/jpeg"
-
-
 def find_receipt_file(receipt_id: str) -> tuple[Optional[str], Optional[str]]:
     """Find receipt file and return (file_path, media_type)"""
     # Check async jobs first
     job = upload_service.get_job(receipt_id)
     if job and job.file_path:
-        print(f"✅ Found in async jobs: {job.file_path}")
+        logger.debug("Found in async jobs: %s", job.file_path)
         if os.path.exists(job.file_path):
             media_type = get_media_type(job.file_path)
             return job.file_path, media_type
         else:
-            print(f"❌ File not found at path: {job.file_path}")
+            logger.warning("File not found at path: %s", job.file_path)
 
     # Check synchronous storage
     if receipt_id in receipts_storage:
         file_path = receipts_storage[receipt_id]["file_path"]
-        print(f"✅ Found in receipts_storage: {file_path}")
+        logger.debug("Found in receipts_storage: %s", file_path)
         if file_path and os.path.exists(file_path):
             media_type = get_media_type(file_path)
             return file_path, media_type
         else:
-            print(f"❌ File not found at path: {file_path}")
-
-    # Try to find file by receipt_id pattern
-    pattern = os.path.join(settings.upload_dir, f"{receipt_id}.*")
-    print(f"🔍 Searching with pattern: {pattern}")
-    files = glob.glob(pattern)
-    if files:
-        print(f"✅ Found via glob: {files[0]}")
+            logger.warning("File not found at path: %s", file_path)
+
+    # Fall back to the upload directory index
+    files = receipt_files.get(receipt_id)
+    if files and os.path.exists(files[0]):
+        logger.debug("Found in upload index: %s", files[0])
         media_type = get_media_type(files[0])
         return files[0], media_type
 
@@ -769,29 +910,29 @@ def find_receipt_file(receipt_id: str) -> tuple[Optional[str], Optional[str]]:
 @router.head("/{receipt_id}/image")
 async def head_receipt_image(receipt_id: str):
     """Get receipt file metadata (for Content-Type detection)"""
-    print(f"📸 HEAD request for receipt: {receipt_id}")
+    logger.debug("HEAD request for receipt: %s", receipt_id)
 
     file_path, media_type = find_receipt_file(receipt_id)
 
     if not file_path:
-        print(f"❌ No image found for receipt {receipt_id}")
+        logger.warning("No image found for receipt %s", receipt_id)
         raise HTTPException(status_code=404, detail="Receipt image not found")
 
-    print(f"✅ Returning Content-Type: {media_type}")
-    return JSONResponse(content={}, headers={"Content-Type": media_type})
+    logger.debug("Returning Content-Type: %s", media_type)
+    return ORJSONResponse(content={}, headers={"Content-Type": media_type})
 
 
 @router.get("/{receipt_id}/images")
 async def get_receipt_images(receipt_id: str):
     """Get list of all image URLs for a receipt"""
-    print(f"📸 GET request for all images: {receipt_id}")
+    logger.debug("GET request for all images: %s", receipt_id)
 
     # Check async jobs first
     job = upload_service.get_job(receipt_id)
     if job and hasattr(job, 'all_file_paths') and job.all_file_paths:
         image_count = len(job.all_file_paths)
-        print(f"✅ Found {image_count} images in async job")
-        return JSONResponse(content={
+        logger.debug("Found %s images in async job", image_count)
+        return ORJSONResponse(content={
             "receipt_id": receipt_id,
             "image_count": image_count,
             "images": [f"/api/receipts/{receipt_id}/image/{i}" for i in range(image_count)]
@@ -803,41 +944,33 @@ async def get_receipt_images(receipt_id: str):
         # Check if it's a list or single path
         if isinstance(file_path, list):
             image_count = len(file_path)
-            print(f"✅ Found {image_count} images in receipts_storage")
-            return JSONResponse(content={
+            logger.debug("Found %s images in receipts_storage", image_count)
+            return ORJSONResponse(content={
                 "receipt_id": receipt_id,
                 "image_count": image_count,
                 "images": [f"/api/receipts/{receipt_id}/image/{i}" for i in range(image_count)]
             })
         else:
             # Single image
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 "receipt_id": receipt_id,
                 "image_count": 1,
                 "images": [f"/api/receipts/{receipt_id}/image"]
             })
 
-    # Try to find files by pattern
-    pattern = os.path.join(settings.upload_dir, f"{receipt_id}_*.jpg")
-    files = glob.glob(pattern)
-    if not files:
-        pattern = os.path.join(settings.upload_dir, f"{receipt_id}_*.pdf")
-        files = glob.glob(pattern)
-    if not files:
-        pattern = os.path.join(settings.upload_dir, f"{receipt_id}_*.png")
-        files = glob.glob(pattern)
-
-    if files:
+    # Try the upload directory index
+    files = receipt_files.get(receipt_id, ())
+    if len(files) > 1:
         image_count = len(files)
-        print(f"✅ Found {image_count} images via glob")
-        return JSONResponse(content={
+        logger.debug("Found %s images in upload index", image_count)
+        return ORJSONResponse(content={
             "receipt_id": receipt_id,
             "image_count": image_count,
             "images": [f"/api/receipts/{receipt_id}/image/{i}" for i in range(image_count)]
         })
 
     # Fall back to single image
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "receipt_id": receipt_id,
         "image_count": 1,
         "images": [f"/api/receipts/{receipt_id}/image"]
@@ -847,7 +980,7 @@ async def get_receipt_images(receipt_id: str):
 @router.head("/{receipt_id}/image/{index}")
 async def head_receipt_image_by_index(receipt_id: str, index: int):
     """Get metadata for specific receipt image by index"""
-    print(f"📸 HEAD request for receipt image {index}: {receipt_id}")
+    logger.debug("HEAD request for receipt image %s: %s", index, receipt_id)
 
     # Check async jobs first
     job = upload_service.get_job(receipt_id)
@@ -857,7 +990,7 @@ async def head_receipt_image_by_index(receipt_id: str, index: int):
         file_path = job.all_file_paths[index]
         if os.path.exists(file_path):
             media_type = get_media_type(file_path)
-            return JSONResponse(content={}, headers={"Content-Type": media_type})
+            return ORJSONResponse(content={}, headers={"Content-Type": media_type})
 
     # Check synchronous storage
     if receipt_id in receipts_storage:
@@ -868,22 +1001,21 @@ async def head_receipt_image_by_index(receipt_id: str, index: int):
             target_path = file_path[index]
             if os.path.exists(target_path):
                 media_type = get_media_type(target_path)
-                return JSONResponse(content={}, headers={"Content-Type": media_type})
+                return ORJSONResponse(content={}, headers={"Content-Type": media_type})
 
-    # Try to find file by pattern
-    pattern = os.path.join(settings.upload_dir, f"{receipt_id}_{index}.*")
-    files = glob.glob(pattern)
-    if files:
-        media_type = get_media_type(files[0])
-        return JSONResponse(content={}, headers={"Content-Type": media_type})
+    # Try the upload directory index
+    files = receipt_files.get(receipt_id, ())
+    if 0 <= index < len(files) and os.path.exists(files[index]):
+        media_type = get_media_type(files[index])
+        return ORJSONResponse(content={}, headers={"Content-Type": media_type})
 
     raise HTTPException(status_code=404, detail=f"Image {index} not found")
 
 
 @router.get("/{receipt_id}/image/{index}")
-async def get_receipt_image_by_index(receipt_id: str, index: int):
+async def get_receipt_image_by_index(receipt_id: str, index: int, request: Request):
     """Get specific receipt image by index"""
-    print(f"📸 GET request for receipt image {index}: {receipt_id}")
+    logger.debug("GET request for receipt image %s: %s", index, receipt_id)
 
     # Check async jobs first
     job = upload_service.get_job(receipt_id)
@@ -893,7 +1025,7 @@ async def get_receipt_image_by_index(receipt_id: str, index: int):
         file_path = job.all_file_paths[index]
         if os.path.exists(file_path):
             media_type = get_media_type(file_path)
-            return FileResponse(file_path, media_type=media_type)
+            return cached_file_response(request, file_path, media_type)
 
     # Check synchronous storage
     if receipt_id in receipts_storage:
@@ -904,30 +1036,29 @@ async def get_receipt_image_by_index(receipt_id: str, index: int):
             target_path = file_path[index]
             if os.path.exists(target_path):
                 media_type = get_media_type(target_path)
-                return FileResponse(target_path, media_type=media_type)
+                return cached_file_response(request, target_path, media_type)
 
-    # Try to find file by pattern
-    pattern = os.path.join(settings.upload_dir, f"{receipt_id}_{index}.*")
-    files = glob.glob(pattern)
-    if files:
-        media_type = get_media_type(files[0])
-        return FileResponse(files[0], media_type=media_type)
+    # Try the upload directory index
+    files = receipt_files.get(receipt_id, ())
+    if 0 <= index < len(files) and os.path.exists(files[index]):
+        media_type = get_media_type(files[index])
+        return cached_file_response(request, files[index], media_type)
 
     raise HTTPException(status_code=404, detail=f"Image {index} not found")
 
 
 @router.get("/{receipt_id}/image")
-async def get_receipt_image(receipt_id: str):
+async def get_receipt_image(receipt_id: str, request: Request):
     """Get receipt image or PDF file (first image if multiple)"""
-    print(f"📸 GET request for receipt: {receipt_id}")
+    logger.debug("GET request for receipt: %s", receipt_id)
 
     file_path, media_type = find_receipt_file(receipt_id)
 
     if not file_path:
-        print(f"❌ No image found for receipt {receipt_id}")
+        logger.warning("No image found for receipt %s", receipt_id)
         raise HTTPException(status_code=404, detail="Receipt image not found")
 
-    return FileResponse(file_path, media_type=media_type)
+    return cached_file_response(request, file_path, media_type)
 
 
 @router.delete("/{receipt_id}")
@@ -949,20 +1080,21 @@ async def delete_receipt(receipt_id: str):
 
             # Delete from Google Sheets
             sheets = get_sheets_service()
-            success = sheets.delete_receipt_by_row(row_number)
+            success = await asyncio.to_thread(sheets.delete_receipt_by_row, row_number)
 
             if not success:
                 raise HTTPException(status_code=500, detail="Failed to delete receipt from Google Sheets")
 
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 "success": True,
                 "message": "Receipt deleted successfully from Google Sheets"
             })
         else:
             # Delete from upload jobs or receipts storage
             if receipt_id in upload_service.jobs:
-                upload_service.delete_job(receipt_id)
-                return JSONResponse(content={
+                await asyncio.to_thread(upload_service.delete_job, receipt_id)
+                receipt_files.pop(receipt_id, None)
+                return ORJSONResponse(content={
                     "success": True,
                     "message": "Receipt deleted from upload queue"
                 })
@@ -970,6 +1102,7 @@ async def delete_receipt(receipt_id: str):
                 # Get file path before deleting
                 file_path = receipts_storage[receipt_id].get("file_path")
                 receipts_storage.pop(receipt_id, None)
+                receipt_files.pop(receipt_id, None)
 
                 # Delete file if exists
                 if file_path:
@@ -981,9 +1114,9 @@ async def delete_receipt(receipt_id: str):
                         elif os.path.exists(file_path):
                             os.remove(file_path)
                     except Exception as e:
-                        print(f"⚠️ Failed to delete file: {e}")
+                        logger.warning("Failed to delete file: %s", e)
 
-                return JSONResponse(content={
+                return ORJSONResponse(content={
                     "success": True,
                     "message": "Receipt deleted from temporary storage"
                 })
@@ -993,5 +1126,5 @@ async def delete_receipt(receipt_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error deleting receipt: {e}")
+        logger.error("Error deleting receipt: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -1,12 +1,33 @@
 """
 Sheets management endpoints for viewing and editing Google Sheets data
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+import logging
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from gspread.exceptions import APIError
+from gspread.utils import absolute_range_name, rowcol_to_a1
+from app.api.deps import get_sheets_service
 from app.services.sheets_service import SheetsService
+from app.core.config import get_settings
+from app.utils.ttl_cache import TTLCache
+from app.utils.http_cache import build_etag, etag_matches
 
 router = APIRouter(prefix="/sheets", tags=["sheets"])
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Short-lived cache of serialized sheet reads. Keys include the data revision, which
+# every write through SheetsService or these routes bumps, so writes invalidate it.
+_cache = TTLCache(ttl=30, maxsize=1024)
+
+# Bounds per-worksheet fallback reads so a spreadsheet with many tabs can't burst the quota
+_sheets_semaphore = asyncio.Semaphore(settings.sheets_concurrency)
+
+# Partial-response mask for /list: tab titles, ids and grid sizes only
+SHEET_LIST_FIELDS = "sheets.properties(title,sheetId,gridProperties(rowCount,columnCount))"
 
 
 class CellUpdate(BaseModel):
@@ -21,83 +42,165 @@ class RowUpdate(BaseModel):
     values: List[str]
 
 
-@router.get("/list")
-async def list_sheets():
+class RangeUpdate(BaseModel):
+    """Model for updating a block of cells"""
+    range: str  # A1 notation within the sheet, e.g. "B3" or "A2:K2"
+    values: List[List[str]]
+
+
+class BatchUpdate(BaseModel):
+    """Model for applying several range updates in one request"""
+    updates: List[RangeUpdate] = Field(..., min_length=1, max_length=500)
+
+
+def count_data_cells(column: List[str]) -> int:
+    """Count non-blank cells in a column slice that starts below the header"""
+    return sum(1 for cell in column if cell.strip())
+
+
+def json_response(body: bytes, etag: str) -> Response:
+    """Wrap pre-serialized JSON, skipping response validation and re-encoding"""
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+async def count_worksheet_rows(spreadsheet, title: str) -> int:
+    """Count data rows of one worksheet from its first column (fallback path)"""
+    async with _sheets_semaphore:
+        value_range = await asyncio.to_thread(
+            spreadsheet.values_get,
+            absolute_range_name(title, "A2:A"),
+            params={"majorDimension": "COLUMNS"},
+        )
+    columns = value_range.get("values")
+    return count_data_cells(columns[0]) if columns else 0
+
+
+@router.get("/list", response_model=None)
+async def list_sheets(request: Request):
     """Get list of all sheets in the spreadsheet"""
+    revision = SheetsService.get_revision_id()
+    etag = build_etag(revision)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cache_key = ("list", revision)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return json_response(cached, etag)
+
     try:
-        sheets_service = SheetsService()
-        # Get all worksheets
-        worksheets = sheets_service.spreadsheet.worksheets()
+        sheets_service = get_sheets_service()
+        spreadsheet = sheets_service.spreadsheet
+        # Fetch only the tab properties we report, not the whole spreadsheet resource
+        metadata = await asyncio.to_thread(
+            spreadsheet.fetch_sheet_metadata,
+            params={"includeGridData": "false", "fields": SHEET_LIST_FIELDS},
+        )
+        properties = [sheet["properties"] for sheet in metadata.get("sheets", [])]
+
+        # Fetch column A (below the header) of every sheet in one batched request
+        # instead of downloading each full grid
+        ranges = [absolute_range_name(props["title"], "A2:A") for props in properties]
+        try:
+            batch = await asyncio.to_thread(
+                spreadsheet.values_batch_get,
+                ranges,
+                params={"majorDimension": "COLUMNS"},
+            )
+            row_counts = [
+                count_data_cells(columns[0]) if (columns := value_range.get("values")) else 0
+                for value_range in batch.get("valueRanges", [])
+            ]
+        except APIError as e:
+            # Batched read rejected (e.g. an unreadable tab): read sheets concurrently instead
+            logger.warning("Batched row count failed, counting per sheet: %s", e)
+            row_counts = await asyncio.gather(
+                *(count_worksheet_rows(spreadsheet, props["title"]) for props in properties)
+            )
 
         sheets_list = []
-        for ws in worksheets:
-            # Get actual data to count non-empty rows
-            all_values = ws.get_all_values()
-
-            # Count rows with data (excluding header row and empty rows)
-            data_row_count = 0
-            if len(all_values) > 1:  # Has at least header + 1 row
-                for row in all_values[1:]:  # Skip header
-                    # Check if row has any non-empty values
-                    if any(cell.strip() for cell in row if cell):
-                        data_row_count += 1
-
+        for props, data_row_count in zip(properties, row_counts):
             sheets_list.append({
-                "title": ws.title,
-                "id": ws.id,
+                "title": props["title"],
+                "id": props["sheetId"],
                 "row_count": data_row_count + 1,  # +1 for header row
-                "col_count": ws.col_count,
+                "col_count": props.get("gridProperties", {}).get("columnCount", 0),
             })
 
-        return {"sheets": sheets_list}
+        body = orjson.dumps({"sheets": sheets_list})
+        _cache.set(cache_key, body)
+        return json_response(body, etag)
     except Exception as e:
-        print(f"❌ Error listing sheets: {e}")
+        logger.exception("Error listing sheets")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{sheet_name}")
-async def get_sheet_data(sheet_name: str):
+@router.get("/{sheet_name}", response_model=None)
+async def get_sheet_data(
+    request: Request,
+    sheet_name: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+):
     """
-    Get all data from a specific sheet
+    Get data from a specific sheet, optionally one page at a time
 
     Args:
         sheet_name: Name of the sheet (e.g., "Receipts", "Budgets")
+        offset: Number of data rows to skip
+        limit: Maximum number of data rows to return (all remaining rows if omitted)
 
     Returns:
-        Headers and all rows of data
+        Headers and rows of data; the sheet row number of rows[i] is start_row + i
     """
-    try:
-        sheets_service = SheetsService()
-        worksheet = sheets_service.spreadsheet.worksheet(sheet_name)
-
-        # Get all values including headers
-        all_values = worksheet.get_all_values()
-
-        if not all_values:
-            return {
-                "sheet_name": sheet_name,
-                "headers": [],
-                "rows": [],
-                "row_count": 0
-            }
+    revision = SheetsService.get_revision_id()
+    etag = build_etag(revision)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-        headers = all_values[0] if len(all_values) > 0 else []
-        rows = all_values[1:] if len(all_values) > 1 else []
+    cache_key = ("data", revision, sheet_name, offset, limit)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return json_response(cached, etag)
 
-        # Add row numbers to each row for editing
-        rows_with_numbers = [
-            {"row_number": idx + 2, "values": row}  # +2 because row 1 is header, and 1-indexed
-            for idx, row in enumerate(rows)
-        ]
-
-        return {
+    try:
+        sheets_service = get_sheets_service()
+        spreadsheet = sheets_service.spreadsheet
+        start_row = offset + 2  # Row 1 is the header, rows are 1-indexed
+
+        if limit is None:
+            result = await asyncio.to_thread(spreadsheet.values_get, absolute_range_name(sheet_name))
+            all_values = result.get("values", [])
+            headers = all_values[0] if all_values else []
+            rows = all_values[1 + offset:]
+        else:
+            # Only the header and the requested page are downloaded
+            result = await asyncio.to_thread(
+                spreadsheet.values_batch_get,
+                [
+                    absolute_range_name(sheet_name, "1:1"),
+                    absolute_range_name(sheet_name, f"{start_row}:{start_row + limit - 1}"),
+                ],
+            )
+            header_range, page_range = result.get("valueRanges", [{}, {}])
+            headers = header_range.get("values", [[]])[0]
+            rows = page_range.get("values", [])
+
+        # The API trims trailing empty cells; pad rows to the header width for the table
+        width = len(headers)
+        rows = [row + [""] * (width - len(row)) if len(row) < width else row for row in rows]
+
+        body = orjson.dumps({
             "sheet_name": sheet_name,
             "headers": headers,
-            "rows": rows_with_numbers,
+            "rows": rows,
+            "start_row": start_row,
             "row_count": len(rows)
-        }
+        })
+        _cache.set(cache_key, body)
+        return json_response(body, etag)
     except Exception as e:
-        print(f"❌ Error fetching sheet '{sheet_name}': {e}")
+        logger.exception("Error fetching sheet '%s'", sheet_name)
         raise HTTPException(status_code=404, detail=f"Sheet '{sheet_name}' not found or error: {str(e)}")
 
 
@@ -111,18 +214,19 @@ async def update_cell(sheet_name: str, update: CellUpdate):
         update: Cell update details (row, col, value)
     """
     try:
-        sheets_service = SheetsService()
-        worksheet = sheets_service.spreadsheet.worksheet(sheet_name)
+        sheets_service = get_sheets_service()
+        worksheet = await asyncio.to_thread(sheets_service.spreadsheet.worksheet, sheet_name)
 
         # Update the cell (gspread uses 1-indexed rows and cols)
-        worksheet.update_cell(update.row, update.col, update.value)
+        await asyncio.to_thread(worksheet.update_cell, update.row, update.col, update.value)
+        SheetsService.bump_revision()
 
         return {
             "success": True,
             "message": f"Cell ({update.row}, {update.col}) updated successfully"
         }
     except Exception as e:
-        print(f"❌ Error updating cell in '{sheet_name}': {e}")
+        logger.exception("Error updating cell in '%s'", sheet_name)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -137,25 +241,55 @@ async def update_row(sheet_name: str, row_number: int, update: RowUpdate):
         update: New values for the row
     """
     try:
-        sheets_service = SheetsService()
-        worksheet = sheets_service.spreadsheet.worksheet(sheet_name)
+        sheets_service = get_sheets_service()
+        worksheet = await asyncio.to_thread(sheets_service.spreadsheet.worksheet, sheet_name)
 
         # Get the column count to determine range
         num_cols = len(update.values)
 
         # Update the row using A1 notation
-        # For example, if row_number=2 and num_cols=11, range is "A2:K2"
-        end_col = chr(ord('A') + num_cols - 1) if num_cols <= 26 else f"A{num_cols}"
-        range_notation = f"A{row_number}:{end_col}{row_number}"
+        # For example, if row_number=2 and num_cols=11, range is "A2:K2" (and "A2:AB2" for 28)
+        range_notation = f"{rowcol_to_a1(row_number, 1)}:{rowcol_to_a1(row_number, num_cols)}"
 
-        worksheet.update(range_notation, [update.values])
+        await asyncio.to_thread(worksheet.update, range_notation, [update.values])
+        SheetsService.bump_revision()
 
         return {
             "success": True,
             "message": f"Row {row_number} updated successfully"
         }
     except Exception as e:
-        print(f"❌ Error updating row {row_number} in '{sheet_name}': {e}")
+        logger.exception("Error updating row %s in '%s'", row_number, sheet_name)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/{sheet_name}/batch")
+async def batch_update(sheet_name: str, update: BatchUpdate):
+    """
+    Update several cells/ranges in the sheet with a single Sheets API call
+
+    Args:
+        sheet_name: Name of the sheet
+        update: Range updates (A1 ranges relative to the sheet)
+    """
+    try:
+        sheets_service = get_sheets_service()
+        body = {
+            "valueInputOption": "USER_ENTERED",
+            "data": [
+                {"range": absolute_range_name(sheet_name, u.range), "values": u.values}
+                for u in update.updates
+            ],
+        }
+        await asyncio.to_thread(sheets_service.spreadsheet.values_batch_update, body)
+        SheetsService.bump_revision()
+
+        return {
+            "success": True,
+            "message": f"{len(update.updates)} ranges updated successfully"
+        }
+    except Exception as e:
+        logger.exception("Error batch updating '%s'", sheet_name)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -172,11 +306,12 @@ async def delete_row(sheet_name: str, row_number: int):
         if row_number <= 1:
             raise HTTPException(status_code=400, detail="Cannot delete header row")
 
-        sheets_service = SheetsService()
-        worksheet = sheets_service.spreadsheet.worksheet(sheet_name)
+        sheets_service = get_sheets_service()
+        worksheet = await asyncio.to_thread(sheets_service.spreadsheet.worksheet, sheet_name)
 
         # Delete the row
-        worksheet.delete_rows(row_number)
+        await asyncio.to_thread(worksheet.delete_rows, row_number)
+        SheetsService.bump_revision()
 
         return {
             "success": True,
@@ -185,7 +320,7 @@ async def delete_row(sheet_name: str, row_number: int):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error deleting row {row_number} in '{sheet_name}': {e}")
+        logger.exception("Error deleting row %s in '%s'", row_number, sheet_name)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -199,16 +334,17 @@ async def add_row(sheet_name: str, update: RowUpdate):
         update: Values for the new row
     """
     try:
-        sheets_service = SheetsService()
-        worksheet = sheets_service.spreadsheet.worksheet(sheet_name)
+        sheets_service = get_sheets_service()
+        worksheet = await asyncio.to_thread(sheets_service.spreadsheet.worksheet, sheet_name)
 
         # Append the row
-        worksheet.append_row(update.values)
+        await asyncio.to_thread(worksheet.append_row, update.values)
+        SheetsService.bump_revision()
 
         return {
             "success": True,
             "message": "Row added successfully"
         }
     except Exception as e:
-        print(f"❌ Error adding row to '{sheet_name}': {e}")
+        logger.exception("Error adding row to '%s'", sheet_name)
         raise HTTPException(status_code=500, detail=str(e))
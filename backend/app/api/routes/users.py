@@ -1,14 +1,37 @@
 """
 User management endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel
 from typing import List, Optional as TypingOptional
-from app.services.supabase_service import SupabaseService
-from app.core.auth import get_current_user, get_current_user_optional
+from app.services.supabase_service import SupabaseService, get_supabase_service
+from app.core.auth import (
+    cache_active_spreadsheet,
+    get_current_user,
+    get_current_user_optional,
+    invalidate_user_cache,
+)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Default categories for unauthenticated access, serialized once at import
+DEFAULT_CATEGORIES = (
+    {"name": "Groceries", "icon": "🛒", "color": "#10b981"},
+    {"name": "Dining", "icon": "🍽️", "color": "#f59e0b"},
+    {"name": "Transport", "icon": "🚗", "color": "#3b82f6"},
+    {"name": "Utilities", "icon": "💡", "color": "#8b5cf6"},
+    {"name": "Entertainment", "icon": "🎬", "color": "#ec4899"},
+    {"name": "Shopping", "icon": "🛍️", "color": "#f97316"},
+    {"name": "Health", "icon": "💊", "color": "#ef4444"},
+    {"name": "Other", "icon": "📦", "color": "#6b7280"},
+    {"name": "Produce", "icon": "🥬", "color": "#22c55e"},
+    {"name": "Bakery", "icon": "🍞", "color": "#fbbf24"},
+    {"name": "Meat", "icon": "🥩", "color": "#dc2626"},
+)
+DEFAULT_CATEGORIES_JSON = orjson.dumps({"categories": DEFAULT_CATEGORIES})
+
 
 # Pydantic models
 class SpreadsheetCreate(BaseModel):
@@ -29,6 +52,15 @@ class CategoryUpdate(BaseModel):
     color: str | None = None
 
 
+class CategoryBatchItem(CategoryUpdate):
+    id: str
+    is_active: bool | None = None
+
+
+class CategoryBatchUpdate(BaseModel):
+    updates: List[CategoryBatchItem]
+
+
 @router.get("/me")
 async def get_current_user_info(user: dict = Depends(get_current_user)):
     """Get current authenticated user information"""
@@ -43,8 +75,11 @@ async def get_current_user_info(user: dict = Depends(get_current_user)):
 @router.get("/spreadsheets")
 async def get_user_spreadsheets(user: dict = Depends(get_current_user)):
     """Get all spreadsheets for current user"""
-    supabase = SupabaseService()
-    spreadsheets = supabase.get_user_spreadsheets(user["id"])
+    supabase = get_supabase_service()
+    # The active sheet comes out of the same query, so prime its cache for the next request
+    spreadsheets, active = await asyncio.to_thread(supabase.get_spreadsheets_with_active, user["id"])
+    if active:
+        cache_active_spreadsheet(user["id"], active)
     return {"spreadsheets": spreadsheets}
 
 
@@ -54,7 +89,7 @@ async def create_spreadsheet(
     user: dict = Depends(get_current_user)
 ):
     """Create a new spreadsheet for the user"""
-    supabase = SupabaseService()
+    supabase = get_supabase_service()
 
     # Create spreadsheet
     spreadsheet = supabase.create_spreadsheet(
@@ -71,6 +106,7 @@ async def create_spreadsheet(
     user_spreadsheets = supabase.get_user_spreadsheets(user["id"])
     if len(user_spreadsheets) == 1:
         supabase.set_active_spreadsheet(user["id"], spreadsheet["id"])
+        invalidate_user_cache(user["id"])
         spreadsheet["is_active"] = True
 
     return spreadsheet
@@ -82,12 +118,14 @@ async def set_active_spreadsheet(
     user: dict = Depends(get_current_user)
 ):
     """Set a spreadsheet as active"""
-    supabase = SupabaseService()
+    supabase = get_supabase_service()
     success = supabase.set_active_spreadsheet(user["id"], sheet_id)
 
     if not success:
         raise HTTPException(status_code=500, detail="Failed to set active spreadsheet")
 
+    invalidate_user_cache(user["id"])
+
     return {"status": "success", "active_sheet_id": sheet_id}
 
 
@@ -102,27 +140,21 @@ async def get_user_categories(
         all: If True, return all categories (active + inactive). If False, return only active.
     """
     if user:
-        supabase = SupabaseService()
+        supabase = get_supabase_service()
         # active_only=not all means: if all=True, active_only=False (get all), if all=False, active_only=True (get active only)
         categories = supabase.get_user_categories(user["id"], active_only=not all)
         if categories:
             return {"categories": categories}
 
     # Return default categories if no user (for unauthenticated access)
-    default_categories = [
-        {"name": "Groceries", "icon": "🛒", "color": "#10b981"},
-        {"name": "Dining", "icon": "🍽️", "color": "#f59e0b"},
-        {"name": "Transport", "icon": "🚗", "color": "#3b82f6"},
-        {"name": "Utilities", "icon": "💡", "color": "#8b5cf6"},
-        {"name": "Entertainment", "icon": "🎬", "color": "#ec4899"},
-        {"name": "Shopping", "icon": "🛍️", "color": "#f97316"},
-        {"name": "Health", "icon": "💊", "color": "#ef4444"},
-        {"name": "Other", "icon": "📦", "color": "#6b7280"},
-        {"name": "Produce", "icon": "🥬", "color": "#22c55e"},
-        {"name": "Bakery", "icon": "🍞", "color": "#fbbf24"},
-        {"name": "Meat", "icon": "🥩", "color": "#dc2626"},
-    ]
-    return {"categories": default_categories}
+    if user:
+        return Response(content=DEFAULT_CATEGORIES_JSON, media_type="application/json")
+    return Response(
+        content=DEFAULT_CATEGORIES_JSON,
+        media_type="application/json",
+        # The same URL returns per-user data when authenticated
+        headers={"Cache-Control": "public, max-age=3600", "Vary": "Authorization"},
+    )
 
 
 @router.post("/categories")
@@ -131,7 +163,7 @@ async def create_category(
     user: dict = Depends(get_current_user)
 ):
     """Create a custom category"""
-    supabase = SupabaseService()
+    supabase = get_supabase_service()
     category = supabase.create_category(
         user_id=user["id"],
         name=data.name,
@@ -141,10 +173,26 @@ async def create_category(
 
     if not category:
         raise HTTPException(status_code=500, detail="Failed to create category")
+    SupabaseService.invalidate_category_names(user["id"])
 
     return category
 
 
+@router.put("/categories/batch")
+async def batch_update_categories(
+    data: CategoryBatchUpdate,
+    user: dict = Depends(get_current_user)
+):
+    """Update several categories in one request"""
+    supabase = get_supabase_service()
+
+    updates = [item.model_dump(exclude_none=True) for item in data.updates]
+    categories = supabase.batch_update_categories(user["id"], updates)
+    SupabaseService.invalidate_category_names(user["id"])
+
+    return {"categories": categories}
+
+
 @router.put("/categories/{category_id}")
 async def update_category(
     category_id: str,
@@ -152,7 +200,7 @@ async def update_category(
     user: dict = Depends(get_current_user)
 ):
     """Update a category"""
-    supabase = SupabaseService()
+    supabase = get_supabase_service()
 
     updates = {}
     if data.name is not None:
@@ -166,6 +214,7 @@ async def update_category(
 
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
+    SupabaseService.invalidate_category_names(user["id"])
 
     return category
 
@@ -176,20 +225,14 @@ async def toggle_category(
     user: dict = Depends(get_current_user)
 ):
     """Toggle category active status"""
-    supabase = SupabaseService()
+    supabase = get_supabase_service()
 
-    # Get current category to toggle its status
-    categories = supabase.get_user_categories(user["id"], active_only=False)
-    category = next((c for c in categories if c["id"] == category_id), None)
-
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-
-    # Toggle the is_active status
-    updated = supabase.update_category(category_id, {"is_active": not category["is_active"]})
+    # Flip is_active in a single call (scoped to the user's own categories)
+    updated = supabase.toggle_category(category_id, user["id"])
 
     if not updated:
-        raise HTTPException(status_code=500, detail="Failed to toggle category")
+        raise HTTPException(status_code=404, detail="Category not found")
+    SupabaseService.invalidate_category_names(user["id"])
 
     return updated
 
@@ -200,11 +243,12 @@ async def delete_category(
     user: dict = Depends(get_current_user)
 ):
     """Delete (soft delete) a category"""
-    supabase = SupabaseService()
+    supabase = get_supabase_service()
     success = supabase.delete_category(category_id)
 
     if not success:
         raise HTTPException(status_code=404, detail="Category not found")
+    SupabaseService.invalidate_category_names(user["id"])
 
     return {"status": "deleted", "category_id": category_id}
 
@@ -212,7 +256,7 @@ async def delete_category(
 @router.get("/preferences")
 async def get_user_preferences(user: dict = Depends(get_current_user)):
     """Get user preferences"""
-    supabase = SupabaseService()
+    supabase = get_supabase_service()
     preferences = supabase.get_user_preferences(user["id"])
     return preferences or {}
 
@@ -223,7 +267,7 @@ async def update_user_preferences(
     user: dict = Depends(get_current_user)
 ):
     """Update user preferences"""
-    supabase = SupabaseService()
+    supabase = get_supabase_service()
     success = supabase.update_user_preferences(user["id"], preferences)
 
     if not success:
@@ -1,13 +1,88 @@
 """
 Authentication and authorization utilities
 """
-from fastapi import HTTPException, Header, Depends
+import base64
+import hashlib
+import json
+import time
+import jwt
+from fastapi import HTTPException, Header, Depends, Request
 from typing import Optional
 from app.core.config import get_settings
-from app.services.supabase_service import SupabaseService, get_supabase_client
+from app.services.supabase_service import get_supabase_service, get_supabase_client
+from app.utils.ttl_cache import TTLCache
 
 settings = get_settings()
 
+# Verified access tokens -> user ID, so Supabase is asked at most once per token per TTL.
+# Entries never outlive the token's own expiry.
+TOKEN_CACHE_TTL = 300
+_token_cache = TTLCache(ttl=TOKEN_CACHE_TTL, maxsize=10_000)
+
+# User rows and active spreadsheets by user ID; short-lived since they can change
+USER_CACHE_TTL = 60
+_user_cache = TTLCache(ttl=USER_CACHE_TTL, maxsize=10_000)
+_active_spreadsheet_cache = TTLCache(ttl=USER_CACHE_TTL, maxsize=10_000)
+
+# Supabase access tokens are well under this; anything longer is rejected unverified
+MAX_TOKEN_LENGTH = 4096
+
+
+def is_well_formed_token(token: str) -> bool:
+    """Cheap structural JWT check (header.payload.signature, ASCII, bounded size)"""
+    return len(token) < MAX_TOKEN_LENGTH and token.isascii() and token.count(".") == 2
+
+
+def _token_expiry(token: str) -> Optional[float]:
+    """Read the `exp` claim of an already-verified JWT (no signature check)"""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except Exception:
+        return None
+
+
+def verify_token(token: str) -> str:
+    """
+    Resolve a Supabase access token to its user ID
+
+    Tokens are verified locally with the project's JWT secret when configured,
+    otherwise with Supabase; either way the result is cached until expiry.
+
+    Args:
+        token: Bearer token (without the "Bearer " prefix)
+
+    Returns:
+        Supabase user ID
+
+    Raises:
+        Exception: If the token is invalid or expired
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    user_id = _token_cache.get(key)
+    if user_id is not None:
+        return user_id
+
+    if settings.supabase_jwt_secret:
+        claims = jwt.decode(
+            token, settings.supabase_jwt_secret, algorithms=["HS256"], audience="authenticated"
+        )
+        user_id, expires_at = claims["sub"], float(claims["exp"])
+    else:
+        supabase = get_supabase_client()
+        user_response = supabase.auth.get_user(token)
+
+        if not user_response or not user_response.user:
+            raise ValueError("Invalid token")
+
+        user_id, expires_at = user_response.user.id, _token_expiry(token)
+
+    ttl = TOKEN_CACHE_TTL if expires_at is None else min(TOKEN_CACHE_TTL, expires_at - time.time())
+    if ttl > 0:
+        _token_cache.set(key, user_id, ttl=ttl)
+    return user_id
+
 
 async def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
     """
@@ -30,25 +105,43 @@ async def get_current_user_id(authorization: Optional[str] = Header(None)) -> st
 
     token = authorization.replace("Bearer ", "")
 
+    # Fail fast on garbage before hashing it or calling Supabase
+    if not is_well_formed_token(token):
+        raise HTTPException(status_code=401, detail="Malformed token")
+
     try:
-        # Verify token with Supabase
-        supabase = get_supabase_client()
-        user_response = supabase.auth.get_user(token)
+        return verify_token(token)
+    except Exception as e:
+        raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
 
-        if not user_response or not user_response.user:
-            raise HTTPException(status_code=401, detail="Invalid token")
 
-        return user_response.user.id
+def load_user(user_id: str) -> Optional[dict]:
+    """Get a user row from Supabase, cached for USER_CACHE_TTL seconds"""
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = get_supabase_service().get_user_by_id(user_id)
+        if user:
+            _user_cache.set(user_id, user)
+    return user
+
 
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
+def cache_active_spreadsheet(user_id: str, spreadsheet: dict) -> None:
+    """Remember a user's active spreadsheet fetched elsewhere, sparing get_user_active_spreadsheet a query"""
+    _active_spreadsheet_cache.set(user_id, spreadsheet)
 
 
-async def get_current_user(user_id: str = Depends(get_current_user_id)):
+def invalidate_user_cache(user_id: str) -> None:
+    """Drop cached user data after the user's profile or active spreadsheet changes"""
+    _user_cache.pop(user_id)
+    _active_spreadsheet_cache.pop(user_id)
+
+
+async def get_current_user(request: Request, user_id: str = Depends(get_current_user_id)):
     """
-    Get current user from Supabase database
+    Get current user from Supabase database (resolved once per request)
 
     Args:
+        request: Incoming request; the user is stashed on request.state
         user_id: Supabase user ID from token
 
     Returns:
@@ -57,33 +150,41 @@ async def get_current_user(user_id: str = Depends(get_current_user_id)):
     Raises:
         HTTPException: If user not found
     """
-    supabase_service = SupabaseService()
-    user = supabase_service.get_user_by_id(user_id)
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+
+    user = load_user(user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found in database")
 
+    request.state.user = user
     return user
 
 
-async def get_current_user_optional(authorization: Optional[str] = Header(None)) -> Optional[dict]:
+async def get_current_user_optional(
+    request: Request, authorization: Optional[str] = Header(None)
+) -> Optional[dict]:
     """
     Get current user if authenticated, None otherwise (no error)
     """
     if not authorization or not authorization.startswith("Bearer "):
         return None
 
-    try:
-        token = authorization.replace("Bearer ", "")
-        supabase = get_supabase_client()
-        user_response = supabase.auth.get_user(token)
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
 
-        if not user_response or not user_response.user:
-            return None
+    token = authorization.replace("Bearer ", "")
+    if not is_well_formed_token(token):
+        return None
 
-        user_id = user_response.user.id
-        supabase_service = SupabaseService()
-        user = supabase_service.get_user_by_id(user_id)
+    try:
+        user_id = verify_token(token)
+        user = load_user(user_id)
+        if user:
+            request.state.user = user
         return user
     except:
         return None
@@ -102,8 +203,11 @@ async def get_user_active_spreadsheet(user: dict = Depends(get_current_user)):
     Raises:
         HTTPException: If no active spreadsheet found
     """
-    supabase_service = SupabaseService()
-    spreadsheet = supabase_service.get_active_spreadsheet(user["id"])
+    spreadsheet = _active_spreadsheet_cache.get(user["id"])
+    if spreadsheet is None:
+        spreadsheet = get_supabase_service().get_active_spreadsheet(user["id"])
+        if spreadsheet:
+            _active_spreadsheet_cache.set(user["id"], spreadsheet)
 
     if not spreadsheet:
         raise HTTPException(
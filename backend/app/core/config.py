@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     # API Configuration
     app_name: str = "Budget Buddy API"
     debug: bool = True
+    log_level: str = "INFO"  # DEBUG enables per-request upload/image tracing
 
     # Google API
     google_api_key: str
@@ -26,6 +27,7 @@ class Settings(BaseSettings):
     supabase_url: Optional[str] = None
     supabase_key: Optional[str] = None
     supabase_anon_key: Optional[str] = None
+    supabase_jwt_secret: Optional[str] = None  # Verify access tokens locally when set
 
     # CORS
     cors_origins: list = [
@@ -37,6 +39,27 @@ class Settings(BaseSettings):
     # Upload Configuration
     upload_dir: str = "uploads"
     max_upload_size: int = 10 * 1024 * 1024  # 10MB
+    warmup_image_pipeline: bool = True  # Exercise JPEG/PDF codecs at startup
+
+    # Extraction cache (content-addressed Gemini results)
+    extraction_cache_dir: str = "cache/extractions"
+
+    # Async upload jobs, shared by all worker processes on the host
+    job_store_dir: str = "cache/jobs"
+
+    # Threads available for blocking Sheets/Gemini/Supabase calls
+    blocking_io_workers: int = 20
+
+    # Max concurrent per-worksheet Sheets requests (Google quota is ~60 req/min/user)
+    sheets_concurrency: int = 8
+    sheets_requests_per_minute: int = 60
+
+    # Max concurrent Gemini uploads / generate_content calls across the process
+    gemini_upload_concurrency: int = 8
+    gemini_generate_concurrency: int = 4
+
+    # Async upload jobs extracted at once (each holds one extraction thread)
+    upload_concurrency: int = 8
 
     class Config:
         env_file = ".env"
@@ -2,16 +2,37 @@
 FastAPI main application
 Budget Buddy - Receipt Processing and Budget Management API
 """
-from fastapi import FastAPI
+import asyncio
+import logging
+import logging.handlers
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import get_settings
 from app.api.routes import receipts_router, analysis_router, budgets_router
 from app.api.routes.users import router as users_router
 from app.api.routes.sheets import router as sheets_router
+from app.services.gemini_service import warm_up_image_pipeline
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Handlers only enqueue records; a listener thread does the formatting and stream
+# writes, so request handlers never block on the stderr lock during error bursts
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+log_listener = logging.handlers.QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+# The queued message is formatted again by _log_handler, so it only needs the text
+# (plus any traceback); basicConfig would otherwise prefix it with level and name
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=settings.log_level.upper(), handlers=[_queue_handler])
+log_listener.start()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -19,8 +40,20 @@ app = FastAPI(
     debug=settings.debug,
     description="Receipt processing and budget management API powered by Gemini AI",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+# Map unhandled route errors to a 500 response. Registered before CORS so the
+# CORS middleware wraps it and error responses still carry CORS headers.
+@app.middleware("http")
+async def unhandled_exception_handler(request: Request, call_next):
+    try:
+        return await call_next(request)
+    except Exception as e:
+        logger.exception("Unhandled error on %s %s", request.method, request.url.path)
+        return ORJSONResponse(status_code=500, content={"detail": f"Internal server error: {str(e)}"})
+
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -38,10 +71,32 @@ app.include_router(users_router, prefix="/api")
 app.include_router(sheets_router, prefix="/api")
 
 
+@app.on_event("startup")
+async def configure_executor():
+    """Cap the threads used by asyncio.to_thread for blocking API calls"""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.blocking_io_workers, thread_name_prefix="blocking-io")
+    )
+
+
+@app.on_event("startup")
+async def warm_image_pipeline():
+    """Warm the image/PDF codecs in the background; startup doesn't wait for it"""
+    if settings.warmup_image_pipeline:
+        asyncio.get_running_loop().run_in_executor(None, warm_up_image_pipeline)
+
+
+@app.on_event("shutdown")
+async def flush_logs():
+    """Drain queued log records before the process exits"""
+    log_listener.stop()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "message": "Budget Buddy API",
             "version": "1.0.0",
@@ -54,7 +109,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return JSONResponse(content={"status": "healthy"})
+    return ORJSONResponse(content={"status": "healthy"})
 
 
 if __name__ == "__main__":
@@ -3,7 +3,6 @@ Pydantic models for analysis, budgets, and goals
 """
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-from datetime import datetime
 
 
 class CategorySpending(BaseModel):
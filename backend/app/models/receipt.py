@@ -4,7 +4,6 @@ Ported from CLI script with additional fields for web app
 """
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
 
 
 class MerchantDetails(BaseModel):
@@ -26,6 +26,7 @@ class UploadJob(BaseModel):
     error: Optional[str] = None
     receipt_data: Optional[Dict[str, Any]] = None
     extraction_log: Optional[Dict[str, Any]] = None
+    batch_name: Optional[str] = None  # Gemini batch job, if extracted via the Batch API
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
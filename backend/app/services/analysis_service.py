@@ -1,10 +1,15 @@
 """
 Analysis service for trends, forecasts, and insights
 """
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Callable, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-import statistics
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+import logging
+import math
+import pandas as pd
 from app.models.analysis import (
     CategorySpending,
     TimeSeriesPoint,
@@ -15,6 +20,138 @@ from app.models.analysis import (
     Budget,
 )
 from app.services.sheets_service import SheetsService
+from app.utils.date_parser import parse_sheet_date
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# A dashboard load hits several analysis endpoints back to back; they share one
+# receipts fetch. Keys include the data revision, so app writes invalidate it.
+RECEIPTS_CACHE_TTL = 5.0
+
+
+def _last_month_range(now: datetime) -> Tuple[datetime, datetime]:
+    filter_end = now.replace(day=1) - timedelta(days=1)
+    return filter_end.replace(day=1), filter_end
+
+
+# Named date filters -> (start, end) relative to now; None means unbounded
+FILTER_RANGES: Dict[str, Callable[[datetime], Tuple[Optional[datetime], Optional[datetime]]]] = {
+    "last_7": lambda now: (now - timedelta(days=7), None),
+    "last_30": lambda now: (now - timedelta(days=30), None),
+    "last_90": lambda now: (now - timedelta(days=90), None),
+    "this_month": lambda now: (now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), None),
+    "last_month": _last_month_range,
+    "this_year": lambda now: (now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0), None),
+}
+
+
+def _resolve_filter_range(
+    key: Optional[str], start_date: str = None, end_date: str = None
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Resolve a named date filter ("last_30", "custom", ...) to a (start, end) range
+
+    Args:
+        key: Filter name; unknown names and "all" mean no date filter
+        start_date: Custom start date (YYYY-MM-DD), used when key is "custom"
+        end_date: Custom end date (YYYY-MM-DD), optional
+
+    Returns:
+        Tuple of (start, end), either of which may be None
+    """
+    if key == "custom":
+        filter_start = filter_end = None
+        if start_date:
+            try:
+                filter_start = datetime.strptime(start_date, "%Y-%m-%d")
+                if end_date:
+                    filter_end = datetime.strptime(end_date, "%Y-%m-%d")
+            except ValueError:
+                pass
+        return filter_start, filter_end
+
+    resolve = FILTER_RANGES.get(key)
+    return resolve(datetime.now()) if resolve else (None, None)
+
+
+class ReceiptRow(NamedTuple):
+    """A validated receipt line, normalized once from its sheet row"""
+    date: datetime
+    category: str
+    amount: float
+
+
+def _amount(value: Any) -> Optional[float]:
+    """Parse a receipt total, None if it's empty, non-numeric, zero or negative"""
+    try:
+        amount = float(value)
+    except (ValueError, TypeError):
+        return None
+    return amount if amount > 0 else None
+
+
+# Period keys are derived from heavily repeated dates; format each one once
+@lru_cache(maxsize=4096)
+def _month_key(date: datetime) -> str:
+    return date.strftime("%Y-%m")
+
+
+@lru_cache(maxsize=4096)
+def _week_key(date: datetime) -> str:
+    return date.strftime("%Y-W%U")
+
+
+# Budgets mostly share a few period settings, and the strings only change daily
+@lru_cache(maxsize=256)
+def _period_info(
+    period_type: str, period: str, start_date: Optional[str], end_date: Optional[str], today: date
+) -> Tuple[str, str]:
+    """Display string and reset date for a budget period as of `today`"""
+    if period_type == "rolling":
+        if period == "weekly":
+            days_ago = (today - timedelta(days=7)).strftime("%b %d")
+            today_str = today.strftime("%b %d, %Y")
+            return f"Rolling 7 days ({days_ago} - {today_str})", "Daily"
+        else:
+            days_ago = (today - timedelta(days=30)).strftime("%b %d")
+            today_str = today.strftime("%b %d, %Y")
+            return f"Rolling 30 days ({days_ago} - {today_str})", "Daily"
+
+    elif period_type == "calendar_month":
+        month_start = today.replace(day=1)
+        if today.month == 12:
+            month_end = today.replace(day=31)
+            next_reset = today.replace(year=today.year + 1, month=1, day=1)
+        else:
+            next_month = today.replace(month=today.month + 1, day=1)
+            month_end = next_month - timedelta(days=1)
+            next_reset = next_month
+
+        period_str = f"{month_start.strftime('%b %d')} - {month_end.strftime('%b %d, %Y')}"
+        reset_str = next_reset.strftime("%b %d, %Y")
+        return period_str, reset_str
+
+    elif period_type == "calendar_week":
+        start_of_week = today - timedelta(days=today.weekday())
+        end_of_week = start_of_week + timedelta(days=6)
+        next_week = start_of_week + timedelta(days=7)
+
+        period_str = f"{start_of_week.strftime('%b %d')} - {end_of_week.strftime('%b %d, %Y')}"
+        reset_str = next_week.strftime("%b %d, %Y")
+        return period_str, reset_str
+
+    elif period_type == "custom" and start_date and end_date:
+        try:
+            start = datetime.strptime(start_date, "%Y-%m-%d")
+            end = datetime.strptime(end_date, "%Y-%m-%d")
+            period_str = f"{start.strftime('%b %d')} - {end.strftime('%b %d, %Y')}"
+            return period_str, "Does not reset"
+        except:
+            pass
+
+    # Default fallback
+    return "Current month", "Next month"
 
 
 class AnalysisService:
@@ -22,17 +159,113 @@ class AnalysisService:
 
     def __init__(self):
         self.sheets_service = SheetsService()
+        self._receipts_cache = TTLCache(ttl=RECEIPTS_CACHE_TTL, maxsize=8)
+
+    def _get_receipts(self) -> List[Dict[str, Any]]:
+        """All receipt rows, shared across analysis calls for RECEIPTS_CACHE_TTL seconds"""
+        key = ("receipts", SheetsService.get_revision_id())
+        receipts = self._receipts_cache.get(key)
+        if receipts is None:
+            receipts = self.sheets_service.get_all_receipts()
+            self._receipts_cache.set(key, receipts)
+        return receipts
+
+    def _get_date_index(self) -> Tuple[List[datetime], List[ReceiptRow]]:
+        """
+        Normalized receipt rows sorted by date, with their dates in a parallel list
+
+        Built once per cached receipts fetch: each sheet row is validated and
+        unpacked into a ReceiptRow a single time, and date-range filters can
+        bisect straight to the matching window instead of scanning every row.
+        """
+        receipts = self._get_receipts()
+        key = ("date_index", id(receipts))
+        cached = self._receipts_cache.get(key)
+        # Keep the source list in the entry so its id can't be reused while cached
+        if cached is not None and cached[0] is receipts:
+            return cached[1]
+        rows = []
+        # Bound once: this loop runs over every sheet row on each refresh
+        parse_date = self._parse_date
+        append = rows.append
+        for receipt in receipts:
+            get = receipt.get
+            # Rows without a usable total are dropped by every analysis, so skip
+            # them before paying for the date parse
+            amount = _amount(get("Total Price"))
+            if amount is None:
+                continue
+            append(ReceiptRow(parse_date(get("Date", "")), get("Category", "Other"), amount))
+        skipped = len(receipts) - len(rows)
+        if skipped:
+            # One summary line per fetch rather than one line per bad row
+            logger.debug("Skipped %d receipt rows without a usable total", skipped)
+        rows.sort(key=attrgetter("date"))
+        index = ([row.date for row in rows], rows)
+        self._receipts_cache.set(key, (receipts, index))
+        return index
+
+    def _get_receipts_dataframe(self) -> pd.DataFrame:
+        """DataFrame of the date index (same row order), cached alongside it"""
+        _, rows = self._get_date_index()
+        key = ("dataframe", id(rows))
+        cached = self._receipts_cache.get(key)
+        if cached is not None and cached[0] is rows:
+            return cached[1]
+        df = pd.DataFrame.from_records(rows, columns=ReceiptRow._fields)
+        self._receipts_cache.set(key, (rows, df))
+        return df
+
+    def _date_bounds(self, start: datetime = None, end: datetime = None) -> Tuple[int, int]:
+        """Positions [lo, hi) of the date index within start..end (inclusive)"""
+        dates, _ = self._get_date_index()
+        lo = bisect_left(dates, start) if start else 0
+        hi = bisect_right(dates, end) if end else len(dates)
+        return lo, hi
+
+    def _slice_by_date(self, start: datetime = None, end: datetime = None) -> List[ReceiptRow]:
+        """Receipt rows dated within start..end, oldest first"""
+        _, rows = self._get_date_index()
+        lo, hi = self._date_bounds(start, end)
+        return rows[lo:hi]
 
     def _parse_date(self, date_str: str) -> datetime:
-        """Parse date string in DD-MM-YYYY format"""
-        try:
-            return datetime.strptime(date_str, "%d-%m-%Y")
-        except:
-            # Fallback formats
-            try:
-                return datetime.strptime(date_str, "%Y-%m-%d")
-            except:
-                return datetime.now()
+        """Parse date string in DD-MM-YYYY format, falling back to now"""
+        # The now() fallback stays outside the cache so it's never frozen in
+        return parse_sheet_date(date_str) or datetime.now()
+
+    def _iter_clean_receipts(
+        self,
+        rows: Iterable[ReceiptRow],
+        categories: Sequence[str] = None,
+        min_amount: float = None,
+        max_amount: float = None,
+    ) -> Iterator[ReceiptRow]:
+        """
+        Filter receipt rows by category and amount in a single pass
+
+        Rows are already validated by the date index, and date ranges are
+        applied beforehand with _slice_by_date.
+
+        Yields:
+            Each matching ReceiptRow (unpacks as date, category, amount)
+        """
+        # Resolve the optional filters once so the row loop has no None checks
+        if not categories and min_amount is None and max_amount is None:
+            yield from rows
+            return
+
+        low = -math.inf if min_amount is None else min_amount
+        high = math.inf if max_amount is None else max_amount
+        if categories:
+            category_filter = frozenset(categories)
+            for row in rows:
+                if low <= row.amount <= high and row.category in category_filter:
+                    yield row
+        else:
+            for row in rows:
+                if low <= row.amount <= high:
+                    yield row
 
     def get_trends(
         self,
@@ -53,9 +286,7 @@ class AnalysisService:
         Returns:
             TrendData object with time series
         """
-        receipts = self.sheets_service.get_all_receipts()
-
-        if not receipts:
+        if not self._get_receipts():
             # Return empty trends if no data
             return TrendData(
                 period=period,
@@ -64,91 +295,36 @@ class AnalysisService:
                 total_by_period=[],
             )
 
-        # Calculate date range based on filter
-        now = datetime.now()
-        filter_start = None
-        filter_end = None
-
-        if date_filter == "last_7":
-            filter_start = now - timedelta(days=7)
-        elif date_filter == "last_30":
-            filter_start = now - timedelta(days=30)
-        elif date_filter == "last_90":
-            filter_start = now - timedelta(days=90)
-        elif date_filter == "this_month":
-            filter_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        elif date_filter == "last_month":
-            first_of_this_month = now.replace(day=1)
-            filter_end = first_of_this_month - timedelta(days=1)
-            filter_start = filter_end.replace(day=1)
-        elif date_filter == "this_year":
-            filter_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        elif date_filter == "custom" and start_date:
-            try:
-                filter_start = datetime.strptime(start_date, "%Y-%m-%d")
-                if end_date:
-                    filter_end = datetime.strptime(end_date, "%Y-%m-%d")
-            except ValueError:
-                pass
+        filter_start, filter_end = _resolve_filter_range(date_filter, start_date, end_date)
 
-        # Group by category and period
-        category_data = defaultdict(lambda: defaultdict(float))
-        total_by_period = defaultdict(float)
-        categories_set = set()
+        # The frame is date-sorted, so the date filter is a positional slice
+        lo, hi = self._date_bounds(filter_start, filter_end)
+        df = self._get_receipts_dataframe().iloc[lo:hi]
 
-        for receipt in receipts:
-            try:
-                date = self._parse_date(receipt.get("Date", ""))
-
-                # Apply date filter
-                if filter_start and date < filter_start:
-                    continue
-                if filter_end and date > filter_end:
-                    continue
-
-                category = receipt.get("Category", "Other")
-                # Handle potential empty or non-numeric values
-                total_price_str = receipt.get("Total Price", 0)
-                if isinstance(total_price_str, str) and not total_price_str.strip():
-                    continue  # Skip entries with empty total price
-                amount = float(total_price_str)
-
-                if amount <= 0:
-                    continue  # Skip zero or negative amounts
-
-                categories_set.add(category)
-
-                # Determine period key
-                if period == "monthly":
-                    period_key = date.strftime("%Y-%m")
-                else:  # weekly
-                    period_key = date.strftime("%Y-W%U")
-
-                category_data[category][period_key] += amount
-                total_by_period[period_key] += amount
-            except (ValueError, TypeError) as e:
-                # Skip invalid entries
-                print(f"⚠️  Skipping invalid receipt entry: {e}")
-                continue
+        # Group by category and period; the groupby sorts the keys once, so each
+        # category's series comes out already in period order
+        period_fn = _month_key if period == "monthly" else _week_key
+        period_keys = df["date"].map(period_fn)
+        by_category = df.groupby([df["category"], period_keys])["amount"].sum()
+        # Period totals roll up from the small category x period table, not the rows
+        by_period = by_category.groupby(level=1).sum()
 
         # Convert to time series format
         data = {}
-        for category in categories_set:
-            time_series = [
-                TimeSeriesPoint(date=period_key, amount=amount, category=category)
-                for period_key, amount in sorted(category_data[category].items())
-            ]
-            data[category] = time_series
+        for (category, period_key), amount in by_category.items():
+            data.setdefault(category, []).append(
+                TimeSeriesPoint(date=period_key, amount=float(amount), category=category)
+            )
 
         # Total time series
         total_series = [
-            TimeSeriesPoint(date=period_key, amount=amount)
-            for period_key, amount in sorted(total_by_period.items())
+            TimeSeriesPoint(date=period_key, amount=float(amount))
+            for period_key, amount in by_period.items()
         ]
 
         return TrendData(
             period=period,
-            categories=list(categories_set),
+            categories=list(data),
             data=data,
             total_by_period=total_series,
         )
@@ -160,9 +336,7 @@ class AnalysisService:
         Returns:
             ForecastData object
         """
-        receipts = self.sheets_service.get_all_receipts()
-
-        if not receipts:
+        if not self._get_receipts():
             # Return empty forecast if no data
             return ForecastData(
                 period="next_month",
@@ -172,19 +346,13 @@ class AnalysisService:
                 based_on_months=0,
             )
 
-        # Get last 3 months data
-        three_months_ago = datetime.now() - timedelta(days=90)
-        recent_receipts = []
+        # Monthly totals per category over the last 3 months (a positional slice
+        # of the date-sorted frame), aggregated in pandas
+        lo, hi = self._date_bounds(datetime.now() - timedelta(days=90))
+        df = self._get_receipts_dataframe().iloc[lo:hi]
+        monthly = df.groupby([df["category"], df["date"].map(_month_key)])["amount"].sum()
 
-        for r in receipts:
-            try:
-                receipt_date = self._parse_date(r.get("Date", ""))
-                if receipt_date >= three_months_ago:
-                    recent_receipts.append(r)
-            except Exception:
-                continue
-
-        if not recent_receipts:
+        if monthly.empty:
             # No recent data, return empty forecast
             return ForecastData(
                 period="next_month",
@@ -194,62 +362,26 @@ class AnalysisService:
                 based_on_months=0,
             )
 
-        # Calculate average spending by category
-        category_totals = defaultdict(list)
-        for receipt in recent_receipts:
-            try:
-                date = self._parse_date(receipt.get("Date", ""))
-                month_key = date.strftime("%Y-%m")
-                category = receipt.get("Category", "Other")
-
-                total_price_str = receipt.get("Total Price", 0)
-                if isinstance(total_price_str, str) and not total_price_str.strip():
-                    continue
-                amount = float(total_price_str)
-
-                if amount <= 0:
-                    continue
-
-                category_totals[(category, month_key)] = (
-                    category_totals.get((category, month_key), 0) + amount
-                )
-            except (ValueError, TypeError):
-                continue
-
-        # Calculate forecast per category
-        category_forecasts = {}
-        for (category, month_key), amount in category_totals.items():
-            if category not in category_forecasts:
-                category_forecasts[category] = []
-            category_forecasts[category].append(amount)
-
-        forecasts = []
-        total_forecast = 0
-
-        for category, amounts in category_forecasts.items():
-            avg = statistics.mean(amounts) if amounts else 0
-            total_forecast += avg
-            forecasts.append(
-                CategorySpending(
-                    category=category,
-                    total=avg,
-                    percentage=0,  # Will calculate after
-                    count=len(amounts),
-                    average=avg,
-                )
-            )
-
-        # Calculate percentages
-        for forecast in forecasts:
-            forecast.percentage = (
-                (forecast.total / total_forecast * 100) if total_forecast > 0 else 0
+        # Forecast per category: the mean of its monthly totals
+        per_category = monthly.groupby(level=0).agg(["mean", "count"])
+        total_forecast = float(per_category["mean"].sum())
+
+        forecasts = [
+            CategorySpending(
+                category=category,
+                total=float(avg),
+                percentage=(avg / total_forecast * 100) if total_forecast > 0 else 0,
+                count=int(count),
+                average=float(avg),
             )
+            for category, avg, count in per_category.itertuples()
+        ]
 
         return ForecastData(
             period="next_month",
             forecasts=forecasts,
             total_forecast=total_forecast,
-            confidence=0.7 if len(category_forecasts) > 0 else 0,
+            confidence=0.7,
             based_on_months=3,
         )
 
@@ -258,7 +390,7 @@ class AnalysisService:
         period: str = "all",
         start_date: str = None,
         end_date: str = None,
-        categories: List[str] = None,
+        categories: Sequence[str] = None,
         min_amount: float = None,
         max_amount: float = None,
     ) -> CategoryAnalysis:
@@ -269,16 +401,14 @@ class AnalysisService:
             period: "all", "this_month", "last_month", "last_7", "last_30", "last_90", "this_year", "custom"
             start_date: Custom start date (YYYY-MM-DD)
             end_date: Custom end date (YYYY-MM-DD)
-            categories: List of categories to filter
+            categories: Categories to filter (list or tuple)
             min_amount: Minimum transaction amount
             max_amount: Maximum transaction amount
 
         Returns:
             CategoryAnalysis object
         """
-        receipts = self.sheets_service.get_all_receipts()
-
-        if not receipts:
+        if not self._get_receipts():
             # Return empty analysis if no data
             return CategoryAnalysis(
                 categories=[],
@@ -287,62 +417,21 @@ class AnalysisService:
                 period=period,
             )
 
-        # Calculate date range based on period
-        now = datetime.now()
-        filter_start = None
-        filter_end = None
-
-        if period == "last_7":
-            filter_start = now - timedelta(days=7)
-        elif period == "last_30":
-            filter_start = now - timedelta(days=30)
-        elif period == "last_90":
-            filter_start = now - timedelta(days=90)
-        elif period == "this_month":
-            filter_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        elif period == "last_month":
-            first_of_this_month = now.replace(day=1)
-            filter_end = first_of_this_month - timedelta(days=1)
-            filter_start = filter_end.replace(day=1)
-        elif period == "this_year":
-            filter_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        elif period == "custom" and start_date:
-            try:
-                filter_start = datetime.strptime(start_date, "%Y-%m-%d")
-                if end_date:
-                    filter_end = datetime.strptime(end_date, "%Y-%m-%d")
-            except ValueError:
-                pass
+        filter_start, filter_end = _resolve_filter_range(period, start_date, end_date)
 
-        # Filter receipts
-        filtered_receipts = []
-        for r in receipts:
-            try:
-                receipt_date = self._parse_date(r.get("Date", ""))
-                category = r.get("Category", "Other")
-                total_price_str = r.get("Total Price", 0)
-
-                if isinstance(total_price_str, str) and not total_price_str.strip():
-                    continue
-                amount = float(total_price_str)
-
-                # Apply filters
-                if filter_start and receipt_date < filter_start:
-                    continue
-                if filter_end and receipt_date > filter_end:
-                    continue
-                if categories and category not in categories:
-                    continue
-                if min_amount is not None and amount < min_amount:
-                    continue
-                if max_amount is not None and amount > max_amount:
-                    continue
-
-                filtered_receipts.append(r)
-            except Exception:
-                continue
+        # Filter and aggregate by category in one pass
+        category_total = defaultdict(float)
+        category_count = defaultdict(int)
+        total_spending = 0
 
-        if not filtered_receipts:
+        for _, category, amount in self._iter_clean_receipts(
+            self._slice_by_date(filter_start, filter_end), categories, min_amount, max_amount
+        ):
+            category_total[category] += amount
+            category_count[category] += 1
+            total_spending += amount
+
+        if not category_total:
             # No data for the selected period
             return CategoryAnalysis(
                 categories=[],
@@ -351,45 +440,21 @@ class AnalysisService:
                 period=period,
             )
 
-        # Calculate by category
-        category_data = defaultdict(lambda: {"total": 0, "count": 0})
-        total_spending = 0
-
-        for receipt in filtered_receipts:
-            try:
-                category = receipt.get("Category", "Other")
-                total_price_str = receipt.get("Total Price", 0)
-
-                if isinstance(total_price_str, str) and not total_price_str.strip():
-                    continue
-                amount = float(total_price_str)
-
-                if amount <= 0:
-                    continue
-
-                category_data[category]["total"] += amount
-                category_data[category]["count"] += 1
-                total_spending += amount
-            except (ValueError, TypeError):
-                continue
-
-        # Build category spending list
-        categories = []
-        for category, data in category_data.items():
-            categories.append(
-                CategorySpending(
-                    category=category,
-                    total=data["total"],
-                    percentage=(data["total"] / total_spending * 100)
-                    if total_spending > 0
-                    else 0,
-                    count=data["count"],
-                    average=data["total"] / data["count"] if data["count"] > 0 else 0,
-                )
+        # Build the category spending list in one pass, largest total first. Every
+        # aggregated category has at least one row, so count is never zero.
+        scale = 100 / total_spending if total_spending > 0 else 0
+        categories = [
+            CategorySpending(
+                category=category,
+                total=total,
+                percentage=total * scale,
+                count=category_count[category],
+                average=total / category_count[category],
             )
-
-        # Sort by total descending
-        categories.sort(key=lambda x: x.total, reverse=True)
+            for category, total in sorted(
+                category_total.items(), key=itemgetter(1), reverse=True
+            )
+        ]
 
         top_category = categories[0].category if categories else "None"
 
@@ -414,9 +479,13 @@ class AnalysisService:
         budgets = []
         total_budget = 0
         total_spent = 0
-        now = datetime.now()
+        today = date.today()
+        # Spending for every budget from one shared receipts fetch and one pass
+        spending = self.sheets_service.calculate_budget_spending_bulk(
+            budget_data, receipts=self._get_receipts() if budget_data else None
+        )
 
-        for budget_row in budget_data:
+        for budget_row, current_spend in zip(budget_data, spending):
             category = budget_row.get("Category", "")
             limit = float(budget_row.get("Limit", 0))
             period = budget_row.get("Period", "monthly")
@@ -424,14 +493,12 @@ class AnalysisService:
             start_date = budget_row.get("Start Date") or None
             end_date = budget_row.get("End Date") or None
 
-            # Auto-calculate current spending using SheetsService method
-            current_spend = self.sheets_service.calculate_budget_spending(
-                category, period, period_type, start_date, end_date
-            )
             percentage = (current_spend / limit * 100) if limit > 0 else 0
 
             # Calculate period display and reset date
-            period_display, resets_on = self._calculate_period_info(period_type, period, start_date, end_date)
+            period_display, resets_on = self._calculate_period_info(
+                period_type, period, start_date, end_date, today=today
+            )
 
             budgets.append(
                 Budget(
@@ -462,51 +529,13 @@ class AnalysisService:
             overall_percentage=overall_percentage,
         )
 
-    def _calculate_period_info(self, period_type: str, period: str, start_date: str = None, end_date: str = None):
+    def _calculate_period_info(
+        self,
+        period_type: str,
+        period: str,
+        start_date: str = None,
+        end_date: str = None,
+        today: date = None,
+    ):
         """Calculate display string and reset date for budget period"""
-        now = datetime.now()
-
-        if period_type == "rolling":
-            if period == "weekly":
-                days_ago = (now - timedelta(days=7)).strftime("%b %d")
-                today = now.strftime("%b %d, %Y")
-                return f"Rolling 7 days ({days_ago} - {today})", "Daily"
-            else:
-                days_ago = (now - timedelta(days=30)).strftime("%b %d")
-                today = now.strftime("%b %d, %Y")
-                return f"Rolling 30 days ({days_ago} - {today})", "Daily"
-
-        elif period_type == "calendar_month":
-            month_start = now.replace(day=1)
-            if now.month == 12:
-                month_end = now.replace(day=31)
-                next_reset = now.replace(year=now.year + 1, month=1, day=1)
-            else:
-                next_month = now.replace(month=now.month + 1, day=1)
-                month_end = next_month - timedelta(days=1)
-                next_reset = next_month
-
-            period_str = f"{month_start.strftime('%b %d')} - {month_end.strftime('%b %d, %Y')}"
-            reset_str = next_reset.strftime("%b %d, %Y")
-            return period_str, reset_str
-
-        elif period_type == "calendar_week":
-            start_of_week = now - timedelta(days=now.weekday())
-            end_of_week = start_of_week + timedelta(days=6)
-            next_week = start_of_week + timedelta(days=7)
-
-            period_str = f"{start_of_week.strftime('%b %d')} - {end_of_week.strftime('%b %d, %Y')}"
-            reset_str = next_week.strftime("%b %d, %Y")
-            return period_str, reset_str
-
-        elif period_type == "custom" and start_date and end_date:
-            try:
-                start = datetime.strptime(start_date, "%Y-%m-%d")
-                end = datetime.strptime(end_date, "%Y-%m-%d")
-                period_str = f"{start.strftime('%b %d')} - {end.strftime('%b %d, %Y')}"
-                return period_str, "Does not reset"
-            except:
-                pass
-
-        # Default fallback
-        return "Current month", "Next month"
+        return _period_info(period_type, period, start_date, end_date, today or date.today())
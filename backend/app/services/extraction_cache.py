@@ -0,0 +1,156 @@
+"""
+Content-addressed cache for Gemini receipt extractions
+Identical uploads (retries, duplicate submissions) reuse the previous result
+instead of paying for another Gemini round-trip.
+"""
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import diskcache
+
+from app.models.receipt import Receipt
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bump whenever the extraction prompts or Receipt schema change so stale entries are ignored
+PROMPT_VERSION = 1
+
+# Cached extractions expire after a week
+CACHE_EXPIRE_SECONDS = 7 * 24 * 60 * 60
+
+# Gemini deletes uploaded files after 48 hours; forget them well before that
+UPLOAD_CACHE_EXPIRE_SECONDS = 24 * 60 * 60
+
+# Large reads keep per-call overhead negligible next to OpenSSL's (SHA-NI) SHA-256
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def combine_digests(file_digests: Sequence[bytes]) -> str:
+    """
+    Combine per-file SHA-256 digests into one content hash
+
+    Hashing the fixed-size digests (rather than the concatenated bytes) means a
+    multi-file upload can never collide with a single file holding the same
+    bytes, and lets uploads be hashed while streaming before they hit disk.
+
+    Args:
+        file_digests: Raw SHA-256 digest of each file, in upload order
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for file_digest in file_digests:
+        digest.update(file_digest)
+    return digest.hexdigest()
+
+
+def hash_files(file_paths: Sequence[str]) -> str:
+    """
+    Hash the contents of one or more files
+
+    Args:
+        file_paths: Paths of the uploaded files, in upload order
+
+    Returns:
+        Hex SHA-256 digest (see combine_digests)
+    """
+    file_digests = []
+    for path in file_paths:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+        file_digests.append(digest.digest())
+    return combine_digests(file_digests)
+
+
+class ExtractionCache:
+    """Disk-backed cache of extracted receipts keyed by upload content"""
+
+    def __init__(self, directory: str = None):
+        self.cache = diskcache.Cache(directory or settings.extraction_cache_dir)
+
+    @staticmethod
+    def _key(content_hash: str, custom_categories: Optional[Sequence[str]]) -> Tuple:
+        return (
+            settings.gemini_model_id,
+            PROMPT_VERSION,
+            tuple(sorted(custom_categories or ())),
+            content_hash,
+        )
+
+    def get(
+        self, content_hash: str, custom_categories: Optional[Sequence[str]] = None
+    ) -> Optional[Tuple[Receipt, Dict[str, Any]]]:
+        """
+        Look up a previous extraction
+
+        Returns:
+            Tuple of (Receipt, extraction log) or None on miss
+        """
+        try:
+            cached = self.cache.get(self._key(content_hash, custom_categories))
+            if cached is None:
+                return None
+            # Validate on recall to guard against schema drift
+            receipt = Receipt.model_validate(cached["receipt"])
+            extraction_log = dict(cached["extraction_log"], cache_hit=True)
+            return receipt, extraction_log
+        except Exception as e:
+            logger.warning("Extraction cache read failed: %s", e)
+            return None
+
+    def set(
+        self,
+        content_hash: str,
+        custom_categories: Optional[Sequence[str]],
+        receipt: Receipt,
+        extraction_log: Dict[str, Any],
+    ) -> None:
+        """Store a successful extraction"""
+        try:
+            self.cache.set(
+                self._key(content_hash, custom_categories),
+                {"receipt": receipt.model_dump(), "extraction_log": extraction_log},
+                expire=CACHE_EXPIRE_SECONDS,
+            )
+        except Exception as e:
+            logger.warning("Extraction cache write failed: %s", e)
+
+    def get_source_file(self, content_hash: str) -> Optional[str]:
+        """Path of a previously stored upload with this content, if recorded"""
+        try:
+            return self.cache.get(("file", content_hash))
+        except Exception as e:
+            logger.warning("Extraction cache read failed: %s", e)
+            return None
+
+    def set_source_file(self, content_hash: str, file_path: str) -> None:
+        """Record where an upload with this content was stored"""
+        try:
+            self.cache.set(("file", content_hash), file_path, expire=CACHE_EXPIRE_SECONDS)
+        except Exception as e:
+            logger.warning("Extraction cache write failed: %s", e)
+
+    def get_uploaded_file(self, content_hash: str) -> Optional[str]:
+        """Gemini file name of a previous upload with this content, if recorded"""
+        try:
+            return self.cache.get(("upload", content_hash))
+        except Exception as e:
+            logger.warning("Extraction cache read failed: %s", e)
+            return None
+
+    def set_uploaded_file(self, content_hash: str, file_name: str) -> None:
+        """Record the Gemini file an upload with this content was stored as"""
+        try:
+            self.cache.set(("upload", content_hash), file_name, expire=UPLOAD_CACHE_EXPIRE_SECONDS)
+        except Exception as e:
+            logger.warning("Extraction cache write failed: %s", e)
+
+
+# Global extraction cache instance
+extraction_cache = ExtractionCache()
@@ -4,57 +4,400 @@ Ported from CLI script with additional logging
 """
 import os
 import mimetypes
+import re
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+import httpx
 from google import genai
+from google.genai import _transformers, types
 from app.models.receipt import Receipt
 from app.core.config import get_settings
 from app.services.image_optimizer import ImageOptimizer
-from pdf2image import convert_from_path
+from app.services.extraction_cache import extraction_cache, hash_files
+from app.utils.ttl_cache import TTLCache
+from io import BytesIO
+from pdf2image import convert_from_bytes, convert_from_path
 from PIL import Image
 
 settings = get_settings()
 
+# Receipts are text; anything sharper is thrown away by ImageOptimizer's 1200x2000 cap
+PDF_RENDER_DPI = 200
+
+# Receipt's response schema, converted once with the SDK's own transformer. Passing
+# the Pydantic class makes the SDK rebuild the JSON schema on every call, and then
+# validate the response into a Receipt that we validate again; with a prebuilt
+# schema response.parsed is a plain dict, validated once by the caller.
+RECEIPT_SCHEMA: types.Schema = _transformers.t_schema(None, Receipt)
+
+# Categories offered to the model when the user hasn't defined their own
+DEFAULT_CATEGORIES = (
+    "Groceries", "Dining", "Transport", "Utilities", "Entertainment",
+    "Shopping", "Health", "Other", "Produce", "Bakery", "Meat"
+)
+
+# Categories categorize_item may return
+ITEM_CATEGORIES = (
+    "Groceries", "Dining", "Transport", "Utilities", "Entertainment", "Shopping", "Health", "Other"
+)
+
+# Common receipt words that settle an item's category without asking Gemini
+CATEGORY_KEYWORDS = {
+    "Groceries": (
+        "milk", "bread", "eggs", "cheese", "butter", "yogurt", "rice", "pasta", "flour",
+        "sugar", "cereal", "apple", "apples", "banana", "bananas", "tomato", "tomatoes",
+        "potato", "potatoes", "onion", "onions", "chicken", "beef", "pork", "fish",
+    ),
+    "Dining": ("restaurant", "cafe", "coffee", "latte", "cappuccino", "pizza", "burger", "sandwich"),
+    "Transport": ("uber", "lyft", "taxi", "bus", "train", "metro", "fuel", "gas", "petrol", "diesel", "parking"),
+    "Utilities": ("electricity", "internet", "broadband", "heating"),
+    "Entertainment": ("movie", "cinema", "netflix", "spotify", "concert", "ticket", "tickets"),
+    "Shopping": ("shirt", "shoes", "jeans", "dress", "jacket"),
+    "Health": ("pharmacy", "medicine", "vitamins", "ibuprofen", "paracetamol", "doctor", "dental"),
+}
+_KEYWORD_CATEGORY = {
+    keyword: category for category, keywords in CATEGORY_KEYWORDS.items() for keyword in keywords
+}
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+@lru_cache(maxsize=64)
+def build_extract_prompt(categories: tuple[str, ...], image_count: Optional[int] = None) -> str:
+    """
+    Build the receipt extraction prompt for a category list
+
+    Cached so repeat requests send byte-identical prompts, which also lets
+    Gemini's implicit prompt caching kick in.
+
+    Args:
+        categories: Categories the items may be assigned to
+        image_count: Number of images for a multi-image receipt, None for a single image
+
+    Returns:
+        Prompt text
+    """
+    categories_str = ", ".join(categories)
+    if image_count is None:
+        return f"Extract receipt data: merchant name, address, date (DD-MM-YYYY), items with prices, quantities, total, tax, payment method. Categorize each item into one of: {categories_str}"
+
+    return f"""Extract receipt data from these {image_count} images of the same receipt.
+Combine information from all images to create a complete receipt.
+Return date as DD-MM-YYYY.
+Categorize each item into one of these categories: {categories_str}"""
+
+# Process-wide caps on in-flight Gemini calls so bursts of uploads stay under quota
+_upload_slots = threading.BoundedSemaphore(settings.gemini_upload_concurrency)
+_generate_slots = threading.BoundedSemaphore(settings.gemini_generate_concurrency)
+
+# Scratch files are deleted in the background once a request no longer needs them
+_cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cleanup")
+
+# Images are sent inline rather than through the Files API while the request stays under
+# Gemini's 20MB cap. Inline bytes are base64-encoded (4/3 larger); the headroom covers the
+# prompt. Optimized receipts are a few hundred KB, so a typical 5-image upload fits.
+INLINE_REQUEST_MAX_BYTES = 18 * 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def get_genai_client() -> genai.Client:
+    """
+    Shared Gemini client (lazy singleton)
+
+    Every GeminiService reuses one HTTP/2 connection pool, so uploads and
+    generate_content calls don't each pay for a new TLS handshake. 429s and
+    transient 5xx errors are retried by the SDK with exponential backoff.
+    """
+    return genai.Client(
+        api_key=settings.google_api_key,
+        http_options={
+            "client_args": {
+                "http2": True,
+                "limits": httpx.Limits(max_keepalive_connections=32),
+            },
+            "retry_options": {
+                "attempts": 5,
+                "initial_delay": 1.0,
+                "max_delay": 32.0,
+                "http_status_codes": [429, 500, 503, 504],
+            },
+        },
+    )
+
+
+def warm_up_image_pipeline() -> None:
+    """
+    Exercise the JPEG codec and a one-page PDF render once
+
+    Loads Pillow's codec libraries and pdftoppm from disk at startup, so the
+    first receipt upload after a deploy doesn't pay for it.
+    """
+    start = time.time()
+    try:
+        ImageOptimizer.warmup()
+        pdf = BytesIO()
+        Image.new('RGB', (16, 16), (255, 255, 255)).save(pdf, format='PDF')
+        convert_from_bytes(pdf.getvalue(), dpi=10)
+        print(f"🔥 Image pipeline warmed up in {time.time() - start:.2f}s")
+    except Exception as e:
+        print(f"⚠️ Image pipeline warm-up failed: {e}")
+
+
+def _temp_jpeg_path() -> str:
+    """Reserve a unique .jpg path so concurrent requests never share scratch files"""
+    fd, path = tempfile.mkstemp(suffix='.jpg')
+    os.close(fd)
+    return path
+
+
+def _remove_quietly(path: str) -> None:
+    """Delete a scratch file, ignoring errors (it may never have been written)"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _InlineBudget:
+    """Request bytes left for inline images, shared by the threads preparing one receipt"""
+
+    def __init__(self, limit: int = INLINE_REQUEST_MAX_BYTES):
+        self._remaining = limit
+        self._lock = threading.Lock()
+
+    def reserve(self, size: int) -> bool:
+        """Claim room for an image of `size` bytes, False if it must be uploaded instead"""
+        encoded_size = (size + 2) // 3 * 4
+        with self._lock:
+            if encoded_size > self._remaining:
+                return False
+            self._remaining -= encoded_size
+            return True
+
+
+def _inline_part(path: str) -> types.Part:
+    """Read a JPEG into a Part sent with the request itself, instead of a separate upload"""
+    with open(path, "rb") as f:
+        return types.Part.from_bytes(data=f.read(), mime_type="image/jpeg")
+
+
+def _discard_later(path: Optional[str]) -> None:
+    """Delete a scratch file on the cleanup thread, keeping the unlink off the request path"""
+    if path:
+        _cleanup_executor.submit(_remove_quietly, path)
+
 
 class GeminiService:
     """Service for Gemini AI operations"""
 
     def __init__(self):
-        self.client = genai.Client(api_key=settings.google_api_key)
+        self.client = get_genai_client()
         self.model_id = settings.gemini_model_id
         self.image_optimizer = ImageOptimizer()
-        # Cache for uploaded file URIs to avoid re-uploading for reprocessing
-        self.file_cache: Dict[str, Any] = {}
+        # Gemini answers from categorize_item, keyed by normalized item name
+        self._category_cache = TTLCache(ttl=24 * 60 * 60, maxsize=4096)
+
+    def _get_cached_upload(self, content_hash: str) -> Optional[Any]:
+        """
+        Look up a previous Gemini upload of the same file content
+
+        Uploads are recorded on disk by content hash, so reprocessing reuses them
+        across restarts. The file is re-fetched to make sure Gemini still has it.
+
+        Returns:
+            Gemini file object, or None if there is no live upload
+        """
+        file_name = extraction_cache.get_uploaded_file(content_hash)
+        if not file_name:
+            return None
+        try:
+            return self.client.files.get(name=file_name)
+        except Exception as e:
+            print(f"⚠️ Cached upload {file_name} is no longer available: {e}")
+            return None
+
+    def _upload_file(self, file_path: str) -> Any:
+        """Upload a JPEG (we always convert to JPEG) to Gemini, waiting for a free upload slot"""
+        with _upload_slots:
+            return self.client.files.upload(file=file_path, config={"mime_type": "image/jpeg"})
+
+    def _generate_content(self, **kwargs) -> Any:
+        """Call generate_content, waiting for a free generation slot"""
+        with _generate_slots:
+            return self.client.models.generate_content(**kwargs)
 
-    def convert_pdf_to_image(self, pdf_path: str) -> tuple[str, str]:
+    def convert_pdf_to_image(self, pdf_path: str) -> tuple[Image.Image, str]:
         """
-        Convert PDF to image (first page only for receipts)
+        Render the first page of a PDF (receipts are a single page)
+
+        The page stays in memory so ImageOptimizer can resize and encode it
+        once, with no intermediate JPEG on disk.
 
         Args:
             pdf_path: Path to PDF file
 
         Returns:
-            Tuple of (converted image path, original pdf path)
+            Tuple of (rendered page image, original pdf path)
         """
         try:
             print(f"📄 Converting PDF to image: {pdf_path}")
-            # Convert first page to image
-            images = convert_from_path(pdf_path, first_page=1, last_page=1, dpi=300)
+            pages = convert_from_path(pdf_path, first_page=1, last_page=1, dpi=PDF_RENDER_DPI)
 
-            if not images:
+            if not pages:
                 raise ValueError("Could not convert PDF to image")
 
-            # Save as JPEG in temp location
-            image_path = pdf_path.replace('.pdf', '_converted.jpg')
-            images[0].save(image_path, 'JPEG', quality=95)
-            print(f"✅ PDF converted to image: {image_path}")
-
-            return image_path, pdf_path
+            print(f"✅ PDF converted to image: {pages[0].width}x{pages[0].height}")
+            return pages[0], pdf_path
         except Exception as e:
             print(f"❌ Error converting PDF: {e}")
             raise ValueError(f"Failed to convert PDF to image: {str(e)}")
 
+    def _prepare_one(
+        self, idx: int, image_path: str, inline_budget: Optional[_InlineBudget] = None
+    ) -> tuple[Any, Dict[str, float]]:
+        """
+        Convert (if PDF), optimize and upload one image of a multi-image receipt
+
+        Args:
+            idx: Position of the image in the upload, used for log keys
+            image_path: Path to the receipt image or PDF
+            inline_budget: Request budget for inline images; the image is returned as an
+                inline Part if it fits, otherwise (or if None) it is uploaded
+
+        Returns:
+            Tuple of (inline Part or uploaded Gemini file, timings dict)
+        """
+        print(f"📄 Processing image {idx + 1}: {image_path}")
+        timings = {}
+
+        # Inline images are re-optimized instead: that's cheaper than the files.get
+        # needed to check a cached upload is still live
+        content_hash = hash_files([image_path])
+        if inline_budget is None:
+            file_obj = self._get_cached_upload(content_hash)
+            if file_obj is not None:
+                print(f"⚡ Using cached file upload for image {idx + 1}")
+                timings[f"upload_{idx}"] = 0
+                return file_obj, timings
+
+        optimized_path = _temp_jpeg_path()
+        try:
+            if image_path.lower().endswith('.pdf'):
+                # Render the page and encode it straight to the optimized JPEG
+                pdf_convert_start = time.time()
+                page, _ = self.convert_pdf_to_image(image_path)
+                timings[f"pdf_conversion_{idx}"] = time.time() - pdf_convert_start
+
+                optimize_start = time.time()
+                upload_path, optimized_size = self.image_optimizer.optimize_pil(page, optimized_path)
+            else:
+                optimize_start = time.time()
+                upload_path, optimized_size = self.image_optimizer.optimize_image(
+                    image_path, optimized_path
+                )
+            timings[f"optimization_{idx}"] = time.time() - optimize_start
+
+            if inline_budget is not None:
+                if inline_budget.reserve(optimized_size):
+                    timings[f"upload_{idx}"] = 0
+                    return _inline_part(upload_path), timings
+
+                file_obj = self._get_cached_upload(content_hash)
+                if file_obj is not None:
+                    print(f"⚡ Using cached file upload for image {idx + 1}")
+                    timings[f"upload_{idx}"] = 0
+                    return file_obj, timings
+
+            # Upload to Gemini
+            upload_start = time.time()
+            file_obj = self._upload_file(upload_path)
+            timings[f"upload_{idx}"] = time.time() - upload_start
+            extraction_cache.set_uploaded_file(content_hash, file_obj.name)
+
+            return file_obj, timings
+        finally:
+            # The optimized file is only needed until the upload is done
+            _discard_later(optimized_path)
+
+    def build_batch_request(
+        self, image_paths: list[str], custom_categories: Optional[list[str]] = None
+    ) -> types.InlinedRequest:
+        """
+        Upload the images of one receipt and build its Batch API request
+
+        Args:
+            image_paths: Paths of the receipt images/PDFs, in upload order
+            custom_categories: Optional list of custom category names
+
+        Returns:
+            Inlined request for create_batch
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(image_paths)))) as executor:
+            prepared = list(executor.map(self._prepare_one, range(len(image_paths)), image_paths))
+
+        prompt = build_extract_prompt(
+            tuple(custom_categories) if custom_categories else DEFAULT_CATEGORIES,
+            len(image_paths) if len(image_paths) > 1 else None,
+        )
+        parts = [types.Part.from_text(text=prompt)] + [
+            types.Part.from_uri(file_uri=file_obj.uri, mime_type=file_obj.mime_type)
+            for file_obj, _ in prepared
+        ]
+        return types.InlinedRequest(
+            contents=[types.Content(role="user", parts=parts)],
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=RECEIPT_SCHEMA,
+                temperature=0.1,
+                top_p=0.8,
+                top_k=20,
+            ),
+        )
+
+    def create_batch(self, requests: list[types.InlinedRequest], display_name: str) -> types.BatchJob:
+        """Submit extraction requests to the Gemini Batch API (half price, higher latency)"""
+        return self.client.batches.create(
+            model=self.model_id, src=requests, config={"display_name": display_name}
+        )
+
+    def get_batch(self, name: str) -> types.BatchJob:
+        """Fetch the current state of a batch job"""
+        return self.client.batches.get(name=name)
+
+    @staticmethod
+    def parse_batch_response(
+        inlined_response: types.InlinedResponse,
+    ) -> tuple[Optional[Receipt], Dict[str, Any]]:
+        """
+        Turn one Batch API result into a receipt
+
+        Returns:
+            Tuple of (Receipt object or None, extraction log dict)
+        """
+        extraction_log = {"prompt": "", "response": "", "error": None, "success": False, "timings": {}, "batch": True}
+
+        if inlined_response.error:
+            extraction_log["error"] = inlined_response.error.message or "Batch request failed"
+            return None, extraction_log
+
+        try:
+            text = inlined_response.response.text if inlined_response.response else None
+            if not text:
+                extraction_log["error"] = "No data extracted from receipt"
+                return None, extraction_log
+
+            extraction_log["response"] = text
+            receipt = Receipt.model_validate_json(text)
+            extraction_log["success"] = True
+            return receipt, extraction_log
+        except Exception as e:
+            extraction_log["error"] = str(e)
+            return None, extraction_log
+
     def extract_receipt_data_multiple(
         self, image_paths: list[str], user_feedback: Optional[str] = None, current_receipt: Optional[Dict[str, Any]] = None, custom_categories: Optional[list[str]] = None
     ) -> tuple[Optional[Receipt], Dict[str, Any]]:
@@ -82,57 +425,25 @@ class GeminiService:
         try:
             print(f"🤖 Processing {len(image_paths)} images for receipt extraction")
 
-            # Process all images and upload to Gemini
-            file_objects = []
-            converted_paths = []
-
-            for idx, image_path in enumerate(image_paths):
-                print(f"📄 Processing image {idx + 1}/{len(image_paths)}: {image_path}")
-
-                # Check if PDF and convert
-                current_path = image_path
-                if image_path.lower().endswith('.pdf'):
-                    pdf_convert_start = time.time()
-                    converted_image, original_pdf = self.convert_pdf_to_image(image_path)
-                    converted_paths.append(converted_image)
-                    current_path = converted_image
-                    extraction_log["timings"][f"pdf_conversion_{idx}"] = time.time() - pdf_convert_start
-
-                # Optimize image
-                optimize_start = time.time()
-                original_size = os.path.getsize(current_path)
-                optimized_path = current_path.replace('.', f'_opt{idx}.')
-                optimized_path, optimized_size = self.image_optimizer.optimize_image(
-                    current_path, optimized_path
-                )
-                extraction_log["timings"][f"optimization_{idx}"] = time.time() - optimize_start
+            # Convert, optimize and upload every image concurrently; uploads are
+            # network-bound, so the phase takes about as long as the slowest image
+            inline_budget = _InlineBudget()
+            with ThreadPoolExecutor(max_workers=max(1, min(8, len(image_paths)))) as executor:
+                prepared = list(executor.map(
+                    lambda idx, path: self._prepare_one(idx, path, inline_budget),
+                    range(len(image_paths)),
+                    image_paths,
+                ))
 
-                # Upload to Gemini
-                upload_start = time.time()
-                file_obj = self.client.files.upload(
-                    file=optimized_path, config={"mime_type": "image/jpeg"}
-                )
+            file_objects = []
+            for file_obj, timings in prepared:
                 file_objects.append(file_obj)
-                extraction_log["timings"][f"upload_{idx}"] = time.time() - upload_start
-
-                # Cleanup optimized file
-                if optimized_path != current_path and os.path.exists(optimized_path):
-                    try:
-                        os.remove(optimized_path)
-                    except:
-                        pass
+                extraction_log["timings"].update(timings)
 
             # Create prompt for multiple images
-            categories_list = custom_categories if custom_categories else [
-                "Groceries", "Dining", "Transport", "Utilities", "Entertainment",
-                "Shopping", "Health", "Other", "Produce", "Bakery", "Meat"
-            ]
-            categories_str = ", ".join(categories_list)
-
-            base_prompt = f"""Extract receipt data from these {len(image_paths)} images of the same receipt.
-Combine information from all images to create a complete receipt.
-Return date as DD-MM-YYYY.
-Categorize each item into one of these categories: {categories_str}"""
+            base_prompt = build_extract_prompt(
+                tuple(custom_categories) if custom_categories else DEFAULT_CATEGORIES, len(image_paths)
+            )
             extraction_log["prompt"] = base_prompt
 
             # Generate content with all images
@@ -145,12 +456,12 @@ Categorize each item into one of these categories: {categories_str}"""
             sys.stdout.flush()  # Force flush to ensure log appears
 
             try:
-                response = self.client.models.generate_content(
+                response = self._generate_content(
                     model=self.model_id,
                     contents=contents,
                     config={
                         "response_mime_type": "application/json",
-                        "response_schema": Receipt,
+                        "response_schema": RECEIPT_SCHEMA,
                         "temperature": 0.1,
                         "top_p": 0.8,
                         "top_k": 20,
@@ -179,14 +490,6 @@ Categorize each item into one of these categories: {categories_str}"""
                 extraction_log["timings"]["total"] = total_time
                 print(f"✅ Total extraction time: {total_time:.2f}s")
 
-                # Clean up converted PDF files
-                for converted_path in converted_paths:
-                    if os.path.exists(converted_path):
-                        try:
-                            os.remove(converted_path)
-                        except:
-                            pass
-
                 return receipt, extraction_log
             else:
                 extraction_log["error"] = "No data extracted from receipt"
@@ -224,7 +527,6 @@ Categorize each item into one of these categories: {categories_str}"""
             # OPTIMIZATION: Skip image processing entirely if reprocessing with current receipt
             file_obj = None
             optimized_path = None
-            converted_pdf_path = None
 
             if user_feedback and current_receipt:
                 # Reprocessing with current data - no image needed
@@ -238,52 +540,51 @@ Categorize each item into one of these categories: {categories_str}"""
                     extraction_log["error"] = f"File not found: {image_path}"
                     return None, extraction_log
 
-                # Check if PDF and convert to image
+                original_size = os.path.getsize(image_path)
+                print(f"📊 Original image size: {original_size / 1024:.1f}KB")
+                optimized_path = _temp_jpeg_path()
+
+                # OPTIMIZATION 1: Image preprocessing and compression
                 if image_path.lower().endswith('.pdf'):
+                    # Render the page and encode it straight to the optimized JPEG
                     pdf_convert_start = time.time()
-                    converted_image, original_pdf = self.convert_pdf_to_image(image_path)
-                    converted_pdf_path = converted_image  # Track for cleanup
-                    image_path = converted_image  # Use converted image for processing
+                    page, _ = self.convert_pdf_to_image(image_path)
                     extraction_log["timings"]["pdf_conversion"] = time.time() - pdf_convert_start
 
-                # OPTIMIZATION 1: Image preprocessing and compression
-                optimize_start = time.time()
-                original_size = os.path.getsize(image_path)
-                print(f"📊 Original image size: {original_size / 1024:.1f}KB")
-
-                # Create optimized version
-                optimized_path = image_path.replace('.', '_optimized.')
-                optimized_path, optimized_size = self.image_optimizer.optimize_image(
-                    image_path, optimized_path
-                )
+                    optimize_start = time.time()
+                    upload_path, optimized_size = self.image_optimizer.optimize_pil(page, optimized_path)
+                else:
+                    optimize_start = time.time()
+                    upload_path, optimized_size = self.image_optimizer.optimize_image(
+                        image_path, optimized_path
+                    )
 
                 size_reduction = ((original_size - optimized_size) / original_size) * 100
                 print(f"⚡ Size reduced by {size_reduction:.1f}% ({original_size/1024:.1f}KB -> {optimized_size/1024:.1f}KB)")
 
                 extraction_log["timings"]["optimization"] = time.time() - optimize_start
 
-                # OPTIMIZATION 2: Use cache for reprocessing (avoid re-uploading)
-                cache_key = f"{image_path}_{os.path.getmtime(image_path)}"
-
-                if cache_key in self.file_cache and not user_feedback:
-                    file_obj = self.file_cache[cache_key]
-                    print("⚡ Using cached file upload")
+                if _InlineBudget().reserve(optimized_size):
+                    # OPTIMIZATION 2: Small images travel with the request (no upload round trip)
+                    file_obj = _inline_part(upload_path)
                     extraction_log["timings"]["upload"] = 0
                 else:
-                    # Upload optimized file to Gemini
-                    upload_start = time.time()
-                    mimetype = "image/jpeg"  # We always convert to JPEG
-
-                    file_obj = self.client.files.upload(
-                        file=optimized_path, config={"mime_type": mimetype}
-                    )
-
-                    upload_time = time.time() - upload_start
-                    extraction_log["timings"]["upload"] = upload_time
-                    print(f"⬆️ File upload took {upload_time:.2f}s")
-
-                    # Cache the uploaded file for potential reprocessing
-                    self.file_cache[cache_key] = file_obj
+                    # Reuse an earlier upload of the same file (avoid re-uploading)
+                    content_hash = hash_files([image_path])
+                    file_obj = self._get_cached_upload(content_hash)
+
+                    if file_obj is not None:
+                        print("⚡ Using cached file upload")
+                        extraction_log["timings"]["upload"] = 0
+                    else:
+                        # Upload optimized file to Gemini
+                        upload_start = time.time()
+                        file_obj = self._upload_file(upload_path)
+
+                        upload_time = time.time() - upload_start
+                        extraction_log["timings"]["upload"] = upload_time
+                        print(f"⬆️ File upload took {upload_time:.2f}s")
+                        extraction_cache.set_uploaded_file(content_hash, file_obj.name)
 
             # OPTIMIZATION 3: Streamlined, specific prompt
             if user_feedback and current_receipt:
@@ -300,12 +601,9 @@ Return the updated receipt data in the same JSON format."""
             elif user_feedback:
                 base_prompt = f"Re-extract receipt data with this correction: {user_feedback}\nReturn date as DD-MM-YYYY."
             else:
-                categories_list = custom_categories if custom_categories else [
-                    "Groceries", "Dining", "Transport", "Utilities", "Entertainment",
-                    "Shopping", "Health", "Other", "Produce", "Bakery", "Meat"
-                ]
-                categories_str = ", ".join(categories_list)
-                base_prompt = f"Extract receipt data: merchant name, address, date (DD-MM-YYYY), items with prices, quantities, total, tax, payment method. Categorize each item into one of: {categories_str}"
+                base_prompt = build_extract_prompt(
+                    tuple(custom_categories) if custom_categories else DEFAULT_CATEGORIES
+                )
 
             extraction_log["prompt"] = base_prompt
 
@@ -314,12 +612,12 @@ Return the updated receipt data in the same JSON format."""
 
             # For reprocessing with current receipt, don't send image - just process JSON
             if user_feedback and current_receipt:
-                response = self.client.models.generate_content(
+                response = self._generate_content(
                     model=self.model_id,
                     contents=[base_prompt],
                     config={
                         "response_mime_type": "application/json",
-                        "response_schema": Receipt,
+                        "response_schema": RECEIPT_SCHEMA,
                         "temperature": 0.1,
                         "top_p": 0.8,
                         "top_k": 20,
@@ -332,12 +630,12 @@ Return the updated receipt data in the same JSON format."""
                 sys.stdout.flush()
 
                 try:
-                    response = self.client.models.generate_content(
+                    response = self._generate_content(
                         model=self.model_id,
                         contents=[base_prompt, file_obj],
                         config={
                             "response_mime_type": "application/json",
-                            "response_schema": Receipt,
+                            "response_schema": RECEIPT_SCHEMA,
                             "temperature": 0.1,
                             "top_p": 0.8,
                             "top_k": 20,
@@ -366,20 +664,6 @@ Return the updated receipt data in the same JSON format."""
                 extraction_log["timings"]["total"] = total_time
                 print(f"✅ Total extraction time: {total_time:.2f}s")
 
-                # Clean up optimized file if different from original
-                if optimized_path and optimized_path != image_path and os.path.exists(optimized_path):
-                    try:
-                        os.remove(optimized_path)
-                    except:
-                        pass
-
-                # Clean up converted PDF file
-                if converted_pdf_path and os.path.exists(converted_pdf_path):
-                    try:
-                        os.remove(converted_pdf_path)
-                    except:
-                        pass
-
                 return receipt, extraction_log
             else:
                 extraction_log["error"] = "No data extracted from receipt"
@@ -389,10 +673,13 @@ Return the updated receipt data in the same JSON format."""
             extraction_log["error"] = str(e)
             extraction_log["timings"]["total"] = time.time() - start_time
             return None, extraction_log
+        finally:
+            # Clean up the optimized file whether or not extraction succeeded
+            _discard_later(optimized_path)
 
     def categorize_item(self, item_name: str) -> str:
         """
-        Use Gemini to categorize an item
+        Categorize an item, asking Gemini only when no known keyword matches
 
         Args:
             item_name: Name of the item to categorize
@@ -400,33 +687,34 @@ Return the updated receipt data in the same JSON format."""
         Returns:
             Category name
         """
+        name = " ".join(item_name.lower().split())
+        for word in _WORD_RE.findall(name):
+            category = _KEYWORD_CATEGORY.get(word)
+            if category:
+                return category
+
+        category = self._category_cache.get(name)
+        if category is not None:
+            return category
+
         try:
             prompt = f"""Categorize this purchase item into one of these categories:
-Groceries, Dining, Transport, Utilities, Entertainment, Shopping, Health, Other
+{", ".join(ITEM_CATEGORIES)}
 
 Item: {item_name}
 
 Return ONLY the category name, nothing else."""
 
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.model_id, contents=[prompt]
             )
 
             category = response.text.strip()
             # Validate category
-            valid_categories = [
-                "Groceries",
-                "Dining",
-                "Transport",
-                "Utilities",
-                "Entertainment",
-                "Shopping",
-                "Health",
-                "Other",
-            ]
-            if category in valid_categories:
-                return category
-            return "Other"
+            if category not in ITEM_CATEGORIES:
+                category = "Other"
+            self._category_cache.set(name, category)
+            return category
 
         except Exception as e:
             print(f"Error categorizing item: {e}")
@@ -467,11 +755,7 @@ Return ONLY the category name, nothing else."""
             print(f"🤖 Extracting expense from text: {text[:100]}...")
 
             # Get categories
-            categories_list = custom_categories if custom_categories else [
-                "Groceries", "Dining", "Transport", "Utilities", "Entertainment",
-                "Shopping", "Health", "Other", "Produce", "Bakery", "Meat"
-            ]
-            categories_str = ", ".join(categories_list)
+            categories_str = ", ".join(custom_categories or DEFAULT_CATEGORIES)
 
             # Parse date from text
             parsed_date = parse_relative_date(text)
@@ -500,12 +784,12 @@ Return structured receipt data."""
             extraction_log["prompt"] = prompt
 
             generation_start = time.time()
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.model_id,
                 contents=[prompt],
                 config={
                     "response_mime_type": "application/json",
-                    "response_schema": Receipt,
+                    "response_schema": RECEIPT_SCHEMA,
                     "temperature": 0.2,  # Slightly higher for better inference
                     "top_p": 0.9,
                     "top_k": 40,
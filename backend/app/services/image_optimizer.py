@@ -1,6 +1,7 @@
 """
 Image optimization service for faster processing
 """
+import math
 import os
 from PIL import Image
 from io import BytesIO
@@ -16,6 +17,7 @@ class ImageOptimizer:
 
     # Quality settings
     JPEG_QUALITY = 85
+    MIN_JPEG_QUALITY = 60
     MAX_FILE_SIZE = 500 * 1024  # 500KB target
 
     @staticmethod
@@ -36,66 +38,108 @@ class ImageOptimizer:
         try:
             # Open image
             with Image.open(input_path) as img:
-                # Convert to RGB if needed (handles PNG with alpha, etc.)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    # Create white background
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-
-                # Get original dimensions
                 orig_width, orig_height = img.size
 
-                # Calculate new dimensions maintaining aspect ratio
-                if orig_width > ImageOptimizer.MAX_WIDTH or orig_height > ImageOptimizer.MAX_HEIGHT:
-                    # Calculate scaling factor
-                    width_ratio = ImageOptimizer.MAX_WIDTH / orig_width
-                    height_ratio = ImageOptimizer.MAX_HEIGHT / orig_height
-                    scale_factor = min(width_ratio, height_ratio)
+                # Already a small JPEG: nothing to gain from decoding and re-encoding
+                # (Image.open only reads the header)
+                input_size = os.path.getsize(input_path)
+                if (
+                    img.format == 'JPEG'
+                    and img.mode in ('RGB', 'L')
+                    and orig_width <= ImageOptimizer.MAX_WIDTH
+                    and orig_height <= ImageOptimizer.MAX_HEIGHT
+                    and input_size <= ImageOptimizer.MAX_FILE_SIZE
+                ):
+                    print(f"💾 Image already optimized: {input_size / 1024:.1f}KB")
+                    return input_path, input_size
 
-                    new_width = int(orig_width * scale_factor)
-                    new_height = int(orig_height * scale_factor)
+                # Let libjpeg downscale by 1/2, 1/4 or 1/8 while decoding (no-op for non-JPEG)
+                img.draft('RGB', (ImageOptimizer.MAX_WIDTH, ImageOptimizer.MAX_HEIGHT))
 
-                    # Resize with high-quality resampling
-                    img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                    print(f"📏 Resized image: {orig_width}x{orig_height} -> {new_width}x{new_height}")
+                return ImageOptimizer.optimize_pil(img, output_path)
 
-                # Save with progressive JPEG for better compression
-                # Start with quality 85 and reduce if file is too large
-                quality = ImageOptimizer.JPEG_QUALITY
-
-                while quality > 60:
-                    # Save to buffer first to check size
-                    buffer = BytesIO()
-                    img.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
-                    file_size = buffer.tell()
+        except Exception as e:
+            print(f"❌ Image optimization failed: {e}")
+            # If optimization fails, return original
+            return input_path, os.path.getsize(input_path)
 
-                    if file_size <= ImageOptimizer.MAX_FILE_SIZE or quality == 60:
-                        # Save to actual file
-                        buffer.seek(0)
-                        with open(output_path, 'wb') as f:
-                            f.write(buffer.getvalue())
+    @staticmethod
+    def optimize_pil(img: Image.Image, output_path: str) -> Tuple[str, int]:
+        """
+        Resize and JPEG-encode an already opened image
 
-                        print(f"💾 Optimized image: {file_size / 1024:.1f}KB (quality: {quality})")
-                        return output_path, file_size
+        Lets in-memory images (e.g. rendered PDF pages) be encoded exactly once,
+        without an intermediate file.
 
-                    # Reduce quality and try again
-                    quality -= 5
+        Args:
+            img: Image to optimize
+            output_path: Path to save the optimized JPEG
 
-                # Fallback: save with quality 60
-                img.save(output_path, format='JPEG', quality=60, optimize=True, progressive=True)
-                file_size = os.path.getsize(output_path)
-                print(f"💾 Optimized image: {file_size / 1024:.1f}KB (quality: 60)")
-                return output_path, file_size
+        Returns:
+            Tuple of (output_path, file_size_bytes)
+        """
+        # Palette images can only be resampled with NEAREST, so expand them first
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        elif img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            img = img.convert('RGB')
+
+        # Fit within the target box, keeping aspect ratio
+        orig_width, orig_height = img.size
+        if orig_width > ImageOptimizer.MAX_WIDTH or orig_height > ImageOptimizer.MAX_HEIGHT:
+            img.thumbnail((ImageOptimizer.MAX_WIDTH, ImageOptimizer.MAX_HEIGHT), Image.Resampling.LANCZOS)
+            print(f"📏 Resized image: {orig_width}x{orig_height} -> {img.width}x{img.height}")
+
+        # Flatten alpha / expand grayscale only after resizing, on the smaller image
+        if img.mode in ('RGBA', 'LA'):
+            alpha = img.getchannel('A')
+            if alpha.getextrema() == (255, 255):
+                # Fully opaque (common for screenshots): just drop the alpha channel
+                img = img.convert('RGB')
+            else:
+                # Create white background
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=alpha)
+                img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        # Encode once at the default quality; if that's too large, estimate the
+        # quality that hits the size target (size scales roughly with quality^2).
+        # No optimize=True: libjpeg always builds optimal Huffman tables for
+        # progressive output, so the flag only added a redundant option.
+        quality = ImageOptimizer.JPEG_QUALITY
+        buffer = BytesIO()
+        img.save(buffer, format='JPEG', quality=quality, progressive=True)
+        file_size = buffer.tell()
+
+        if file_size > ImageOptimizer.MAX_FILE_SIZE:
+            quality = max(
+                ImageOptimizer.MIN_JPEG_QUALITY,
+                int(quality * math.sqrt(ImageOptimizer.MAX_FILE_SIZE / file_size)),
+            )
+            # Final encode: write straight to disk, no intermediate buffer
+            img.save(output_path, format='JPEG', quality=quality, progressive=True)
+            file_size = os.path.getsize(output_path)
+        else:
+            # Zero-copy view of the accepted encode
+            with open(output_path, 'wb') as f:
+                f.write(buffer.getbuffer())
+
+        print(f"💾 Optimized image: {file_size / 1024:.1f}KB (quality: {quality})")
+        return output_path, file_size
 
-        except Exception as e:
-            print(f"❌ Image optimization failed: {e}")
-            # If optimization fails, return original
-            return input_path, os.path.getsize(input_path)
+    @staticmethod
+    def warmup() -> None:
+        """Round-trip a tiny JPEG so codec libraries are loaded before the first upload"""
+        buffer = BytesIO()
+        Image.new('RGB', (16, 16), (255, 255, 255)).save(
+            buffer, format='JPEG', quality=ImageOptimizer.JPEG_QUALITY, progressive=True
+        )
+        buffer.seek(0)
+        with Image.open(buffer) as img:
+            img.draft('RGB', (8, 8))
+            img.load()
 
     @staticmethod
     def get_image_info(image_path: str) -> dict:
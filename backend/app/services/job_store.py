@@ -0,0 +1,106 @@
+"""
+Upload job store shared by every worker process
+Jobs live in a disk-backed cache, so a status poll served by a different
+uvicorn worker than the one processing the upload still finds its job.
+"""
+import os
+from typing import Callable, List, Optional
+
+import diskcache
+
+from app.models.upload_job import UploadJob
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Jobs are forgotten a day after their last update
+JOB_EXPIRE_SECONDS = 24 * 60 * 60
+
+# Hard cap on stored jobs; the oldest go first once it's exceeded
+MAX_JOBS = 10_000
+
+
+class JobStore:
+    """
+    Disk-backed UploadJob store keyed by receipt ID
+
+    Supports `in`, `[]` and `del` so it can stand in for the plain dict the
+    jobs used to live in; `recent()` pages through them newest first. Jobs
+    are returned as copies; write
+    changes back with `set` (or `update` for an atomic read-modify-write).
+    """
+
+    def __init__(self, directory: str = None):
+        directory = directory or settings.job_store_dir
+        self.cache = diskcache.Cache(directory)
+        # Receipt IDs in creation order, so eviction never has to scan the jobs
+        self.order = diskcache.Deque(directory=os.path.join(directory, "order"))
+
+    def get(self, receipt_id: str) -> Optional[UploadJob]:
+        """Return the job for receipt_id, or None"""
+        return self.cache.get(("job", receipt_id))
+
+    def set(self, job: UploadJob) -> None:
+        """Store (or replace) a job"""
+        self.cache.set(("job", job.receipt_id), job, expire=JOB_EXPIRE_SECONDS)
+
+    def add(self, job: UploadJob) -> None:
+        """Store a new job, evicting the oldest jobs beyond MAX_JOBS"""
+        self.set(job)
+        self.order.append(job.receipt_id)
+        while len(self.order) > MAX_JOBS:
+            try:
+                old_id = self.order.popleft()
+            except IndexError:
+                break
+            # Already gone if it expired or was deleted
+            self.cache.delete(("job", old_id))
+
+    def update(self, receipt_id: str, apply: Callable[[UploadJob], None]) -> Optional[UploadJob]:
+        """
+        Apply a change to a stored job atomically across processes
+
+        Returns:
+            The updated job, or None if there is no such job
+        """
+        with self.cache.transact():
+            job = self.get(receipt_id)
+            if job is None:
+                return None
+            apply(job)
+            self.set(job)
+        return job
+
+    def recent(self, offset: int = 0, limit: Optional[int] = None) -> List[UploadJob]:
+        """
+        Live jobs, newest first, loading only the requested page
+
+        Walks the creation-order index from the back; skipped and expired
+        jobs are only checked for presence, never deserialized.
+        """
+        page = []
+        for receipt_id in reversed(self.order):
+            if limit is not None and len(page) >= limit:
+                break
+            if ("job", receipt_id) not in self.cache:
+                continue
+            if offset:
+                offset -= 1
+                continue
+            job = self.get(receipt_id)
+            if job is not None:
+                page.append(job)
+        return page
+
+    def __contains__(self, receipt_id: str) -> bool:
+        return ("job", receipt_id) in self.cache
+
+    def __getitem__(self, receipt_id: str) -> UploadJob:
+        job = self.get(receipt_id)
+        if job is None:
+            raise KeyError(receipt_id)
+        return job
+
+    def __delitem__(self, receipt_id: str) -> None:
+        if not self.cache.delete(("job", receipt_id)):
+            raise KeyError(receipt_id)
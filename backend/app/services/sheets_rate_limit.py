@@ -0,0 +1,98 @@
+"""
+Client-side rate limiting and retry for Google Sheets API calls
+Keeps the process under the per-user quota (~60 requests/minute) instead of
+bursting into 429 RESOURCE_EXHAUSTED errors and slow retries.
+"""
+import random
+import threading
+import time
+from http import HTTPStatus
+
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from requests.adapters import HTTPAdapter
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Retried alongside any 5xx
+RETRY_STATUS_CODES = frozenset({HTTPStatus.REQUEST_TIMEOUT, HTTPStatus.TOO_MANY_REQUESTS})
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `acquire` blocks until a token is available"""
+
+    def __init__(self, rate_per_minute: float, capacity: int = None):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = capacity or max(1, int(rate_per_minute))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until the bucket refills if it's empty"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Shared by every Sheets client in the process
+sheets_bucket = TokenBucket(settings.sheets_requests_per_minute)
+
+
+class RateLimitedHTTPClient(HTTPClient):
+    """
+    gspread HTTP client that takes a token before every request
+
+    Transient failures (408, 429, 5xx and Drive's 403 usageLimits) are retried
+    up to MAX_ATTEMPTS times with exponential backoff plus jitter, waiting at
+    least as long as the server's Retry-After; each attempt takes another token.
+    """
+
+    MAX_ATTEMPTS = 6
+    _INITIAL_BACKOFF = 1  # seconds
+    _MAX_BACKOFF = 32  # seconds
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # requests keeps only 10 idle connections per host; calls fan out across the
+        # blocking-io thread pool, so size the pool to match and keep every socket warm
+        adapter = HTTPAdapter(pool_maxsize=settings.blocking_io_workers)
+        self.session.mount("https://", adapter)
+
+    @staticmethod
+    def _is_transient(error: APIError) -> bool:
+        """Whether a failed request is worth retrying"""
+        if error.code in RETRY_STATUS_CODES or error.code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            return True
+        # Drive reports quota exhaustion as 403 with a usageLimits domain
+        details = error.error.get("errors") or [{}]
+        return error.code == HTTPStatus.FORBIDDEN and details[0].get("domain") == "usageLimits"
+
+    @staticmethod
+    def _retry_after(error: APIError) -> float:
+        """Seconds the server asked us to wait (Google APIs send delta-seconds)"""
+        try:
+            return float(error.response.headers.get("Retry-After", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def request(self, *args, **kwargs):
+        for attempt in range(self.MAX_ATTEMPTS):
+            sheets_bucket.acquire()
+            try:
+                return super().request(*args, **kwargs)
+            except APIError as e:
+                if attempt == self.MAX_ATTEMPTS - 1 or not self._is_transient(e):
+                    raise
+                # Backoff state is per call, so concurrent requests don't inflate each other's waits
+                backoff = min(self._INITIAL_BACKOFF * 2 ** attempt, self._MAX_BACKOFF) + random.uniform(0, 1)
+                time.sleep(max(backoff, self._retry_after(e)))
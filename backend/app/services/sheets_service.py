@@ -2,97 +2,550 @@
 Google Sheets service for data persistence
 Ported from CLI script with additional functionality
 """
+import re
+import logging
 import gspread
+import numpy as np
+import pandas as pd
+from gspread.utils import a1_to_rowcol, absolute_range_name, fill_gaps, numericise_all, rowcol_to_a1
 from oauth2client.service_account import ServiceAccountCredentials
-from typing import List, Dict, Any, Optional
+from rapidfuzz import fuzz, process, utils
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import count
+from collections import defaultdict
 from app.models.receipt import Receipt
 from app.models.analysis import Budget, Goal, Category, GoalTransaction
 from app.models.income import Income
 from app.core.config import get_settings
+from app.services.sheets_rate_limit import RateLimitedHTTPClient
+from app.utils.date_parser import parse_sheet_date
+from app.utils.ttl_cache import TTLCache
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Seconds a whole-sheet read is reused; writes through this process invalidate
+# immediately (via the revision), edits made directly in Sheets show up after this
+RECORDS_CACHE_TTL = 30.0
+
+# Column layout of the Receipts sheet (one row per line item)
+RECEIPT_HEADERS = [
+    "Date",
+    "Merchant",
+    "Address",
+    "Item",
+    "Category",
+    "Qty",
+    "Unit Price",
+    "Total Price",
+    "Tax",
+    "Grand Total",
+    "Payment",
+]
+
+# How each goal transaction type moves a goal's amount (other types don't)
+TRANSACTION_SIGNS = {"deposit": 1.0, "withdrawal": -1.0}
+
+_CONTROL_WHITESPACE_RE = re.compile(r"[\n\r\t]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_category(category: str) -> str:
+    """Normalize category name for matching"""
+    # Remove trailing 's', convert to lowercase, strip whitespace
+    normalized = category.lower().strip()
+    # Handle plural/singular variations
+    if normalized.endswith('ies'):
+        normalized = normalized[:-3] + 'y'  # groceries -> grocery
+    elif normalized.endswith('s') and not normalized.endswith('ss'):
+        normalized = normalized[:-1]  # items -> item
+    return normalized
+
+
+@lru_cache(maxsize=4096)
+def normalize_item_name(name: str) -> str:
+    """Normalize item name by removing special chars and extra whitespace"""
+    # Remove newlines, extra spaces, special chars
+    normalized = _CONTROL_WHITESPACE_RE.sub(' ', name.lower().strip())
+    return _WHITESPACE_RE.sub(' ', normalized)
+
 
 class SheetsService:
     """Service for Google Sheets operations"""
 
+    # Process-wide revision, bumped on every write made through any instance.
+    # Used as the basis for HTTP ETags on read endpoints.
+    _revision_counter = count(1)
+    _revision = 0
+
+    # Whole-sheet reads shared by every instance, keyed by (title, revision)
+    _records_cache = TTLCache(ttl=RECORDS_CACHE_TTL, maxsize=16)
+
+    # (title, revision) -> (header row, {record ID: sheet row}) for the Budgets/Goals
+    # sheets. Rows are confirmed before each write, since other processes shift them.
+    _row_index_cache = TTLCache(ttl=RECORDS_CACHE_TTL, maxsize=16)
+
+    # Sheets whose headers were checked by this process; appends to them skip the check
+    _verified_sheets: set = set()
+
+    # Receipt rows grouped by (purchase date, grand total), built once per receipts read
+    _receipt_index_cache = TTLCache(ttl=RECORDS_CACHE_TTL, maxsize=2)
+
+    # Receipts parsed into a DataFrame for spending sums, built once per receipts read
+    _receipt_frame_cache = TTLCache(ttl=RECORDS_CACHE_TTL, maxsize=2)
+
+    # Goal transactions grouped by goal ID, built once per transactions read
+    _transaction_index_cache = TTLCache(ttl=RECORDS_CACHE_TTL, maxsize=2)
+
     def __init__(self):
         self.client = None
         self.spreadsheet = None
         self._authenticate()
 
+    @classmethod
+    def bump_revision(cls) -> int:
+        """Advance the data revision after a write"""
+        cls._revision = next(cls._revision_counter)
+        return cls._revision
+
+    @classmethod
+    def get_revision_id(cls) -> int:
+        """Get the current data revision (changes whenever data is written)"""
+        return cls._revision
+
     def _authenticate(self):
         """Authenticate with Google Sheets"""
         try:
-            print(f"🔐 Authenticating with Google Sheets using: {settings.google_sheets_credentials_path}")
+            logger.debug("Authenticating with Google Sheets using: %s", settings.google_sheets_credentials_path)
             scope = [
                 "https://spreadsheets.google.com/feeds",
                 "https://www.googleapis.com/auth/drive",
             ]
-            print(f"📋 Using scopes: {scope}")
+            logger.debug("Using scopes: %s", scope)
             creds = ServiceAccountCredentials.from_json_keyfile_name(
                 settings.google_sheets_credentials_path, scope
             )
-            print("✅ Credentials loaded successfully")
-            self.client = gspread.authorize(creds)
-            print("🔗 Client authorized successfully")
+            logger.debug("Credentials loaded successfully")
+            # Every request is rate limited and retried with backoff on 429/5xx
+            self.client = gspread.authorize(creds, http_client=RateLimitedHTTPClient)
+            logger.debug("Client authorized successfully")
 
             # Try to open existing spreadsheet first
-            print(f"📊 Looking for spreadsheet: {settings.google_sheet_name}")
+            logger.debug("Looking for spreadsheet: %s", settings.google_sheet_name)
             try:
                 self.spreadsheet = self.client.open(settings.google_sheet_name)
-                print(f"✅ Found existing spreadsheet: {self.spreadsheet.title}")
+                logger.info("Found existing spreadsheet: %s", self.spreadsheet.title)
             except gspread.exceptions.SpreadsheetNotFound:
-                print(f"📝 Spreadsheet '{settings.google_sheet_name}' not found, creating new one...")
+                logger.debug("Spreadsheet '%s' not found, creating new one...", settings.google_sheet_name)
                 try:
                     self.spreadsheet = self.client.create(settings.google_sheet_name)
-                    print(f"✅ Created new spreadsheet: {self.spreadsheet.title}")
+                    logger.info("Created new spreadsheet: %s", self.spreadsheet.title)
                 except Exception as create_error:
-                    print(f"❌ Failed to create spreadsheet: {type(create_error).__name__}: {str(create_error)}")
-                    print("💡 This might be due to insufficient permissions. Please ensure the service account has editor access to Google Drive.")
+                    logger.error("Failed to create spreadsheet: %s: %s", type(create_error).__name__, str(create_error))
+                    logger.warning("This might be due to insufficient permissions. Please ensure the service account has editor access to Google Drive.")
                     raise
 
         except FileNotFoundError as e:
-            print(f"❌ Credentials file not found: {settings.google_sheets_credentials_path}")
+            logger.error("Credentials file not found: %s", settings.google_sheets_credentials_path)
             raise
         except Exception as e:
-            print(f"❌ Authentication failed: {type(e).__name__}: {str(e)}")
+            logger.error("Authentication failed: %s: %s", type(e).__name__, str(e))
             raise
 
     def _get_or_create_worksheet(self, title: str, headers: List[str]) -> gspread.Worksheet:
         """Get existing worksheet or create new one with headers"""
         try:
-            print(f"🔍 Looking for worksheet: '{title}'")
+            logger.debug("Looking for worksheet: '%s'", title)
             worksheet = self.spreadsheet.worksheet(title)
-            print(f"✅ Found existing worksheet: '{worksheet.title}'")
+            logger.debug("Found existing worksheet: '%s'", worksheet.title)
 
             # Check if headers exist (first row should have headers)
             try:
                 first_row = worksheet.row_values(1)
                 if not first_row or first_row != headers:
-                    print(f"⚠️  Headers don't match or are missing. Updating headers...")
+                    logger.warning("Headers don't match or are missing. Updating headers...")
                     worksheet.update('A1', [headers])
-                    print("✅ Headers updated successfully")
+                    logger.info("Headers updated successfully")
             except Exception as e:
-                print(f"⚠️  Could not verify headers: {e}")
+                logger.warning("Could not verify headers: %s", e)
 
         except gspread.exceptions.WorksheetNotFound:
-            print(f"📝 Worksheet '{title}' not found, creating new one...")
+            logger.debug("Worksheet '%s' not found, creating new one...", title)
             try:
                 worksheet = self.spreadsheet.add_worksheet(title=title, rows="1000", cols="20")
-                print(f"✅ Created new worksheet: '{worksheet.title}'")
-                print(f"📋 Adding headers: {headers}")
+                logger.info("Created new worksheet: '%s'", worksheet.title)
+                logger.debug("Adding headers: %s", headers)
                 worksheet.update('A1', [headers])
-                print("✅ Headers added successfully")
+                logger.info("Headers added successfully")
             except Exception as e:
-                print(f"❌ Failed to create worksheet: {type(e).__name__}: {str(e)}")
+                logger.error("Failed to create worksheet: %s: %s", type(e).__name__, str(e))
                 raise
         except Exception as e:
-            print(f"❌ Error accessing worksheet: {type(e).__name__}: {str(e)}")
+            logger.error("Error accessing worksheet: %s: %s", type(e).__name__, str(e))
             raise
         return worksheet
 
+    @staticmethod
+    def _is_missing_sheet(error: gspread.exceptions.APIError) -> bool:
+        """Whether a values.* call failed because the named worksheet doesn't exist"""
+        return "Unable to parse range" in str(error)
+
+    def _get_records(self, title: str) -> List[Dict[str, Any]]:
+        """
+        Read a whole worksheet as records in one values.get call
+
+        Same result as Worksheet.get_all_records(), but addressing the sheet by
+        name skips the metadata round-trip that spreadsheet.worksheet() costs.
+        Results are cached for the current revision, so bursts of duplicate checks
+        and budget calculations share one read. Treat the records as read-only.
+
+        Raises:
+            gspread.exceptions.WorksheetNotFound: If the worksheet doesn't exist
+        """
+        cache_key = (title, self._revision)
+        records = self._records_cache.get(cache_key)
+        if records is not None:
+            return records
+
+        try:
+            values = self.spreadsheet.values_get(absolute_range_name(title)).get("values", [])
+        except gspread.exceptions.APIError as e:
+            if self._is_missing_sheet(e):
+                raise gspread.exceptions.WorksheetNotFound(title) from e
+            raise
+
+        records = self._records_from_values(values)
+        self._records_cache.set(cache_key, records)
+        return records
+
+    @staticmethod
+    def _records_from_values(values: List[List[Any]]) -> List[Dict[str, Any]]:
+        """Convert raw sheet values (header row first) into records, as get_all_records() does"""
+        if not values:
+            return []
+        values = fill_gaps(values)
+        headers = values[0]
+        return [dict(zip(headers, numericise_all(row))) for row in values[1:]]
+
+    def _prefetch_records(self, titles: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Read several worksheets as records, fetching the uncached ones in one values.batchGet
+
+        The results go into the shared records cache, so later _get_records calls
+        at the same revision don't hit the API. Missing worksheets read as [].
+
+        Returns:
+            Title -> records
+        """
+        revision = self._revision
+        records = {}
+        missing = []
+        for title in titles:
+            cached = self._records_cache.get((title, revision))
+            if cached is None:
+                missing.append(title)
+            else:
+                records[title] = cached
+        if not missing:
+            return records
+
+        try:
+            value_ranges = self.spreadsheet.values_batch_get(
+                [absolute_range_name(title) for title in missing]
+            ).get("valueRanges", [])
+        except gspread.exceptions.APIError as e:
+            if not self._is_missing_sheet(e):
+                raise
+            # A missing sheet fails the whole batch - read the sheets one by one
+            for title in missing:
+                try:
+                    records[title] = self._get_records(title)
+                except gspread.exceptions.WorksheetNotFound:
+                    records[title] = []
+            return records
+
+        for title, value_range in zip(missing, value_ranges):
+            records[title] = self._records_from_values(value_range.get("values", []))
+            self._records_cache.set((title, revision), records[title])
+        return records
+
+    @staticmethod
+    def _parse_amount(value: Any) -> float:
+        """Parse a sheet amount, 0.0 if blank or invalid"""
+        try:
+            return float(value or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _receipt_index(self, receipts: List[Dict[str, Any]]) -> Dict[Tuple[int, int], List[Tuple[int, float]]]:
+        """
+        Group receipt rows by purchase date and grand total
+
+        Rows without a valid date or with a zero total can never be reported as
+        duplicates, so they're left out. The index is reused for as long as the
+        same records list is, so checks against an unchanged sheet only parse it once.
+
+        Returns:
+            (date ordinal, grand total in cents) -> (position in receipts, parsed grand total)
+            for each row
+        """
+        cached = self._receipt_index_cache.get(id(receipts))
+        if cached is not None and cached[0] is receipts:
+            return cached[1]
+
+        index = defaultdict(list)
+        for position, row in enumerate(receipts):
+            parsed = parse_sheet_date(str(row.get("Date", "")))
+            grand_total = self._parse_amount(row.get("Grand Total", 0))
+            if parsed is not None and grand_total != 0:
+                index[(parsed.toordinal(), round(grand_total * 100))].append((position, grand_total))
+        # Holding the list keeps its id from being reused while the entry lives
+        self._receipt_index_cache.set(id(receipts), (receipts, index))
+        return index
+
+    def _receipt_frame(self, receipts: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Parse receipt rows into columns for vectorized spending sums
+
+        Like _receipt_index, the frame is reused for as long as the same records
+        list is, so each budget or goal calculation is just a boolean mask.
+        Categories and dates go through normalize_category and parse_sheet_date
+        (both cached), so sums agree with calculate_budget_spending_bulk.
+
+        Returns:
+            DataFrame with "category" (stripped, lowercase), "normalized" (see
+            normalize_category), "date" (NaT if unparseable) and "amount" (NaN if invalid)
+        """
+        cached = self._receipt_frame_cache.get(id(receipts))
+        if cached is not None and cached[0] is receipts:
+            return cached[1]
+
+        df = pd.DataFrame(receipts)
+        missing = pd.Series("", index=df.index, dtype=object)
+        categories = df.get("Category", missing).fillna("").astype(str)
+        dates = df.get("Date", missing).astype(str)
+        frame = pd.DataFrame({
+            "category": categories.str.strip().str.lower(),
+            "normalized": categories.map(normalize_category),
+            "date": pd.to_datetime(dates.map(parse_sheet_date)),
+            "amount": pd.to_numeric(df.get("Total Price", missing), errors="coerce"),
+        })
+        self._receipt_frame_cache.set(id(receipts), (receipts, frame))
+        return frame
+
+    def _transactions_by_goal(self, transactions: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Group goal transaction records by goal ID, keeping sheet order
+
+        Like _receipt_index, the grouping is reused for as long as the same
+        records list is, so per-goal lookups don't rescan the sheet.
+        """
+        cached = self._transaction_index_cache.get(id(transactions))
+        if cached is not None and cached[0] is transactions:
+            return cached[1]
+
+        index = defaultdict(list)
+        for txn in transactions:
+            index[str(txn.get("Goal ID", ""))].append(txn)
+        self._transaction_index_cache.set(id(transactions), (transactions, index))
+        return index
+
+    def _record_rows(
+        self, title: str, headers: Optional[List[str]] = None, refresh: bool = False
+    ) -> Tuple[List[str], Dict[str, int], bool]:
+        """
+        Map record IDs to sheet rows with a single values.batchGet
+
+        Reads just the header row and the ID column, then keeps the map for the
+        current revision; _write_record and _delete_record store a patched copy
+        for the revision they create. Cached maps are never modified in place.
+        When headers are given the worksheet is created or its headers repaired
+        (as _get_or_create_worksheet does) only if needed.
+
+        Args:
+            title: Worksheet title
+            headers: Expected header row, or None to skip the header check
+            refresh: Ignore any cached map and read the sheet again
+
+        Returns:
+            (header row, record ID (column A) -> 1-indexed sheet row number,
+            whether the map came from the cache)
+
+        Raises:
+            gspread.exceptions.WorksheetNotFound: If the worksheet doesn't exist and no headers were given
+        """
+        cache_key = (title, self._revision)
+        cached = None if refresh else self._row_index_cache.get(cache_key)
+        if cached is not None:
+            current_headers, rows = cached
+        else:
+            current_headers = None
+            rows = {}
+            try:
+                header_range, id_range = self.spreadsheet.values_batch_get(
+                    [absolute_range_name(title, "1:1"), absolute_range_name(title, "A2:A")]
+                )["valueRanges"]
+                current_headers = header_range.get("values", [[]])[0]
+                for row_number, row in enumerate(id_range.get("values", []), start=2):
+                    if row:
+                        rows.setdefault(row[0], row_number)
+            except gspread.exceptions.APIError as e:
+                if not self._is_missing_sheet(e):
+                    raise
+                if headers is None:
+                    raise gspread.exceptions.WorksheetNotFound(title) from e
+
+        if headers is not None and current_headers != headers:
+            self._get_or_create_worksheet(title, headers)
+            current_headers = headers
+            cached = None
+
+        if current_headers is not None and cached is None:
+            self._row_index_cache.set(cache_key, (current_headers, rows))
+        return current_headers or [], rows, cached is not None
+
+    def _find_record_row(self, title: str, record_id: str, headers: Optional[List[str]] = None) -> Optional[int]:
+        """
+        Find the sheet row holding a record ID (see _record_rows)
+
+        Rows shift when other workers, the data page or direct edits delete
+        above them, so a row taken from a cached map is confirmed by reading its
+        ID cell first. On a mismatch, or if the ID isn't in the cached map, the
+        map is rebuilt and the ID looked up again.
+
+        Returns:
+            1-indexed sheet row number, or None if the ID isn't present
+        """
+        _, rows, from_cache = self._record_rows(title, headers)
+        row_number = rows.get(record_id)
+        if not from_cache:
+            return row_number
+        if row_number and self._read_record_id(title, row_number) == record_id:
+            return row_number
+
+        logger.debug("Row map for %s is stale, rebuilding", title)
+        _, rows, _ = self._record_rows(title, headers, refresh=True)
+        return rows.get(record_id)
+
+    def _read_record_id(self, title: str, row_number: int) -> Optional[str]:
+        """Read the ID (column A) of one sheet row, None if the cell is empty"""
+        values = self.spreadsheet.values_get(absolute_range_name(title, f"A{row_number}")).get("values", [])
+        return str(values[0][0]) if values and values[0] else None
+
+    def _store_record_rows(self, title: str, cached: Optional[Tuple[List[str], Dict[str, int]]], rows: Dict[str, int]) -> None:
+        """Bump the revision after a record write, carrying a patched row map over to it"""
+        revision = self.bump_revision()
+        if cached is not None:
+            self._row_index_cache.set((title, revision), (cached[0], rows))
+
+    def _write_record(self, title: str, row_number: Optional[int], row: List[Any]) -> None:
+        """
+        Overwrite a record's row, or append it when row_number is None
+
+        Bumps the revision; the caller should have found row_number with
+        _find_record_row just before.
+        """
+        cached = self._row_index_cache.get((title, self._revision))
+        if row_number:
+            self.spreadsheet.values_update(
+                absolute_range_name(title, f"A{row_number}"),
+                params={"valueInputOption": "RAW"},
+                body={"values": [row]},
+            )
+            self._store_record_rows(title, cached, cached[1] if cached else {})
+            return
+
+        response = self.spreadsheet.values_append(
+            absolute_range_name(title),
+            params={"valueInputOption": "RAW"},
+            body={"values": [row]},
+        )
+        try:
+            # e.g. "Budgets!A7:G7"
+            updated_range = response["updates"]["updatedRange"]
+            appended_row = a1_to_rowcol(updated_range.split("!")[-1].split(":")[0])[0]
+        except (KeyError, IndexError, gspread.exceptions.IncorrectCellLabel):
+            cached = None
+        rows = {**cached[1], str(row[0]): appended_row} if cached else {}
+        self._store_record_rows(title, cached, rows)
+
+    def _delete_record(self, title: str, record_id: str) -> bool:
+        """
+        Delete the row holding a record ID, bumping the revision
+
+        Returns:
+            False if the ID isn't present
+        """
+        row_number = self._find_record_row(title, record_id)
+        if not row_number:
+            return False
+
+        cached = self._row_index_cache.get((title, self._revision))
+        self.spreadsheet.worksheet(title).delete_rows(row_number)
+
+        # Rows below the deleted one move up by one
+        rows = {
+            other_id: other_row - 1 if other_row > row_number else other_row
+            for other_id, other_row in (cached[1] if cached else {}).items()
+            if other_id != record_id
+        }
+        self._store_record_rows(title, cached, rows)
+        return True
+
+    def _append_rows(self, title: str, headers: List[str], rows: List[List[Any]]) -> None:
+        """
+        Append rows to a worksheet with a single values.append call
+
+        Headers are verified (via _get_or_create_worksheet) only on the first
+        append to a sheet in this process. If the sheet has been deleted since,
+        it is recreated and the append retried once.
+        """
+        if title not in self._verified_sheets:
+            self._get_or_create_worksheet(title, headers)
+            self._verified_sheets.add(title)
+
+        params = {"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"}
+        try:
+            self.spreadsheet.values_append(absolute_range_name(title), params=params, body={"values": rows})
+        except gspread.exceptions.APIError as e:
+            if not self._is_missing_sheet(e):
+                raise
+            self._get_or_create_worksheet(title, headers)
+            self.spreadsheet.values_append(absolute_range_name(title), params=params, body={"values": rows})
+
+    def append_rows(self, title: str, headers: List[str], rows: List[List[Any]]) -> None:
+        """Append rows to a worksheet in one call and bump the revision (raises on failure)"""
+        self._append_rows(title, headers, rows)
+        self.bump_revision()
+
+    @staticmethod
+    def receipt_rows(receipt: Receipt) -> List[List[Any]]:
+        """Receipts sheet rows for a receipt, one per line item (see RECEIPT_HEADERS)"""
+        # The receipt-level columns are the same on every row
+        merchant = receipt.merchant_details
+        totals = receipt.total_amounts
+        purchase_date = receipt.purchase_date
+        tax = totals.tax if totals.tax else ""
+        return [
+            [
+                purchase_date,
+                merchant.name,
+                merchant.address,
+                item.item_name,
+                item.category,
+                item.quantity,
+                item.unit_price,
+                item.price,
+                tax,
+                totals.total,
+                totals.payment_method,
+            ]
+            for item in receipt.line_items
+        ]
+
     def save_receipt(self, receipt: Receipt) -> bool:
         """
         Save receipt data to Google Sheets
@@ -104,61 +557,22 @@ class SheetsService:
             Success boolean
         """
         try:
-            print(f"💾 Saving receipt to Google Sheets...")
-            print(f"📅 Receipt date: {receipt.purchase_date}")
-            print(f"🏪 Merchant: {receipt.merchant_details.name}")
-            print(f"📦 Line items count: {len(receipt.line_items)}")
-
-            headers = [
-                "Date",
-                "Merchant",
-                "Address",
-                "Item",
-                "Category",
-                "Qty",
-                "Unit Price",
-                "Total Price",
-                "Tax",
-                "Grand Total",
-                "Payment",
-            ]
-            print(f"📋 Headers: {headers}")
-
-            print("🔍 Getting or creating worksheet 'Receipts'...")
-            worksheet = self._get_or_create_worksheet("Receipts", headers)
-            print(f"✅ Worksheet ready: {worksheet.title}")
-
-            # Prepare data rows
-            rows = []
-            for i, item in enumerate(receipt.line_items, 1):
-                row = [
-                    receipt.purchase_date,
-                    receipt.merchant_details.name,
-                    receipt.merchant_details.address,
-                    item.item_name,
-                    item.category,
-                    item.quantity,
-                    item.unit_price,
-                    item.price,
-                    receipt.total_amounts.tax if receipt.total_amounts.tax else "",
-                    receipt.total_amounts.total,
-                    receipt.total_amounts.payment_method,
-                ]
-                rows.append(row)
-                print(f"  📦 Row {i}: {item.item_name} - ${item.price}")
+            logger.debug("Saving receipt to Google Sheets...")
+            logger.debug("Receipt date: %s", receipt.purchase_date)
+            logger.debug("Merchant: %s", receipt.merchant_details.name)
+            logger.debug("Line items count: %s", len(receipt.line_items))
 
-            print(f"📊 Total rows to append: {len(rows)}")
+            rows = self.receipt_rows(receipt)
+            logger.debug("Total rows to append: %s", len(rows))
 
             # Append to sheet
-            print("📝 Appending rows to Google Sheets...")
-            worksheet.append_rows(rows)
-            print(f"✅ Successfully saved {len(rows)} rows to Google Sheets")
+            logger.debug("Appending rows to Google Sheets...")
+            self.append_rows("Receipts", RECEIPT_HEADERS, rows)
+            logger.info("Successfully saved %s rows to Google Sheets", len(rows))
             return True
 
         except Exception as e:
-            print(f"❌ Error saving to Google Sheets: {type(e).__name__}: {str(e)}")
-            import traceback
-            print(f"🔍 Full traceback: {traceback.format_exc()}")
+            logger.exception("Error saving to Google Sheets: %s: %s", type(e).__name__, str(e))
             return False
 
     def find_duplicate_receipts(self, receipt: Receipt, threshold_days: int = 1, fuzzy_threshold: int = 85) -> List[Dict[str, Any]]:
@@ -175,16 +589,13 @@ class SheetsService:
             List of potential duplicate receipt summaries with detailed comparison
         """
         try:
-            from fuzzywuzzy import fuzz
-            import pandas as pd
-
             all_receipts = self.get_all_receipts()
 
             if not all_receipts:
-                print("⚠️ No receipts found in Google Sheet.")
+                logger.debug("No receipts found in Google Sheet.")
                 return []
 
-            print(f"🔎 Starting duplicate check. Total rows in sheet: {len(all_receipts)}")
+            logger.debug("Starting duplicate check. Total rows in sheet: %s", len(all_receipts))
 
             # Parse the receipt date
             try:
@@ -194,69 +605,61 @@ class SheetsService:
                     receipt_date = receipt.purchase_date
                 receipt_date_str = receipt_date.strftime("%d-%m-%Y")
             except Exception as e:
-                print(f"❌ Invalid date format in receipt: {receipt.purchase_date}")
+                logger.warning("Invalid date format in receipt: %s", receipt.purchase_date)
                 return []
 
             merchant_name = receipt.merchant_details.name.lower().strip()
             total_amount = float(receipt.total_amounts.total)
 
-            print(f"Target Receipt - Date: {receipt_date_str}, Merchant: {merchant_name}, Total: ${total_amount}")
-
-            # Create DataFrame for easier manipulation
-            df = pd.DataFrame(all_receipts)
-
-            # Normalize merchant names
-            df['Merchant'] = df['Merchant'].str.lower().str.strip()
-
-            # Convert numeric columns
-            df['Grand Total'] = pd.to_numeric(df['Grand Total'], errors='coerce')
-            df['Total Price'] = pd.to_numeric(df['Total Price'], errors='coerce')
-
-            # Apply fuzzy matching for merchant names
-            df['merchant_score'] = df['Merchant'].apply(
-                lambda x: fuzz.token_set_ratio(str(x), merchant_name) if pd.notna(x) else 0
-            )
-
-            print(f"Fuzzy matching complete. Threshold: {fuzzy_threshold}")
+            logger.debug("Target Receipt - Date: %s, Merchant: %s, Total: $%s", receipt_date_str, merchant_name, total_amount)
+
+            # Only rows dated within threshold_days and totalling within a cent can be
+            # duplicates, so look them up in the index before any fuzzy scoring
+            receipt_index = self._receipt_index(all_receipts)
+            target_day = receipt_date.toordinal()
+            target_cents = round(total_amount * 100)
+            candidates = [
+                entry
+                for day in range(target_day - threshold_days, target_day + threshold_days + 1)
+                for cents in (target_cents - 1, target_cents, target_cents + 1)
+                for entry in receipt_index.get((day, cents), ())
+            ]
+            candidate_rows = [all_receipts[position] for position, _ in candidates]
 
-            # Filter by date proximity and fuzzy merchant match
-            df_match = df[df['merchant_score'] >= fuzzy_threshold].copy()
+            logger.debug("Rows near the receipt's date and total: %s", len(candidate_rows))
 
-            # Further filter by date if possible
-            def parse_date(date_str):
-                try:
-                    return datetime.strptime(str(date_str), "%d-%m-%Y")
-                except:
-                    try:
-                        return datetime.strptime(str(date_str), "%Y-%m-%d")
-                    except:
-                        return None
+            if not candidate_rows:
+                logger.debug("No matching receipts found.")
+                return []
 
-            df_match['parsed_date'] = df_match['Date'].apply(parse_date)
-            df_match = df_match[df_match['parsed_date'].notna()].copy()
-            df_match['date_diff'] = df_match['parsed_date'].apply(
-                lambda x: abs((receipt_date - x).days) if x else 999
-            )
-            df_match = df_match[df_match['date_diff'] <= threshold_days]
+            # Score every candidate merchant in one C call; the processor and integer
+            # scores match fuzzywuzzy's behaviour
+            merchants = [
+                m.lower().strip() if isinstance(m, str) else ""
+                for m in (row.get("Merchant", "") for row in candidate_rows)
+            ]
+            merchant_scores = process.cdist(
+                [merchant_name], merchants,
+                scorer=fuzz.token_set_ratio, processor=utils.default_process, dtype=np.uint8,
+            )[0]
+            matches = np.flatnonzero(merchant_scores >= fuzzy_threshold)
 
-            print(f"Rows matching date and fuzzy merchant (threshold {fuzzy_threshold}): {len(df_match)}")
+            logger.debug("Rows matching date and fuzzy merchant (threshold %s): %s", fuzzy_threshold, len(matches))
 
-            if df_match.empty:
-                print("✅ No matching receipts found.")
+            if not len(matches):
+                logger.debug("No matching receipts found.")
                 return []
 
             # Group by date, merchant, and grand total to reconstruct receipts
             receipt_groups = {}
 
-            for _, row in df_match.iterrows():
+            for position in matches:
+                row = candidate_rows[position]
                 try:
                     date_str = str(row.get("Date", ""))
-                    merchant = str(row.get("Merchant", ""))
-                    grand_total = float(row.get("Grand Total", 0) or 0)
-
-                    # Skip rows with zero total
-                    if grand_total == 0:
-                        continue
+                    merchant = merchants[position]
+                    # Parsed (and known non-zero) when the index was built
+                    grand_total = candidates[position][1]
 
                     # Create unique key for each receipt
                     key = f"{date_str}|{merchant}|{grand_total:.2f}"
@@ -270,7 +673,7 @@ class SheetsService:
                             "Tax": str(row.get("Tax", "")),
                             "Payment": str(row.get("Payment", "")),
                             "items": [],
-                            "merchant_score": row.get("merchant_score", 0)
+                            "merchant_score": int(merchant_scores[position])
                         }
 
                     # Add item to this receipt group (skip if Item is empty or "TOTAL")
@@ -281,25 +684,17 @@ class SheetsService:
                             "Category": str(row.get("Category", "")),
                             "Qty": row.get("Qty", ""),
                             "Unit Price": row.get("Unit Price", ""),
-                            "Total Price": float(row.get("Total Price", 0) or 0)
+                            "Total Price": self._parse_amount(row.get("Total Price", 0))
                         })
 
                 except Exception as e:
-                    print(f"Error processing row: {e}")
+                    logger.error("Error processing row: %s", e)
                     continue
 
             # Check each grouped receipt for duplicates
             duplicates = []
 
             # Build expected items list from the new receipt (normalized)
-            def normalize_item_name(name):
-                """Normalize item name by removing special chars and extra whitespace"""
-                import re
-                # Remove newlines, extra spaces, special chars
-                normalized = re.sub(r'[\n\r\t]+', ' ', name.lower().strip())
-                normalized = re.sub(r'\s+', ' ', normalized)
-                return normalized
-
             expected_items_list = [
                 {
                     'name': normalize_item_name(item.item_name),
@@ -309,9 +704,9 @@ class SheetsService:
                 for item in receipt.line_items
             ]
 
-            print(f"Expected items from new receipt ({len(expected_items_list)} items):")
+            logger.debug("Expected items from new receipt (%s items):", len(expected_items_list))
             for item in expected_items_list[:5]:  # Show first 5
-                print(f"  - {item['name']}: ${item['price']}")
+                logger.debug("  - %s: $%s", item["name"], item["price"])
 
             for key, existing_receipt in receipt_groups.items():
                 try:
@@ -332,30 +727,35 @@ class SheetsService:
                         for item in existing_receipt["items"]
                     ]
 
-                    print(f"\nComparing with existing receipt ({len(matched_items_list)} items):")
+                    logger.debug("Comparing with existing receipt (%s items):", len(matched_items_list))
                     for item in matched_items_list[:5]:  # Show first 5
-                        print(f"  - {item['name']}: ${item['price']}")
+                        logger.debug("  - %s: $%s", item["name"], item["price"])
 
                     # Smart similarity check using fuzzy matching for item names
                     matched_count = 0
                     total_items = max(len(expected_items_list), len(matched_items_list))
 
-                    # For each expected item, find best match in existing receipt
-                    for exp_item in expected_items_list:
-                        best_match_score = 0
-                        for match_item in matched_items_list:
-                            # Use fuzzy matching for item name similarity
-                            name_similarity = fuzz.ratio(exp_item['name'], match_item['name'])
+                    # Only expected items can count as matches, so when there are too few
+                    # of them to reach 70% of the larger list, skip scoring altogether
+                    if len(expected_items_list) < 0.7 * total_items:
+                        logger.debug("Item counts differ too much to reach 70%%, skipping")
+                        continue
 
-                            # If names are very similar (85%+), consider it a match
-                            if name_similarity >= 85:
-                                matched_count += 1
-                                break
+                    # Score every expected item against every existing item at once; an
+                    # expected item matches if any existing name is very similar (85%+).
+                    # The cutoff lets the scorer abandon hopeless pairs early.
+                    if expected_items_list and matched_items_list:
+                        name_scores = process.cdist(
+                            [item['name'] for item in expected_items_list],
+                            [item['name'] for item in matched_items_list],
+                            scorer=fuzz.ratio, dtype=np.uint8, score_cutoff=85,
+                        )
+                        matched_count = int((name_scores.max(axis=1) >= 85).sum())
 
                     # Calculate match percentage
                     match_percentage = (matched_count / total_items * 100) if total_items > 0 else 0
 
-                    print(f"📊 Match score: {matched_count}/{total_items} items ({match_percentage:.1f}%)")
+                    logger.debug("Match score: %s/%s items (%.1f%%)", matched_count, total_items, match_percentage)
 
                     # Consider it a duplicate if:
                     # 1. Same date, merchant, and grand total
@@ -381,19 +781,17 @@ class SheetsService:
                             "items_detail": existing_receipt["items"]
                         }
                         duplicates.append(duplicate_summary)
-                        print(f"✅ Duplicate found! ({match_percentage:.1f}% match)")
+                        logger.debug("Duplicate found! (%.1f%% match)", match_percentage)
 
                 except Exception as e:
-                    print(f"Error processing potential duplicate: {e}")
+                    logger.error("Error processing potential duplicate: %s", e)
                     continue
 
-            print(f"Total duplicates found: {len(duplicates)}")
+            logger.debug("Total duplicates found: %s", len(duplicates))
             return duplicates
 
         except Exception as e:
-            print(f"❌ Error checking for duplicates: {e}")
-            import traceback
-            print(f"🔍 Full traceback: {traceback.format_exc()}")
+            logger.exception("Error checking for duplicates: %s", e)
             return []
 
     def get_all_receipts(self) -> List[Dict[str, Any]]:
@@ -404,11 +802,9 @@ class SheetsService:
             List of receipt dictionaries
         """
         try:
-            worksheet = self.spreadsheet.worksheet("Receipts")
-            records = worksheet.get_all_records()
-            return records
+            return self._get_records("Receipts")
         except Exception as e:
-            print(f"Error reading from Google Sheets: {e}")
+            logger.error("Error reading from Google Sheets: %s", e)
             return []
 
     def get_recent_receipts(self, limit: int = 10) -> List[Dict[str, Any]]:
@@ -422,8 +818,9 @@ class SheetsService:
             List of recent receipt dictionaries with row numbers
         """
         try:
-            worksheet = self.spreadsheet.worksheet("Receipts")
-            all_values = worksheet.get_all_values()
+            all_values = fill_gaps(
+                self.spreadsheet.values_get(absolute_range_name("Receipts")).get("values", [])
+            )
 
             if len(all_values) <= 1:  # Only header or empty
                 return []
@@ -445,7 +842,7 @@ class SheetsService:
 
             return receipts
         except Exception as e:
-            print(f"Error reading recent receipts from Google Sheets: {e}")
+            logger.error("Error reading recent receipts from Google Sheets: %s", e)
             return []
 
     def delete_receipt_by_row(self, row_number: int) -> bool:
@@ -460,25 +857,22 @@ class SheetsService:
         """
         try:
             if row_number <= 1:
-                print(f"❌ Invalid row number {row_number}. Cannot delete header row.")
+                logger.error("Invalid row number %s. Cannot delete header row.", row_number)
                 return False
 
             worksheet = self.spreadsheet.worksheet("Receipts")
             worksheet.delete_rows(row_number)
-            print(f"✅ Deleted row {row_number} from Receipts sheet")
+            logger.info("Deleted row %s from Receipts sheet", row_number)
+            self.bump_revision()
             return True
         except Exception as e:
-            print(f"❌ Error deleting receipt row {row_number}: {e}")
+            logger.error("Error deleting receipt row %s: %s", row_number, e)
             return False
 
     def save_budget(self, budget: Budget) -> bool:
         """Save or update budget"""
         try:
             headers = ["ID", "Category", "Limit", "Period", "Period Type", "Start Date", "End Date"]
-            worksheet = self._get_or_create_worksheet("Budgets", headers)
-
-            # Check if budget exists
-            all_budgets = worksheet.get_all_records()
             budget_id = budget.id or f"budget_{datetime.now().timestamp()}"
 
             row = [
@@ -491,54 +885,36 @@ class SheetsService:
                 budget.end_date or "",
             ]
 
-            # Update existing or append new
-            existing_row = None
-            for idx, b in enumerate(all_budgets, start=2):  # start=2 to skip header
-                if b.get("ID") == budget_id:
-                    existing_row = idx
-                    break
-
-            if existing_row:
-                worksheet.update(f"A{existing_row}:G{existing_row}", [row])
-            else:
-                worksheet.append_row(row)
-
+            # Update existing or append new (header check and ID lookup in one read)
+            existing_row = self._find_record_row("Budgets", budget_id, headers)
+            self._write_record("Budgets", existing_row, row)
             return True
         except Exception as e:
-            print(f"Error saving budget: {e}")
+            logger.error("Error saving budget: %s", e)
             return False
 
     def get_all_budgets(self) -> List[Dict[str, Any]]:
         """Get all budgets"""
         try:
-            worksheet = self.spreadsheet.worksheet("Budgets")
-            return worksheet.get_all_records()
+            return self._get_records("Budgets")
         except gspread.exceptions.WorksheetNotFound:
             return []
         except Exception as e:
-            print(f"Error reading budgets: {e}")
+            logger.error("Error reading budgets: %s", e)
             return []
 
     def delete_budget(self, budget_id: str) -> bool:
         """Delete budget by ID"""
         try:
-            worksheet = self.spreadsheet.worksheet("Budgets")
-            all_budgets = worksheet.get_all_records()
-
-            for idx, budget in enumerate(all_budgets, start=2):
-                if budget.get("ID") == budget_id:
-                    worksheet.delete_rows(idx)
-                    return True
-            return False
+            return self._delete_record("Budgets", budget_id)
         except Exception as e:
-            print(f"Error deleting budget: {e}")
+            logger.error("Error deleting budget: %s", e)
             return False
 
     def save_goal(self, goal: Goal) -> bool:
         """Save or update goal"""
         try:
             headers = ["ID", "Name", "Target Amount", "Current Amount", "Target Date", "Category", "Goal Type", "Auto Track"]
-            worksheet = self._get_or_create_worksheet("Goals", headers)
 
             goal_id = goal.id or f"goal_{datetime.now().timestamp()}"
             row = [
@@ -552,55 +928,61 @@ class SheetsService:
                 str(goal.auto_track),
             ]
 
-            # Update existing or append new
-            all_goals = worksheet.get_all_records()
-            existing_row = None
-            for idx, g in enumerate(all_goals, start=2):
-                if g.get("ID") == goal_id:
-                    existing_row = idx
-                    break
-
-            if existing_row:
-                worksheet.update(f"A{existing_row}:H{existing_row}", [row])
-            else:
-                worksheet.append_row(row)
-
+            # Update existing or append new (header check and ID lookup in one read)
+            existing_row = self._find_record_row("Goals", goal_id, headers)
+            self._write_record("Goals", existing_row, row)
             return True
         except Exception as e:
-            print(f"Error saving goal: {e}")
+            logger.error("Error saving goal: %s", e)
             return False
 
     def get_all_goals(self) -> List[Dict[str, Any]]:
         """Get all goals"""
         try:
-            worksheet = self.spreadsheet.worksheet("Goals")
-            return worksheet.get_all_records()
+            return self._get_records("Goals")
         except gspread.exceptions.WorksheetNotFound:
             return []
         except Exception as e:
-            print(f"Error reading goals: {e}")
+            logger.error("Error reading goals: %s", e)
             return []
 
+    def get_goal_by_id(self, goal_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a single goal by ID
+
+        Finds the goal's row through the shared row map (see _find_record_row)
+        and reads only that row, instead of the whole Goals sheet.
+        """
+        try:
+            row_number = self._find_record_row("Goals", goal_id)
+            if not row_number:
+                return None
+
+            headers, _, _ = self._record_rows("Goals")
+            values = self.spreadsheet.values_get(
+                absolute_range_name("Goals", f"{row_number}:{row_number}")
+            ).get("values", [[]])
+            row = values[0] if values else []
+            goal = dict(zip(headers, numericise_all(row + [""] * (len(headers) - len(row)))))
+            return goal if str(goal.get("ID")) == goal_id else None
+        except gspread.exceptions.WorksheetNotFound:
+            return None
+        except Exception as e:
+            logger.error("Error reading goal %s: %s", goal_id, e)
+            return None
+
     def delete_goal(self, goal_id: str) -> bool:
         """Delete goal by ID"""
         try:
-            worksheet = self.spreadsheet.worksheet("Goals")
-            all_goals = worksheet.get_all_records()
-
-            for idx, goal in enumerate(all_goals, start=2):
-                if goal.get("ID") == goal_id:
-                    worksheet.delete_rows(idx)
-                    return True
-            return False
+            return self._delete_record("Goals", goal_id)
         except Exception as e:
-            print(f"Error deleting goal: {e}")
+            logger.error("Error deleting goal: %s", e)
             return False
 
     def save_category(self, category: Category) -> bool:
         """Save custom category"""
         try:
             headers = ["ID", "Name", "Icon", "Color", "Is Default"]
-            worksheet = self._get_or_create_worksheet("Categories", headers)
 
             category_id = category.id or f"cat_{datetime.now().timestamp()}"
             row = [
@@ -611,10 +993,11 @@ class SheetsService:
                 str(category.is_default),
             ]
 
-            worksheet.append_row(row)
+            self._append_rows("Categories", headers, [row])
+            self.bump_revision()
             return True
         except Exception as e:
-            print(f"Error saving category: {e}")
+            logger.error("Error saving category: %s", e)
             return False
 
     def get_all_categories(self) -> List[Dict[str, Any]]:
@@ -632,13 +1015,12 @@ class SheetsService:
         ]
 
         try:
-            worksheet = self.spreadsheet.worksheet("Categories")
-            return worksheet.get_all_records()
+            return self._get_records("Categories")
         except (gspread.exceptions.WorksheetNotFound, gspread.exceptions.SpreadsheetNotFound):
             # Return default categories if worksheet or spreadsheet doesn't exist
             return default_categories
         except Exception as e:
-            print(f"Error reading categories: {e}")
+            logger.error("Error reading categories: %s", e)
             # Return default categories on any error
             return default_categories
 
@@ -654,19 +1036,58 @@ class SheetsService:
                 return self.spreadsheet.url
             return None
         except Exception as e:
-            print(f"Error getting spreadsheet URL: {e}")
+            logger.error("Error getting spreadsheet URL: %s", e)
             return None
 
-    def _normalize_category(self, category: str) -> str:
-        """Normalize category name for matching"""
-        # Remove trailing 's', convert to lowercase, strip whitespace
-        normalized = category.lower().strip()
-        # Handle plural/singular variations
-        if normalized.endswith('ies'):
-            normalized = normalized[:-3] + 'y'  # groceries -> grocery
-        elif normalized.endswith('s') and not normalized.endswith('ss'):
-            normalized = normalized[:-1]  # items -> item
-        return normalized
+    def _budget_date_range(
+        self,
+        period: str,
+        period_type: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        now: datetime,
+    ) -> Tuple[datetime, datetime]:
+        """Resolve a budget's period settings to an inclusive (start, end) range"""
+        if period_type == "rolling":
+            # Rolling period (last N days)
+            if period == "weekly":
+                range_start = now - timedelta(days=7)
+            else:  # monthly
+                range_start = now - timedelta(days=30)
+            range_end = now
+
+        elif period_type == "calendar_month":
+            # Current calendar month
+            range_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            # Last day of current month
+            if now.month == 12:
+                range_end = now.replace(month=12, day=31, hour=23, minute=59, second=59)
+            else:
+                next_month = now.replace(month=now.month + 1, day=1)
+                range_end = next_month - timedelta(seconds=1)
+
+        elif period_type == "calendar_week":
+            # Current calendar week (Monday to Sunday)
+            start_of_week = now - timedelta(days=now.weekday())
+            range_start = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+            range_end = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
+
+        elif period_type == "custom" and start_date and end_date:
+            # Custom date range
+            try:
+                range_start = datetime.strptime(start_date, "%Y-%m-%d")
+                range_end = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+            except:
+                # Fallback to calendar month if parsing fails
+                range_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+                range_end = now
+
+        else:
+            # Default: calendar month
+            range_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            range_end = now
+
+        return range_start, range_end
 
     def calculate_budget_spending(
         self,
@@ -674,7 +1095,8 @@ class SheetsService:
         period: str = "monthly",
         period_type: str = "calendar_month",
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        receipts: Optional[List[Dict[str, Any]]] = None,
     ) -> float:
         """
         Calculate current spending for a budget category and period
@@ -685,163 +1107,289 @@ class SheetsService:
             period_type: "rolling", "calendar_month", "calendar_week", "custom"
             start_date: Custom start date (YYYY-MM-DD format)
             end_date: Custom end date (YYYY-MM-DD format)
+            receipts: Pre-fetched receipt rows (fetched from the sheet if omitted)
 
         Returns:
             Total spending for the period
         """
         try:
-            receipts = self.get_all_receipts()
-            now = datetime.now()
-            total_spending = 0.0
+            if receipts is None:
+                receipts = self.get_all_receipts()
 
             # Normalize the target category for fuzzy matching
-            normalized_category = self._normalize_category(category)
+            normalized_category = normalize_category(category)
 
             # Determine date range based on period_type
-            range_start = None
-            range_end = None
-
-            if period_type == "rolling":
-                # Rolling period (last N days)
-                if period == "weekly":
-                    range_start = now - timedelta(days=7)
-                else:  # monthly
-                    range_start = now - timedelta(days=30)
-                range_end = now
+            range_start, range_end = self._budget_date_range(
+                period, period_type, start_date, end_date, datetime.now()
+            )
 
-            elif period_type == "calendar_month":
-                # Current calendar month
-                range_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                # Last day of current month
-                if now.month == 12:
-                    range_end = now.replace(month=12, day=31, hour=23, minute=59, second=59)
-                else:
-                    next_month = now.replace(month=now.month + 1, day=1)
-                    range_end = next_month - timedelta(seconds=1)
+            logger.debug("Budget calculation for '%s' (%s)", category, period_type)
+            logger.debug("Date range: %s to %s", range_start.strftime("%Y-%m-%d"), range_end.strftime("%Y-%m-%d"))
 
-            elif period_type == "calendar_week":
-                # Current calendar week (Monday to Sunday)
-                start_of_week = now - timedelta(days=now.weekday())
-                range_start = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-                range_end = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
+            # Filter every receipt in one vectorized pass
+            frame = self._receipt_frame(receipts)
+            mask = (frame["normalized"] == normalized_category) & frame["date"].between(range_start, range_end)
+            total_spending = float(frame["amount"][mask].sum())
+            logger.debug("Included %s receipts", int(mask.sum()))
 
-            elif period_type == "custom" and start_date and end_date:
-                # Custom date range
-                try:
-                    range_start = datetime.strptime(start_date, "%Y-%m-%d")
-                    range_end = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-                except:
-                    # Fallback to calendar month if parsing fails
-                    range_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                    range_end = now
+            logger.debug("Total spending: $%.2f", total_spending)
+            return total_spending
 
-            else:
-                # Default: calendar month
-                range_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                range_end = now
+        except Exception as e:
+            logger.error("Error calculating budget spending: %s", e)
+            return 0.0
 
-            print(f"💰 Budget calculation for '{category}' ({period_type})")
-            print(f"   Date range: {range_start.strftime('%Y-%m-%d')} to {range_end.strftime('%Y-%m-%d')}")
+    def calculate_budget_spending_bulk(
+        self,
+        budgets: List[Dict[str, Any]],
+        receipts: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[float]:
+        """
+        Calculate current spending for many budgets in one pass over the receipts
 
-            # Calculate spending
-            for receipt in receipts:
-                try:
-                    # Check category match with fuzzy matching
-                    receipt_category = receipt.get("Category", "").strip()
-                    normalized_receipt_cat = self._normalize_category(receipt_category)
+        Matches calculate_budget_spending per budget, but each receipt's category
+        and date are normalized once and only checked against budgets with the
+        same normalized category.
 
-                    # Match if normalized categories are the same
-                    if normalized_receipt_cat != normalized_category:
-                        continue
+        Args:
+            budgets: Budget rows (Category, Period, Period Type, Start Date, End Date)
+            receipts: Pre-fetched receipt rows (fetched from the sheet if omitted)
 
-                    # Parse date
-                    date_str = receipt.get("Date", "")
-                    try:
-                        receipt_date = datetime.strptime(date_str, "%d-%m-%Y")
-                    except:
-                        try:
-                            receipt_date = datetime.strptime(date_str, "%Y-%m-%d")
-                        except:
-                            continue
+        Returns:
+            Spending per budget, in the same order as budgets
+        """
+        totals = [0.0] * len(budgets)
+        if not budgets:
+            return totals
 
-                    # Check if within date range
-                    if range_start <= receipt_date <= range_end:
-                        amount = float(receipt.get("Total Price", 0))
-                        total_spending += amount
-                        print(f"   ✓ Included: {receipt_date.strftime('%Y-%m-%d')} - {receipt_category} - ${amount}")
+        try:
+            if receipts is None:
+                receipts = self.get_all_receipts()
+            now = datetime.now()
 
-                except Exception as e:
-                    print(f"   ✗ Error processing receipt: {e}")
+            # Normalized category -> [(budget position, range start, range end)]
+            budgets_by_category = defaultdict(list)
+            for position, budget in enumerate(budgets):
+                range_start, range_end = self._budget_date_range(
+                    budget.get("Period", "monthly"),
+                    budget.get("Period Type", "calendar_month"),
+                    budget.get("Start Date") or None,
+                    budget.get("End Date") or None,
+                    now,
+                )
+                normalized_category = normalize_category(budget.get("Category", ""))
+                budgets_by_category[normalized_category].append((position, range_start, range_end))
+
+            budgets_for = budgets_by_category.get
+            for receipt in receipts:
+                receipt_category = str(receipt.get("Category", "")).strip()
+                matches = budgets_for(normalize_category(receipt_category))
+                if not matches:
                     continue
 
-            print(f"   Total spending: ${total_spending:.2f}")
-            return total_spending
+                receipt_date = parse_sheet_date(str(receipt.get("Date", "")))
+                if receipt_date is None:
+                    continue
+
+                try:
+                    amount = float(receipt.get("Total Price", 0))
+                except (ValueError, TypeError):
+                    continue
+
+                for position, range_start, range_end in matches:
+                    if range_start <= receipt_date <= range_end:
+                        totals[position] += amount
+
+            logger.debug("Budget spending calculated for %s budgets over %s receipts", len(budgets), len(receipts))
+            return totals
 
         except Exception as e:
-            print(f"Error calculating budget spending: {e}")
-            return 0.0
+            logger.error("Error calculating budget spending: %s", e)
+            return [0.0] * len(budgets)
 
     def save_goal_transaction(self, transaction: GoalTransaction) -> bool:
         """Save a goal transaction"""
+        return self.save_goal_transactions([transaction])
+
+    def save_goal_transactions(self, transactions: List[GoalTransaction]) -> bool:
+        """
+        Save several goal transactions with a single append
+
+        Args:
+            transactions: Transactions to save; ones without an ID get a generated one
+
+        Returns:
+            Success boolean
+        """
+        if not transactions:
+            return True
         try:
             headers = ["ID", "Goal ID", "Amount", "Type", "Date", "Note"]
-            worksheet = self._get_or_create_worksheet("Goal Transactions", headers)
 
-            transaction_id = transaction.id or f"txn_{datetime.now().timestamp()}"
-            row = [
-                transaction_id,
-                transaction.goal_id,
-                transaction.amount,
-                transaction.transaction_type,
-                transaction.date,
-                transaction.note or "",
+            timestamp = datetime.now().timestamp()
+            rows = [
+                [
+                    transaction.id or (f"txn_{timestamp}_{i}" if len(transactions) > 1 else f"txn_{timestamp}"),
+                    transaction.goal_id,
+                    transaction.amount,
+                    transaction.transaction_type,
+                    transaction.date,
+                    transaction.note or "",
+                ]
+                for i, transaction in enumerate(transactions)
             ]
 
-            worksheet.append_row(row)
+            self._append_rows("Goal Transactions", headers, rows)
+            self.bump_revision()
             return True
         except Exception as e:
-            print(f"Error saving goal transaction: {e}")
+            logger.error("Error saving goal transactions: %s", e)
             return False
 
-    def get_goal_transactions(self, goal_id: str) -> List[Dict[str, Any]]:
-        """Get all transactions for a specific goal"""
+    def get_all_goal_transactions(self) -> List[Dict[str, Any]]:
+        """Get transactions for all goals"""
         try:
-            worksheet = self.spreadsheet.worksheet("Goal Transactions")
-            all_transactions = worksheet.get_all_records()
+            return self._get_records("Goal Transactions")
+        except gspread.exceptions.WorksheetNotFound:
+            return []
+        except Exception as e:
+            logger.error("Error reading goal transactions: %s", e)
+            return []
+
+    def get_goal_transactions(
+        self, goal_id: str, limit: Optional[int] = None, offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Get transactions for a specific goal
 
-            # Filter by goal_id
-            return [t for t in all_transactions if t.get("Goal ID") == goal_id]
+        Args:
+            goal_id: Goal ID to filter by
+            limit: Maximum number of transactions to return (None for all)
+            offset: Number of matching transactions to skip
+
+        Returns:
+            List of transaction dictionaries
+        """
+        try:
+            all_transactions = self._get_records("Goal Transactions")
+            matching = self._transactions_by_goal(all_transactions).get(goal_id, [])
+            stop = offset + limit if limit is not None else None
+            return matching[offset:stop]
         except gspread.exceptions.WorksheetNotFound:
             return []
         except Exception as e:
-            print(f"Error reading goal transactions: {e}")
+            logger.error("Error reading goal transactions: %s", e)
             return []
 
-    def calculate_goal_progress(self, goal: Goal) -> float:
+    def recalculate_and_save(self, goal: Goal) -> Optional[float]:
+        """
+        Recalculate goal progress and persist the new current amount
+
+        When the goal's row is found, only its Current Amount cell is written
+        instead of the full save_goal row.
+
+        Args:
+            goal: Goal object (updated in place)
+
+        Returns:
+            New current amount for the goal, or None if it couldn't be saved
+        """
+        new_amount = self.calculate_goal_progress(goal)
+        goal.current_amount = new_amount
+
+        try:
+            row_number = self._find_record_row("Goals", goal.id) if goal.id else None
+            headers, _, _ = self._record_rows("Goals") if row_number else ([], {}, False)
+            if "Current Amount" not in headers:
+                return new_amount if self.save_goal(goal) else None
+
+            cell = rowcol_to_a1(row_number, headers.index("Current Amount") + 1)
+            cached = self._row_index_cache.get(("Goals", self._revision))
+            self.spreadsheet.values_update(
+                absolute_range_name("Goals", cell),
+                params={"valueInputOption": "RAW"},
+                body={"values": [[new_amount]]},
+            )
+            self._store_record_rows("Goals", cached, cached[1] if cached else {})
+            return new_amount
+        except Exception as e:
+            logger.error("Error saving goal progress: %s", e)
+            return None
+
+    def get_all_goal_progress(self, goals: List[Goal]) -> Dict[str, float]:
+        """
+        Calculate progress for every auto-tracked goal from a single batched read
+
+        Goal transactions (and receipts, when a spending-limit goal needs them)
+        come from the records cache, with any uncached sheets fetched together
+        in one values.batchGet, and are shared across all goals instead of
+        re-reading the sheets for each goal.
+
+        Args:
+            goals: Goal objects
+
+        Returns:
+            Dict mapping goal ID to current amount (auto-tracked goals only)
+        """
+        auto_tracked = [g for g in goals if g.auto_track]
+        if not auto_tracked:
+            return {}
+
+        needs_receipts = any(g.goal_type == "spending_limit" and g.category for g in auto_tracked)
+        titles = ["Goal Transactions", "Receipts"] if needs_receipts else ["Goal Transactions"]
+
+        try:
+            records = self._prefetch_records(titles)
+            transactions = records["Goal Transactions"]
+            receipts = records.get("Receipts")
+        except Exception as e:
+            logger.warning("Batched goal read failed, falling back: %s", e)
+            transactions = self.get_all_goal_transactions()
+            receipts = self.get_all_receipts() if needs_receipts else None
+
+        transactions_by_goal = self._transactions_by_goal(transactions)
+
+        return {
+            goal.id: self.calculate_goal_progress(
+                goal, transactions=transactions_by_goal.get(goal.id or "", []), receipts=receipts
+            )
+            for goal in auto_tracked
+        }
+
+    def calculate_goal_progress(
+        self,
+        goal: Goal,
+        transactions: Optional[List[Dict[str, Any]]] = None,
+        receipts: Optional[List[Dict[str, Any]]] = None,
+    ) -> float:
         """
         Calculate goal progress based on goal type
 
         Args:
             goal: Goal object
+            transactions: Pre-fetched transactions for this goal (fetched if omitted)
+            receipts: Pre-fetched receipt rows (fetched if omitted)
 
         Returns:
             Current amount for the goal
         """
+        if transactions is None and receipts is None:
+            # Read Goal Transactions and Receipts in one values.batchGet (see get_all_goal_progress)
+            return self.get_all_goal_progress([goal]).get(goal.id, goal.current_amount)
+
         try:
             if not goal.auto_track:
                 # Manual tracking - use current_amount as is
                 return goal.current_amount
 
             # Get manual transactions
-            transactions = self.get_goal_transactions(goal.id or "")
-            transaction_total = 0.0
-            for txn in transactions:
-                amount = float(txn.get("Amount", 0))
-                txn_type = txn.get("Type", "")
-                if txn_type == "deposit":
-                    transaction_total += amount
-                elif txn_type == "withdrawal":
-                    transaction_total -= amount
+            if transactions is None:
+                transactions = self.get_goal_transactions(goal.id or "")
+            transaction_total = sum(
+                (float(txn.get("Amount", 0)) * TRANSACTION_SIGNS.get(txn.get("Type", ""), 0.0) for txn in transactions),
+                0.0,
+            )
 
             if goal.goal_type == "savings":
                 # Savings goal: manual transactions contribute to current amount
@@ -857,24 +1405,14 @@ class SheetsService:
 
                         # If target is within this month, use monthly period
                         if target_date.month == now.month and target_date.year == now.year:
-                            spending = self.calculate_budget_spending(goal.category, "monthly")
+                            spending = self.calculate_budget_spending(goal.category, "monthly", receipts=receipts)
                         else:
                             # Use all-time spending up to target date
-                            receipts = self.get_all_receipts()
-                            spending = 0.0
-                            for receipt in receipts:
-                                try:
-                                    if receipt.get("Category", "").strip().lower() == goal.category.lower():
-                                        date_str = receipt.get("Date", "")
-                                        try:
-                                            receipt_date = datetime.strptime(date_str, "%d-%m-%Y")
-                                        except:
-                                            receipt_date = datetime.strptime(date_str, "%Y-%m-%d")
-
-                                        if receipt_date <= target_date:
-                                            spending += float(receipt.get("Total Price", 0))
-                                except:
-                                    continue
+                            if receipts is None:
+                                receipts = self.get_all_receipts()
+                            frame = self._receipt_frame(receipts)
+                            mask = (frame["category"] == goal.category.lower()) & (frame["date"] <= target_date)
+                            spending = float(frame["amount"][mask].sum())
 
                         return spending
                     except:
@@ -884,5 +1422,5 @@ class SheetsService:
             return goal.current_amount
 
         except Exception as e:
-            print(f"Error calculating goal progress: {e}")
+            logger.error("Error calculating goal progress: %s", e)
             return goal.current_amount
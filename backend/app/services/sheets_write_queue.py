@@ -0,0 +1,97 @@
+"""
+Write queue that coalesces concurrent Google Sheets appends
+"""
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional
+
+from app.models.receipt import Receipt
+from app.services.sheets_service import RECEIPT_HEADERS, SheetsService
+
+logger = logging.getLogger(__name__)
+
+# Most rows sent in one values.append call
+MAX_BATCH_ROWS = 500
+
+
+class SheetsWriteQueue:
+    """
+    Group-commit queue for worksheet appends
+
+    Appends that arrive while a write is in flight are merged, per worksheet,
+    into the next values.append, so concurrent confirmations share one round
+    trip. A lone append is written right away, with no batching delay. The
+    Sheets calls themselves run on a worker thread, off the event loop.
+    """
+
+    def __init__(self, get_service: Callable[[], SheetsService]):
+        self._get_service = get_service
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def append(self, title: str, headers: List[str], rows: List[List[Any]]) -> None:
+        """
+        Append rows to a worksheet, returning once they are written
+
+        Raises:
+            Whatever the underlying Sheets write raised
+        """
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((title, headers, rows, future))
+        await future
+
+    async def save_receipt(self, receipt: Receipt) -> bool:
+        """Queue a receipt's rows for the Receipts sheet (see SheetsService.save_receipt)"""
+        rows = SheetsService.receipt_rows(receipt)
+        try:
+            await self.append("Receipts", RECEIPT_HEADERS, rows)
+            logger.info("Successfully saved %s rows to Google Sheets", len(rows))
+            return True
+        except Exception as e:
+            logger.exception("Error saving to Google Sheets: %s: %s", type(e).__name__, str(e))
+            return False
+
+    async def _run(self) -> None:
+        """Drain everything queued so far and write it, one append per worksheet and batch"""
+        while True:
+            pending = [await self._queue.get()]
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+
+            batches = {}
+            for item in pending:
+                title, _, rows, _ = item
+                title_batches = batches.setdefault(title, [[]])
+                batch_rows = sum(len(queued[2]) for queued in title_batches[-1])
+                if title_batches[-1] and batch_rows + len(rows) > MAX_BATCH_ROWS:
+                    title_batches.append([])
+                title_batches[-1].append(item)
+
+            for title, title_batches in batches.items():
+                for batch in title_batches:
+                    await self._write(title, batch)
+
+    async def _write(self, title: str, batch: List[tuple]) -> None:
+        """Write one batch of queued appends and settle their futures"""
+        headers = batch[0][1]
+        rows = [row for _, _, item_rows, _ in batch for row in item_rows]
+        if len(batch) > 1:
+            logger.debug("Coalesced %s appends to %s into one write (%s rows)", len(batch), title, len(rows))
+
+        try:
+            await asyncio.to_thread(self._get_service().append_rows, title, headers, rows)
+            error = None
+        except Exception as e:
+            error = e
+
+        for _, _, _, future in batch:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
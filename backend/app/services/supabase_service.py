@@ -2,12 +2,22 @@
 Supabase service for database operations
 """
 from supabase import create_client, Client
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from app.core.config import get_settings
+from app.utils.ttl_cache import TTLCache
 from functools import lru_cache
 
 settings = get_settings()
 
+# Active category names per user; categories change rarely but are read on every upload
+CATEGORY_NAMES_TTL = 300
+_category_names_cache = TTLCache(ttl=CATEGORY_NAMES_TTL, maxsize=1024)
+
+# Columns the API and frontend actually read, so list queries don't ship whole rows
+SPREADSHEET_COLUMNS = 'id,google_sheet_id,google_sheet_name,display_name,is_active,created_at'
+CATEGORY_COLUMNS = 'id,name,icon,color,is_default,is_active,sort_order'
+EXTRACTION_RULE_COLUMNS = 'id,rule_type,pattern,target_category_id,priority,custom_categories(id,name,icon)'
+
 
 @lru_cache()
 def get_supabase_client() -> Client:
@@ -72,7 +82,7 @@ class SupabaseService:
         """Get all spreadsheets for a user"""
         try:
             response = self.client.table('user_spreadsheets')\
-                .select('*')\
+                .select(SPREADSHEET_COLUMNS)\
                 .eq('user_id', user_id)\
                 .eq('is_archived', False)\
                 .execute()
@@ -81,11 +91,17 @@ class SupabaseService:
             print(f"Error fetching spreadsheets: {e}")
             return []
 
+    def get_spreadsheets_with_active(self, user_id: str) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Get all of a user's spreadsheets plus the active one, from a single query"""
+        spreadsheets = self.get_user_spreadsheets(user_id)
+        active = next((sheet for sheet in spreadsheets if sheet.get('is_active')), None)
+        return spreadsheets, active
+
     def get_active_spreadsheet(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user's active spreadsheet"""
         try:
             response = self.client.table('user_spreadsheets')\
-                .select('*')\
+                .select(SPREADSHEET_COLUMNS)\
                 .eq('user_id', user_id)\
                 .eq('is_active', True)\
                 .eq('is_archived', False)\
@@ -96,7 +112,18 @@ class SupabaseService:
             return None
 
     def set_active_spreadsheet(self, user_id: str, sheet_id: str) -> bool:
-        """Set a spreadsheet as active"""
+        """Set a spreadsheet as active (and every other one of the user's inactive)"""
+        try:
+            # One atomic statement, so there's never a moment with no active sheet
+            self.client.rpc('set_active_spreadsheet', {
+                'p_user_id': user_id,
+                'p_sheet_id': sheet_id
+            }).execute()
+            return True
+        except Exception as e:
+            # Database without the set_active_spreadsheet function (migration_add_set_active_spreadsheet.sql)
+            print(f"⚠️ set_active_spreadsheet RPC failed, falling back to two updates: {e}")
+
         try:
             # Deactivate all spreadsheets
             self.client.table('user_spreadsheets')\
@@ -124,7 +151,7 @@ class SupabaseService:
         """
         try:
             query = self.client.table('custom_categories')\
-                .select('*')\
+                .select(CATEGORY_COLUMNS)\
                 .eq('user_id', user_id)
 
             if active_only:
@@ -136,6 +163,23 @@ class SupabaseService:
             print(f"Error fetching categories: {e}")
             return []
 
+    def get_category_names(self, user_id: str) -> Tuple[str, ...]:
+        """Get names of the user's active categories (cached for a few minutes)
+
+        Args:
+            user_id: The user's ID
+        """
+        names = _category_names_cache.get(user_id)
+        if names is None:
+            names = tuple(cat["name"] for cat in self.get_user_categories(user_id))
+            _category_names_cache.set(user_id, names)
+        return names
+
+    @staticmethod
+    def invalidate_category_names(user_id: str) -> None:
+        """Drop the cached category names after the user edits their categories"""
+        _category_names_cache.pop(user_id)
+
     def create_category(self, user_id: str, name: str, icon: str = '📦', color: str = '#6366f1') -> Dict[str, Any]:
         """Create a custom category"""
         try:
@@ -162,6 +206,72 @@ class SupabaseService:
             print(f"Error updating category: {e}")
             return None
 
+    def toggle_category(self, category_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Flip a category's active status, returning the updated row (None if not found)
+
+        Args:
+            category_id: The category's ID
+            user_id: The owning user's ID (categories of other users are never matched)
+        """
+        try:
+            response = self.client.rpc('toggle_category', {
+                'p_category_id': category_id,
+                'p_user_id': user_id
+            }).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            # Database without the toggle_category function (migration_add_toggle_category.sql)
+            print(f"⚠️ toggle_category RPC failed, falling back to read + update: {e}")
+
+        try:
+            response = self.client.table('custom_categories')\
+                .select('is_active')\
+                .eq('id', category_id)\
+                .eq('user_id', user_id)\
+                .execute()
+            if not response.data:
+                return None
+            response = self.client.table('custom_categories')\
+                .update({'is_active': not response.data[0]['is_active']})\
+                .eq('id', category_id)\
+                .eq('user_id', user_id)\
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            print(f"Error toggling category: {e}")
+            return None
+
+    def batch_update_categories(self, user_id: str, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply several category edits at once, returning the updated rows
+
+        Args:
+            user_id: The owning user's ID (categories of other users are never matched)
+            updates: Dicts with an "id" plus any of name/icon/color/is_active
+        """
+        try:
+            response = self.client.rpc('batch_update_categories', {
+                'p_user_id': user_id,
+                'p_updates': updates
+            }).execute()
+            return response.data or []
+        except Exception as e:
+            # Database without the batch_update_categories function
+            print(f"⚠️ batch_update_categories RPC failed, updating one by one: {e}")
+
+        updated = []
+        for update in updates:
+            patch = {key: value for key, value in update.items() if key != 'id'}
+            try:
+                response = self.client.table('custom_categories')\
+                    .update(patch)\
+                    .eq('id', update['id'])\
+                    .eq('user_id', user_id)\
+                    .execute()
+                updated.extend(response.data or [])
+            except Exception as e:
+                print(f"Error updating category {update['id']}: {e}")
+        return updated
+
     def delete_category(self, category_id: str) -> bool:
         """Soft delete a category"""
         try:
@@ -179,7 +289,7 @@ class SupabaseService:
         """Get user's extraction rules"""
         try:
             response = self.client.table('extraction_rules')\
-                .select('*, custom_categories(*)')\
+                .select(EXTRACTION_RULE_COLUMNS)\
                 .eq('user_id', user_id)\
                 .eq('is_active', True)\
                 .order('priority')\
@@ -237,18 +347,17 @@ class SupabaseService:
     def update_user_preferences(self, user_id: str, preferences: Dict[str, Any]) -> bool:
         """Update user preferences"""
         try:
-            # Check if preferences exist
-            existing = self.get_user_preferences(user_id)
-
-            if existing:
-                self.client.table('user_preferences')\
-                    .update(preferences)\
-                    .eq('user_id', user_id)\
-                    .execute()
-            else:
-                preferences['user_id'] = user_id
-                self.client.table('user_preferences').insert(preferences).execute()
+            # Insert or update in one round trip (user_id is UNIQUE)
+            self.client.table('user_preferences')\
+                .upsert({**preferences, 'user_id': user_id}, on_conflict='user_id')\
+                .execute()
             return True
         except Exception as e:
             print(f"Error updating preferences: {e}")
             return False
+
+
+@lru_cache()
+def get_supabase_service() -> SupabaseService:
+    """Get the shared SupabaseService instance"""
+    return SupabaseService()
@@ -3,18 +3,45 @@ Upload service for async receipt processing
 """
 import os
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
+from app.core.config import get_settings
+from app.models.receipt import Receipt
 from app.models.upload_job import UploadJob, UploadStatus
 from app.services.gemini_service import GeminiService
+from app.services.extraction_cache import extraction_cache, hash_files
+from app.services.job_store import JobStore
+
+settings = get_settings()
+
+# Extraction threads for async jobs, kept apart from the shared blocking-io pool so a
+# burst of uploads can't starve Sheets/Supabase calls waiting on the same threads
+_extraction_executor = ThreadPoolExecutor(
+    max_workers=settings.upload_concurrency, thread_name_prefix="extraction"
+)
+_job_slots = asyncio.Semaphore(settings.upload_concurrency)
+
+# Seconds between Gemini batch job status checks
+BATCH_POLL_INTERVAL = 30
+
+BATCH_DONE_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_PARTIALLY_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
 
 
 class UploadService:
     """Service for managing async upload jobs"""
 
     def __init__(self):
-        self.jobs: Dict[str, UploadJob] = {}
+        self.jobs = JobStore()
         self.gemini_service = GeminiService()
+        # Keep references to batch pollers so they aren't garbage collected mid-flight
+        self._batch_tasks = set()
 
     def create_job(self, receipt_id: str, file_path, custom_categories: Optional[list] = None) -> UploadJob:
         """Create a new upload job
@@ -38,19 +65,23 @@ class UploadService:
             created_at=datetime.now(),
             updated_at=datetime.now(),
         )
-        self.jobs[receipt_id] = job
+        self.jobs.add(job)
         return job
 
     def get_job(self, receipt_id: str) -> Optional[UploadJob]:
         """Get job by receipt ID"""
         return self.jobs.get(receipt_id)
 
+    def save_job(self, job: UploadJob):
+        """Persist changes made to a job returned by get_job"""
+        job.updated_at = datetime.now()
+        self.jobs.set(job)
+
     def update_job_status(
         self, receipt_id: str, status: UploadStatus, progress: int = None, error: str = None
     ):
         """Update job status"""
-        if receipt_id in self.jobs:
-            job = self.jobs[receipt_id]
+        def apply(job: UploadJob):
             job.status = status
             if progress is not None:
                 job.progress = progress
@@ -60,8 +91,18 @@ class UploadService:
             if status in [UploadStatus.COMPLETED, UploadStatus.FAILED]:
                 job.completed_at = datetime.now()
 
+        self.jobs.update(receipt_id, apply)
+
+    async def process_uploads(self, receipt_ids: Iterable[str]):
+        """Process several upload jobs concurrently (see process_upload)"""
+        await asyncio.gather(*(self.process_upload(receipt_id) for receipt_id in receipt_ids))
+
     async def process_upload(self, receipt_id: str):
-        """Process upload asynchronously"""
+        """Process upload asynchronously, at most upload_concurrency jobs at a time"""
+        async with _job_slots:
+            await self._process_upload(receipt_id)
+
+    async def _process_upload(self, receipt_id: str):
         try:
             job = self.jobs.get(receipt_id)
             if not job:
@@ -86,12 +127,18 @@ class UploadService:
             # Check if multiple files
             try:
                 # Run blocking Gemini calls in thread pool to avoid blocking event loop
-                loop = asyncio.get_event_loop()
+                loop = asyncio.get_running_loop()
 
-                if hasattr(job, 'all_file_paths') and len(job.all_file_paths) > 1:
+                content_hash = await loop.run_in_executor(_extraction_executor, hash_files, job.all_file_paths)
+                cached = extraction_cache.get(content_hash, custom_categories)
+
+                if cached:
+                    print(f"⚡ Using cached extraction for {receipt_id}")
+                    receipt, extraction_log = cached
+                elif hasattr(job, 'all_file_paths') and len(job.all_file_paths) > 1:
                     print(f"📄 Processing {len(job.all_file_paths)} files")
                     receipt, extraction_log = await loop.run_in_executor(
-                        None,
+                        _extraction_executor,
                         lambda: self.gemini_service.extract_receipt_data_multiple(
                             job.all_file_paths,
                             custom_categories=custom_categories
@@ -99,12 +146,15 @@ class UploadService:
                     )
                 else:
                     receipt, extraction_log = await loop.run_in_executor(
-                        None,
+                        _extraction_executor,
                         lambda: self.gemini_service.extract_receipt_data(
                             job.file_path,
                             custom_categories=custom_categories
                         )
                     )
+
+                if receipt and not cached:
+                    extraction_cache.set(content_hash, custom_categories, receipt, extraction_log)
             except Exception as gemini_error:
                 print(f"❌ Gemini extraction error: {gemini_error}")
                 import traceback
@@ -115,22 +165,7 @@ class UploadService:
                 )
                 return
 
-            if not receipt:
-                error_msg = extraction_log.get("error", "Failed to extract receipt data")
-                print(f"❌ Extraction failed for {receipt_id}: {error_msg}")
-                self.update_job_status(
-                    receipt_id, UploadStatus.FAILED, progress=100, error=error_msg
-                )
-                return
-
-            # Update job with receipt data
-            self.update_job_status(receipt_id, UploadStatus.PROCESSING, progress=90)
-            job.receipt_data = receipt.dict()
-            job.extraction_log = extraction_log
-
-            # Mark as completed
-            self.update_job_status(receipt_id, UploadStatus.COMPLETED, progress=100)
-            print(f"✅ Job {receipt_id} completed successfully")
+            self._finish_job(receipt_id, receipt, extraction_log)
 
         except Exception as e:
             print(f"❌ Error processing job {receipt_id}: {str(e)}")
@@ -138,10 +173,148 @@ class UploadService:
                 receipt_id, UploadStatus.FAILED, progress=100, error=str(e)
             )
 
+    def _finish_job(self, receipt_id: str, receipt: Optional[Receipt], extraction_log: Dict[str, Any]):
+        """Attach an extraction result to its job and mark it completed (or failed)"""
+        if not receipt:
+            error_msg = extraction_log.get("error", "Failed to extract receipt data")
+            print(f"❌ Extraction failed for {receipt_id}: {error_msg}")
+            self.update_job_status(
+                receipt_id, UploadStatus.FAILED, progress=100, error=error_msg
+            )
+            return
+
+        # Update job with receipt data (serialized once, outside the store's transaction)
+        receipt_data = receipt.model_dump(mode="json")
+
+        def attach_result(job: UploadJob):
+            job.progress = 90
+            job.receipt_data = receipt_data
+            job.extraction_log = extraction_log
+            job.updated_at = datetime.now()
+
+        self.jobs.update(receipt_id, attach_result)
+
+        # Mark as completed
+        self.update_job_status(receipt_id, UploadStatus.COMPLETED, progress=100)
+        print(f"✅ Job {receipt_id} completed successfully")
+
+    async def enqueue_batch(self, receipt_ids: Iterable[str], urgent: bool = False) -> Optional[str]:
+        """
+        Extract several pending jobs through the Gemini Batch API
+
+        Batch requests cost half as much and don't count against the
+        generate_content rate limits, but may take minutes (up to a day) to
+        finish, so this is meant for backfills and bulk imports. Jobs whose
+        content was extracted before complete straight from the cache.
+
+        Args:
+            receipt_ids: IDs of jobs created with create_job
+            urgent: Process the jobs right away through the regular path instead
+
+        Returns:
+            Name of the submitted batch job, or None if nothing was submitted
+        """
+        if urgent:
+            await self.process_uploads(receipt_ids)
+            return None
+
+        loop = asyncio.get_running_loop()
+        pending = []
+        requests = []
+        for receipt_id in receipt_ids:
+            job = self.jobs.get(receipt_id)
+            if not job:
+                print(f"❌ Job {receipt_id} not found")
+                continue
+
+            self.update_job_status(receipt_id, UploadStatus.PROCESSING, progress=10)
+            try:
+                content_hash = await loop.run_in_executor(_extraction_executor, hash_files, job.all_file_paths)
+                cached = extraction_cache.get(content_hash, job.custom_categories)
+                if cached:
+                    print(f"⚡ Using cached extraction for {receipt_id}")
+                    self._finish_job(receipt_id, *cached)
+                    continue
+
+                request = await loop.run_in_executor(
+                    _extraction_executor,
+                    self.gemini_service.build_batch_request,
+                    job.all_file_paths,
+                    job.custom_categories,
+                )
+            except Exception as e:
+                print(f"❌ Error preparing job {receipt_id} for batch: {e}")
+                self.update_job_status(receipt_id, UploadStatus.FAILED, progress=100, error=str(e))
+                continue
+
+            pending.append((receipt_id, content_hash, job.custom_categories))
+            requests.append(request)
+
+        if not requests:
+            return None
+
+        try:
+            batch = await loop.run_in_executor(
+                _extraction_executor,
+                self.gemini_service.create_batch,
+                requests,
+                f"receipts-{datetime.now():%Y%m%d-%H%M%S}",
+            )
+        except Exception as e:
+            print(f"❌ Failed to submit Gemini batch: {e}")
+            for receipt_id, _, _ in pending:
+                self.update_job_status(receipt_id, UploadStatus.FAILED, progress=100, error=str(e))
+            return None
+
+        print(f"📦 Submitted Gemini batch {batch.name} with {len(requests)} receipt(s)")
+
+        def attach_batch(job: UploadJob):
+            job.progress = 30
+            job.batch_name = batch.name
+            job.updated_at = datetime.now()
+
+        for receipt_id, _, _ in pending:
+            self.jobs.update(receipt_id, attach_batch)
+
+        task = asyncio.create_task(self._poll_batch(batch.name, pending))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+        return batch.name
+
+    async def _poll_batch(self, batch_name: str, pending: List[tuple]):
+        """Wait for a batch job to finish, then complete its upload jobs"""
+        try:
+            while True:
+                await asyncio.sleep(BATCH_POLL_INTERVAL)
+                batch = await asyncio.to_thread(self.gemini_service.get_batch, batch_name)
+                if batch.state and batch.state.name in BATCH_DONE_STATES:
+                    break
+
+            responses = batch.dest.inlined_responses if batch.dest else None
+            if not responses:
+                error_msg = f"Gemini batch ended in state {batch.state.name}"
+                print(f"❌ {error_msg} ({batch_name})")
+                for receipt_id, _, _ in pending:
+                    self.update_job_status(receipt_id, UploadStatus.FAILED, progress=100, error=error_msg)
+                return
+
+            print(f"✅ Gemini batch {batch_name} finished ({batch.state.name})")
+            # Inlined responses come back in request order
+            for (receipt_id, content_hash, custom_categories), response in zip(pending, responses):
+                receipt, extraction_log = self.gemini_service.parse_batch_response(response)
+                if receipt:
+                    extraction_cache.set(content_hash, custom_categories, receipt, extraction_log)
+                self._finish_job(receipt_id, receipt, extraction_log)
+
+        except Exception as e:
+            print(f"❌ Error polling Gemini batch {batch_name}: {e}")
+            for receipt_id, _, _ in pending:
+                self.update_job_status(receipt_id, UploadStatus.FAILED, progress=100, error=str(e))
+
     def delete_job(self, receipt_id: str):
         """Delete a job and clean up files"""
-        if receipt_id in self.jobs:
-            job = self.jobs[receipt_id]
+        job = self.jobs.get(receipt_id)
+        if job:
             # Optionally delete the file
             try:
                 if os.path.exists(job.file_path):
@@ -149,7 +322,7 @@ class UploadService:
             except Exception as e:
                 print(f"⚠️ Failed to delete file {job.file_path}: {e}")
 
-            # Remove from jobs dict
+            # Remove from the job store
             del self.jobs[receipt_id]
 
 
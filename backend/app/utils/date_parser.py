@@ -2,8 +2,48 @@
 Date parsing utilities for natural language input
 """
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
 import re
 
+WEEKDAYS = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+
+_WEEKDAY_NAMES = '|'.join(WEEKDAYS)
+# "last monday", "this friday", "on sunday", ... in a single pass over the text
+_WEEKDAY_RE = re.compile(rf'\b(last|this|on)\s+({_WEEKDAY_NAMES})\b')
+_DAYS_AGO_RE = re.compile(r'(\d+)\s*days?\s*ago')
+
+# Currency-marked amounts, tried in order
+_AMOUNT_RES = [
+    re.compile(r'\$\s*(\d+(?:\.\d{2})?)', re.IGNORECASE),  # $45 or $45.50
+    re.compile(r'(\d+(?:\.\d{2})?)\s*(?:dollars|usd|eur|€)', re.IGNORECASE),  # 45 dollars
+    re.compile(r'€\s*(\d+(?:\.\d{2})?)', re.IGNORECASE),  # €45
+    re.compile(r'(\d+(?:\.\d{2})?)\s*\$', re.IGNORECASE),  # 45$
+]
+_DECIMAL_AMOUNT_RE = re.compile(r'\b(\d+\.\d{2})\b')
+_ROUND_AMOUNT_RE = re.compile(r'\b(\d+)\b')
+_DIGIT_RE = re.compile(r'\d')
+
+
+@lru_cache(maxsize=4096)
+def parse_sheet_date(date_str: str) -> Optional[datetime]:
+    """Parse a DD-MM-YYYY (or YYYY-MM-DD) sheet date string, None if unparseable
+
+    Receipts share dates heavily (one row per line item), so repeat strings are
+    served from the cache. Misses are split by hand, which is several times
+    faster than strptime's format interpretation.
+    """
+    try:
+        first, month, last = date_str.split("-")
+        if len(first) == 4:
+            return datetime(int(first), int(month), int(last))
+        return datetime(int(last), int(month), int(first))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
 
 def parse_relative_date(text: str) -> str:
     """
@@ -20,8 +60,13 @@ def parse_relative_date(text: str) -> str:
         "yesterday" → "04-10-2025"
         "last Monday" → specific date
     """
-    text_lower = text.lower()
-    today = datetime.now()
+    return _parse_relative_date_cached(text.lower(), datetime.now().toordinal())
+
+
+@lru_cache(maxsize=512)
+def _parse_relative_date_cached(text_lower: str, today_ordinal: int) -> str:
+    """parse_relative_date for a lowercased text on a given day (the key rolls over at midnight)"""
+    today = datetime.fromordinal(today_ordinal)
 
     # Today
     if 'today' in text_lower or 'this morning' in text_lower or 'this afternoon' in text_lower or 'this evening' in text_lower or 'tonight' in text_lower:
@@ -37,32 +82,34 @@ def parse_relative_date(text: str) -> str:
         date = today - timedelta(days=2)
         return date.strftime('%d-%m-%Y')
 
+    # "last [weekday]" wins over "this/on [weekday]" wherever it appears
+    weekday_matches = _WEEKDAY_RE.findall(text_lower)
+    qualifier, day_name = next(
+        (match for match in weekday_matches if match[0] == 'last'),
+        weekday_matches[0] if weekday_matches else (None, None),
+    )
+
     # Last [weekday]
-    weekdays = {
-        'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-        'friday': 4, 'saturday': 5, 'sunday': 6
-    }
-
-    for day_name, day_num in weekdays.items():
-        if f'last {day_name}' in text_lower:
-            days_ago = (today.weekday() - day_num) % 7
-            if days_ago == 0:
-                days_ago = 7  # If today is that day, go back a week
-            date = today - timedelta(days=days_ago)
-            return date.strftime('%d-%m-%Y')
+    if qualifier == 'last':
+        day_num = WEEKDAYS[day_name]
+        days_ago = (today.weekday() - day_num) % 7
+        if days_ago == 0:
+            days_ago = 7  # If today is that day, go back a week
+        date = today - timedelta(days=days_ago)
+        return date.strftime('%d-%m-%Y')
 
     # This [weekday] (current week)
-    for day_name, day_num in weekdays.items():
-        if f'this {day_name}' in text_lower or f'on {day_name}' in text_lower:
-            days_diff = day_num - today.weekday()
-            if days_diff > 0:
-                # Future day this week - assume they mean last week
-                days_diff -= 7
-            date = today + timedelta(days=days_diff)
-            return date.strftime('%d-%m-%Y')
+    if qualifier:
+        day_num = WEEKDAYS[day_name]
+        days_diff = day_num - today.weekday()
+        if days_diff > 0:
+            # Future day this week - assume they mean last week
+            days_diff -= 7
+        date = today + timedelta(days=days_diff)
+        return date.strftime('%d-%m-%Y')
 
     # N days ago
-    days_ago_match = re.search(r'(\d+)\s*days?\s*ago', text_lower)
+    days_ago_match = _DAYS_AGO_RE.search(text_lower)
     if days_ago_match:
         days = int(days_ago_match.group(1))
         date = today - timedelta(days=days)
@@ -91,26 +138,23 @@ def extract_amount(text: str) -> float:
     Returns:
         Extracted amount as float
     """
+    # Every amount pattern needs a digit; text without one can skip all six searches
+    if not _DIGIT_RE.search(text):
+        return 0.0
+
     # Try to find currency symbols with numbers
-    patterns = [
-        r'\$\s*(\d+(?:\.\d{2})?)',  # $45 or $45.50
-        r'(\d+(?:\.\d{2})?)\s*(?:dollars|usd|eur|€)',  # 45 dollars
-        r'€\s*(\d+(?:\.\d{2})?)',  # €45
-        r'(\d+(?:\.\d{2})?)\s*\$',  # 45$
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _AMOUNT_RES:
+        match = pattern.search(text)
         if match:
             return float(match.group(1))
 
     # Try to find any number that looks like money (with 2 decimal places or round number)
-    match = re.search(r'\b(\d+\.\d{2})\b', text)
+    match = _DECIMAL_AMOUNT_RE.search(text)
     if match:
         return float(match.group(1))
 
     # Try round numbers
-    match = re.search(r'\b(\d+)\b', text)
+    match = _ROUND_AMOUNT_RE.search(text)
     if match:
         return float(match.group(1))
 
@@ -0,0 +1,77 @@
+"""
+HTTP conditional request helpers (ETag / If-None-Match)
+"""
+import os
+import time
+from typing import Optional
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+# Uploaded receipt files never change once written, so browsers may reuse them for a day
+FILE_CACHE_CONTROL = "private, max-age=86400"
+
+
+def build_etag(revision: int, max_age: int = 30) -> str:
+    """
+    Build a weak ETag from a data revision
+
+    Edits made directly in Google Sheets don't bump the revision, so a coarse
+    time bucket is mixed in to bound how long a stale ETag can keep matching.
+
+    Args:
+        revision: Current data revision
+        max_age: Seconds after which the ETag changes even without writes
+
+    Returns:
+        Weak ETag string
+    """
+    bucket = int(time.time() // max_age)
+    return f'W/"{revision}-{bucket}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match covers the given ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Attach the ETag to the response and check the request's If-None-Match
+
+    Returns:
+        A 304 response if the client's copy is current, None otherwise
+    """
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return None
+
+
+def cached_file_response(request: Request, file_path: str, media_type: str) -> Response:
+    """
+    Serve a file with Cache-Control/ETag headers, or 304 if the client has it
+
+    The stat result is handed to FileResponse so the file isn't stat'ed twice;
+    Starlette streams the body with sendfile when the server supports it.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        file_path: Path of the file to serve
+        media_type: Content-Type of the file
+
+    Returns:
+        FileResponse, or an empty 304 response
+    """
+    stat_result = os.stat(file_path)
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    headers = {"Cache-Control": FILE_CACHE_CONTROL, "ETag": etag}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(file_path, media_type=media_type, headers=headers, stat_result=stat_result)
@@ -0,0 +1,54 @@
+"""
+Pure helpers for locating uploaded receipt files
+
+Kept free of FastAPI/request state and fully annotated so the module can be
+compiled ahead of time with mypyc (`mypyc app/utils/receipt_files.py`) when
+image-serving throughput matters; the plain Python module is used otherwise.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+# File extension -> media type (anything else is served as JPEG)
+MEDIA_TYPES: Dict[str, str] = {
+    ".pdf": "application/pdf",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+}
+
+
+def get_media_type(file_path: str) -> str:
+    """Determine media type based on file extension"""
+    return MEDIA_TYPES.get(os.path.splitext(file_path)[1].lower(), "image/jpeg")
+
+
+def parse_upload_name(filename: str) -> Tuple[str, Optional[int]]:
+    """
+    Split an upload filename into (receipt_id, index)
+
+    Single uploads are stored as `{receipt_id}.{ext}` (index None) and
+    multi-file uploads as `{receipt_id}_{index}.{ext}`.
+    """
+    stem = os.path.splitext(filename)[0]
+    receipt_id, sep, idx = stem.rpartition("_")
+    if sep and idx.isdigit():
+        return receipt_id, int(idx)
+    return stem, None
+
+
+def build_receipt_file_index(upload_dir: str) -> Dict[str, List[str]]:
+    """
+    Index uploaded files by receipt ID
+
+    Returns:
+        Mapping of receipt ID to its file paths, multi-file uploads ordered by index
+    """
+    indexed: Dict[str, List[Tuple[int, str]]] = {}
+    for entry in os.scandir(upload_dir):
+        if not entry.is_file():
+            continue
+        receipt_id, idx = parse_upload_name(entry.name)
+        indexed.setdefault(receipt_id, []).append((-1 if idx is None else idx, entry.path))
+    return {receipt_id: [path for _, path in sorted(paths)] for receipt_id, paths in indexed.items()}
@@ -0,0 +1,123 @@
+"""
+Small in-process TTL cache for expensive Google Sheets reads and pending data
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe cache where every entry expires after `ttl` seconds
+
+    If `maxsize` is set, the least recently used entry is evicted once the
+    cache is full. Supports the common dict operations (`in`, `[]`, `del`,
+    `len`, `items()`) so it can stand in for a plain dict.
+
+    If `on_evict` is set, it is called with (key, value) for every entry the
+    cache drops on its own (expired or evicted), outside the lock. Explicit
+    `pop`, `del` and `clear` don't call it.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        maxsize: Optional[int] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._evicted: List[Tuple[Hashable, Any]] = []
+        self._lock = threading.Lock()
+
+    def _drop(self, key: Hashable) -> None:
+        """Remove an expired or evicted entry, queueing it for on_evict (lock must be held)"""
+        _, value = self._data.pop(key)
+        if self.on_evict is not None:
+            self._evicted.append((key, value))
+
+    def _notify_evicted(self) -> None:
+        """Hand entries dropped since the last call to on_evict"""
+        if self.on_evict is None:
+            return
+        with self._lock:
+            evicted, self._evicted = self._evicted, []
+        for key, value in evicted:
+            self.on_evict(key, value)
+
+    def _get_entry(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """Return a live entry and mark it recently used (lock must be held)"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value for key, or default if missing/expired"""
+        with self._lock:
+            entry = self._get_entry(key)
+        self._notify_evicted()
+        return default if entry is None else entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key for ttl seconds (defaults to the cache TTL)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._drop(next(iter(self._data)))
+        self._notify_evicted()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value (expired or not)"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else default
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of live (key, value) pairs, least recently used first (expired ones are dropped)"""
+        now = time.monotonic()
+        with self._lock:
+            for key in [key for key, (expires_at, _) in self._data.items() if expires_at < now]:
+                self._drop(key)
+            items = [(key, value) for key, (_, value) in self._data.items()]
+        self._notify_evicted()
+        return items
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._get_entry(key)
+        self._notify_evicted()
+        return entry is not None
+
+    def __getitem__(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._get_entry(key)
+        self._notify_evicted()
+        if entry is None:
+            raise KeyError(key)
+        return entry[1]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        with self._lock:
+            del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self.items())
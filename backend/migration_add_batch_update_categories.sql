@@ -0,0 +1,16 @@
+-- Migration: Add batch_update_categories function
+-- Lets the API apply multiple category edits with a single RPC call
+
+-- Function to apply several partial category edits in one round trip
+CREATE OR REPLACE FUNCTION public.batch_update_categories(p_user_id UUID, p_updates JSONB)
+RETURNS SETOF custom_categories AS $$
+    UPDATE custom_categories c
+    SET name = COALESCE(u.name, c.name),
+        icon = COALESCE(u.icon, c.icon),
+        color = COALESCE(u.color, c.color),
+        is_active = COALESCE(u.is_active, c.is_active)
+    FROM jsonb_to_recordset(p_updates)
+        AS u(id UUID, name VARCHAR(100), icon VARCHAR(10), color VARCHAR(7), is_active BOOLEAN)
+    WHERE c.id = u.id AND c.user_id = p_user_id
+    RETURNING c.*;
+$$ LANGUAGE sql;
@@ -0,0 +1,10 @@
+-- Migration: Add set_active_spreadsheet function
+-- Lets the API switch a user's active spreadsheet atomically with a single RPC call
+
+-- Function to make one spreadsheet active (and every other one inactive) in one statement
+CREATE OR REPLACE FUNCTION public.set_active_spreadsheet(p_user_id UUID, p_sheet_id UUID)
+RETURNS void AS $$
+    UPDATE user_spreadsheets
+    SET is_active = (id = p_sheet_id)
+    WHERE user_id = p_user_id;
+$$ LANGUAGE sql;
@@ -0,0 +1,11 @@
+-- Migration: Add toggle_category function
+-- Lets the API toggle a category's is_active flag with a single RPC call
+
+-- Function to flip a category's active flag in one round trip
+CREATE OR REPLACE FUNCTION public.toggle_category(p_category_id UUID, p_user_id UUID)
+RETURNS SETOF custom_categories AS $$
+    UPDATE custom_categories
+    SET is_active = NOT is_active
+    WHERE id = p_category_id AND user_id = p_user_id
+    RETURNING *;
+$$ LANGUAGE sql;
@@ -200,6 +200,37 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
+-- Function to flip a category's active flag in one round trip
+CREATE OR REPLACE FUNCTION public.toggle_category(p_category_id UUID, p_user_id UUID)
+RETURNS SETOF custom_categories AS $$
+    UPDATE custom_categories
+    SET is_active = NOT is_active
+    WHERE id = p_category_id AND user_id = p_user_id
+    RETURNING *;
+$$ LANGUAGE sql;
+
+-- Function to make one spreadsheet active (and every other one inactive) in one statement
+CREATE OR REPLACE FUNCTION public.set_active_spreadsheet(p_user_id UUID, p_sheet_id UUID)
+RETURNS void AS $$
+    UPDATE user_spreadsheets
+    SET is_active = (id = p_sheet_id)
+    WHERE user_id = p_user_id;
+$$ LANGUAGE sql;
+
+-- Function to apply several partial category edits in one round trip
+CREATE OR REPLACE FUNCTION public.batch_update_categories(p_user_id UUID, p_updates JSONB)
+RETURNS SETOF custom_categories AS $$
+    UPDATE custom_categories c
+    SET name = COALESCE(u.name, c.name),
+        icon = COALESCE(u.icon, c.icon),
+        color = COALESCE(u.color, c.color),
+        is_active = COALESCE(u.is_active, c.is_active)
+    FROM jsonb_to_recordset(p_updates)
+        AS u(id UUID, name VARCHAR(100), icon VARCHAR(10), color VARCHAR(7), is_active BOOLEAN)
+    WHERE c.id = u.id AND c.user_id = p_user_id
+    RETURNING c.*;
+$$ LANGUAGE sql;
+
 -- Function to handle new user creation
 CREATE OR REPLACE FUNCTION public.handle_new_user()
 RETURNS TRIGGER AS $$
@@ -22,6 +22,15 @@ interface SheetData {
   row_count: number;
 }
 
+// API returns plain row arrays; the sheet row number of rows[i] is start_row + i
+interface SheetDataResponse {
+  sheet_name: string;
+  headers: string[];
+  rows: string[][];
+  start_row: number;
+  row_count: number;
+}
+
 export default function DataPage() {
   const [sheets, setSheets] = useState<Sheet[]>([]);
   const [activeSheet, setActiveSheet] = useState<string>('');
@@ -62,8 +71,11 @@ export default function DataPage() {
   const loadSheetData = async (sheetName: string) => {
     try {
       setLoadingData(true);
-      const data = await sheetsApi.getSheetData(sheetName);
-      setSheetData(data);
+      const data: SheetDataResponse = await sheetsApi.getSheetData(sheetName);
+      setSheetData({
+        ...data,
+        rows: data.rows.map((values, idx) => ({ row_number: data.start_row + idx, values })),
+      });
     } catch (error) {
       console.error(`Failed to load sheet ${sheetName}:`, error);
       toast.error(`Failed to load sheet data`);
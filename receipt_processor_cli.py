@@ -8,14 +8,17 @@ import os
 import sys
 import json
 import argparse
+import asyncio
+import io
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 from google import genai
 from pydantic import BaseModel, Field
 from typing import List
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import mimetypes
+from PIL import Image, UnidentifiedImageError
 
 # Load environment variables
 load_dotenv()
@@ -25,8 +28,18 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_SHEETS_CREDENTIALS_PATH = os.getenv("GOOGLE_SHEETS_CREDENTIALS_PATH", "cred/gen-lang-client-0229471649-dff2869d47fc.json")
 GOOGLE_SHEET_NAME = os.getenv("GOOGLE_SHEET_NAME", "Receipts")
 
-# Initialize Gemini client
-gemini_client = genai.Client(api_key=GOOGLE_API_KEY)
+# Longest edge sent to Gemini; OCR quality doesn't improve past this, upload time does
+MAX_UPLOAD_EDGE = 1536
+UPLOAD_JPEG_QUALITY = 85
+
+# Receipts extracted at once when several images are given
+MAX_CONCURRENT_EXTRACTIONS = 5
+RECEIPT_HEADERS = ["Date", "Merchant", "Address", "Item", "Category", "Qty", "Unit Price", "Total Price", "Tax", "Grand Total", "Payment"]
+
+# (sheet name, tab) of worksheets created by this process that still need their header row
+_pending_headers = set()
+
+# Gemini model (the client itself is created lazily by _client)
 model_id = "gemini-2.0-flash"
 
 # Pydantic Models
@@ -52,110 +65,181 @@ class Receipt(BaseModel):
     line_items: List[LineItem]
     total_amounts: TotalAmounts
 
+@lru_cache(maxsize=1)
+def _client() -> genai.Client:
+    """Gemini client shared by every extraction in this process (one connection pool)"""
+    return genai.Client(api_key=GOOGLE_API_KEY)
+
+@lru_cache(maxsize=1)
 def authenticate_sheets():
-    """Authenticate with Google Sheets"""
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds = ServiceAccountCredentials.from_json_keyfile_name(GOOGLE_SHEETS_CREDENTIALS_PATH, scope)
-    return gspread.authorize(creds)
+    """Authenticate with Google Sheets (once per process; google-auth refreshes the token as needed)"""
+    return gspread.service_account(filename=GOOGLE_SHEETS_CREDENTIALS_PATH)
+
+@lru_cache(maxsize=None)
+def _get_spreadsheet(sheet_name: str) -> gspread.Spreadsheet:
+    """Open a spreadsheet by name (once per process)"""
+    return authenticate_sheets().open(sheet_name)
+
+@lru_cache(maxsize=None)
+def _get_worksheet(sheet_name: str, tab: str) -> gspread.Worksheet:
+    """Get or create a worksheet (once per process); new ones get headers with their first append"""
+    spreadsheet = _get_spreadsheet(sheet_name)
+    try:
+        return spreadsheet.worksheet(tab)
+    except gspread.exceptions.WorksheetNotFound:
+        _pending_headers.add((sheet_name, tab))
+        return spreadsheet.add_worksheet(title=tab, rows="100", cols="20")
+
+@lru_cache(maxsize=32)
+def _mime_for_ext(ext: str) -> Optional[str]:
+    """Mime type for a lowercase file extension (receipts use a handful, so each is looked up once)"""
+    return mimetypes.guess_type("receipt" + ext)[0]
+
+def prepare_upload(image_path: str, mimetype: str):
+    """
+    Downscale a large receipt photo to a JPEG in memory before uploading it
+
+    Returns:
+        Tuple of (path or file-like object to upload, its mime type). PDFs,
+        images already within MAX_UPLOAD_EDGE and formats Pillow can't decode
+        (e.g. HEIC) are uploaded as they are.
+    """
+    if not mimetype.startswith("image/"):
+        return image_path, mimetype
+
+    try:
+        with Image.open(image_path) as img:
+            if max(img.size) <= MAX_UPLOAD_EDGE:
+                return image_path, mimetype
+
+            img.thumbnail((MAX_UPLOAD_EDGE, MAX_UPLOAD_EDGE), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            img.convert("RGB").save(buffer, format="JPEG", quality=UPLOAD_JPEG_QUALITY)
+    except (UnidentifiedImageError, OSError):
+        return image_path, mimetype
+
+    buffer.seek(0)
+    return buffer, "image/jpeg"
 
 def extract_receipt_data(image_path: str) -> Optional[Receipt]:
     """Extract receipt data from image using Gemini"""
     try:
-        # Check file exists
-        if not os.path.exists(image_path):
-            print(f"❌ Error: File not found: {image_path}")
-            return None
-
         # Get mime type
-        mimetype, _ = mimetypes.guess_type(image_path)
+        mimetype = _mime_for_ext(os.path.splitext(image_path)[1].lower())
         if not mimetype:
             print("❌ Error: Could not determine file type")
             return None
 
-        # Upload file to Gemini
-        file_obj = gemini_client.files.upload(file=image_path, config={"mime_type": mimetype})
+        # Upload file to Gemini (large photos are downscaled first)
+        upload, mimetype = prepare_upload(image_path, mimetype)
+        file_obj = _client().files.upload(file=upload, config={"mime_type": mimetype})
 
         # Extract data
-        response = gemini_client.models.generate_content(
+        response = _client().models.generate_content(
             model=model_id,
             contents=["Extract structured receipt data from this image. Return purchase date in DD-MM-YYYY format.", file_obj],
             config={"response_mime_type": "application/json", "response_schema": Receipt}
         )
 
-        if response.parsed:
-            return Receipt.model_validate(response.parsed)
+        # With a pydantic response_schema the SDK already parsed and validated a Receipt
+        if isinstance(response.parsed, Receipt):
+            return response.parsed
         else:
             print("❌ Error: No data extracted from receipt")
             return None
 
+    except FileNotFoundError:
+        # Raised by the first open (Pillow or the upload), so no separate exists() check
+        print(f"❌ Error: File not found: {image_path}")
+        return None
     except Exception as e:
         print(f"❌ Error extracting receipt data: {e}")
         return None
 
-def display_receipt_data(receipt: Receipt):
-    """Display extracted receipt data to user"""
-    print("\n" + "="*50)
-    print("📋 EXTRACTED RECEIPT DATA")
-    print("="*50)
+async def extract_receipt_data_async(image_path: str, sem: asyncio.Semaphore) -> Optional[Receipt]:
+    """Run extract_receipt_data in a worker thread, at most sem's limit at a time"""
+    async with sem:
+        return await asyncio.to_thread(extract_receipt_data, image_path)
 
-    print(f"🏪 Merchant: {receipt.merchant_details.name}")
-    print(f"📍 Address: {receipt.merchant_details.address}")
-    print(f"📅 Date: {receipt.purchase_date}")
-    print(f"💳 Payment: {receipt.total_amounts.payment_method}")
+async def extract_all(image_paths: List[str]) -> List[Optional[Receipt]]:
+    """Extract several receipts concurrently (upload and generation are network-bound)"""
+    sem = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
+    return await asyncio.gather(*(extract_receipt_data_async(path, sem) for path in image_paths))
 
-    print(f"\n🛒 Line Items ({len(receipt.line_items)}):")
-    print("-" * 50)
+def display_receipt_data(receipt: Receipt):
+    """Display extracted receipt data to user (written to stdout in one go)"""
+    lines = [
+        "\n" + "="*50,
+        "📋 EXTRACTED RECEIPT DATA",
+        "="*50,
+        f"🏪 Merchant: {receipt.merchant_details.name}",
+        f"📍 Address: {receipt.merchant_details.address}",
+        f"📅 Date: {receipt.purchase_date}",
+        f"💳 Payment: {receipt.total_amounts.payment_method}",
+        f"\n🛒 Line Items ({len(receipt.line_items)}):",
+        "-" * 50,
+    ]
 
     for i, item in enumerate(receipt.line_items, 1):
-        print(f"{i}. {item.item_name}")
-        print(f"   Category: {item.category}")
-        print(f"   Quantity: {item.quantity} × ${item.unit_price:.2f} = ${item.price:.2f}")
-        print()
+        lines.append(
+            f"{i}. {item.item_name}\n"
+            f"   Category: {item.category}\n"
+            f"   Quantity: {item.quantity} × ${item.unit_price:.2f} = ${item.price:.2f}\n"
+        )
 
     total = receipt.total_amounts.total
     tax = receipt.total_amounts.tax
-    print(f"💰 Total: ${total:.2f}")
+    lines.append(f"💰 Total: ${total:.2f}")
     if tax:
-        print(f"💰 Tax: ${tax:.2f}")
+        lines.append(f"💰 Tax: ${tax:.2f}")
 
-    print("="*50)
+    lines.append("="*50 + "\n")
+    sys.stdout.write("\n".join(lines))
 
 def save_to_sheets(receipt: Receipt, sheet_name: str = GOOGLE_SHEET_NAME):
     """Save receipt data to Google Sheets"""
+    return save_receipts_to_sheets([receipt], sheet_name)
+
+def save_receipts_to_sheets(receipts: List[Receipt], sheet_name: str = GOOGLE_SHEET_NAME):
+    """Save several receipts to Google Sheets with a single append"""
     try:
-        # Authenticate
-        sheets_client = authenticate_sheets()
-        spreadsheet = sheets_client.open(sheet_name)
-
-        # Get or create worksheet
-        try:
-            worksheet = spreadsheet.worksheet("Receipts")
-        except gspread.exceptions.WorksheetNotFound:
-            worksheet = spreadsheet.add_worksheet(title="Receipts", rows="100", cols="20")
-            # Add headers
-            headers = ["Date", "Merchant", "Address", "Item", "Category", "Qty", "Unit Price", "Total Price", "Tax", "Grand Total", "Payment"]
-            worksheet.append_row(headers)
-
-        # Prepare data rows
+        # Client, spreadsheet and worksheet are looked up once per process
+        worksheet = _get_worksheet(sheet_name, "Receipts")
+
+        # Prepare data rows; the receipt-level columns are the same on every row
         rows = []
-        for item in receipt.line_items:
-            row = [
-                receipt.purchase_date,
-                receipt.merchant_details.name,
-                receipt.merchant_details.address,
-                item.item_name,
-                item.category,
-                item.quantity,
-                item.unit_price,
-                item.price,
-                receipt.total_amounts.tax if receipt.total_amounts.tax else '',
-                receipt.total_amounts.total,
-                receipt.total_amounts.payment_method
-            ]
-            rows.append(row)
-
-        # Append to sheet
-        worksheet.append_rows(rows)
+        for receipt in receipts:
+            merchant = receipt.merchant_details
+            totals = receipt.total_amounts
+            purchase_date = receipt.purchase_date
+            tax = totals.tax if totals.tax else ''
+            rows.extend(
+                [
+                    purchase_date,
+                    merchant.name,
+                    merchant.address,
+                    item.item_name,
+                    item.category,
+                    item.quantity,
+                    item.unit_price,
+                    item.price,
+                    tax,
+                    totals.total,
+                    totals.payment_method
+                ]
+                for item in receipt.line_items
+            )
+
+        # Append to sheet, with the header row in the same call for a new worksheet
+        needs_headers = (sheet_name, "Receipts") in _pending_headers
+        # RAW keeps values exactly as extracted (no date/formula parsing on the Sheets side)
+        worksheet.append_rows(
+            [RECEIPT_HEADERS] + rows if needs_headers else rows,
+            value_input_option="RAW",
+            insert_data_option="INSERT_ROWS",
+            table_range="A1",
+        )
+        _pending_headers.discard((sheet_name, "Receipts"))
         print(f"✅ Successfully saved {len(rows)} line items to Google Sheets")
 
     except Exception as e:
@@ -165,8 +249,8 @@ def save_to_sheets(receipt: Receipt, sheet_name: str = GOOGLE_SHEET_NAME):
     return True
 
 def main():
-    parser = argparse.ArgumentParser(description="Process receipt image and save to Google Sheets")
-    parser.add_argument("image_path", help="Path to receipt image file")
+    parser = argparse.ArgumentParser(description="Process receipt images and save them to Google Sheets")
+    parser.add_argument("image_paths", nargs="+", metavar="image_path", help="Path(s) to receipt image files")
     parser.add_argument("--sheet", default=GOOGLE_SHEET_NAME, help="Google Sheet name")
     parser.add_argument("--auto-confirm", action="store_true", help="Skip confirmation and save automatically")
 
@@ -182,28 +266,46 @@ def main():
         print(f"❌ Error: Google Sheets credentials file not found: {GOOGLE_SHEETS_CREDENTIALS_PATH}")
         sys.exit(1)
 
-    print(f"🔍 Processing receipt: {args.image_path}")
+    for image_path in args.image_paths:
+        print(f"🔍 Processing receipt: {image_path}")
 
-    # Extract receipt data
-    receipt = extract_receipt_data(args.image_path)
-    if not receipt:
+    # Extract receipt data (concurrently when several images are given)
+    extracted = asyncio.run(extract_all(args.image_paths))
+    if not any(extracted):
         sys.exit(1)
 
-    # Display extracted data
-    display_receipt_data(receipt)
-
-    # Get user confirmation
-    if not args.auto_confirm:
-        confirm = input("\n✅ Save this data to Google Sheets? (y/N): ").lower().strip()
-        if confirm not in ['y', 'yes']:
-            print("❌ Operation cancelled")
-            sys.exit(0)
-
-    # Save to Google Sheets
-    if save_to_sheets(receipt, args.sheet):
+    to_save = []
+    for image_path, receipt in zip(args.image_paths, extracted):
+        if not receipt:
+            print(f"⚠️ Skipping {image_path}: no data extracted")
+            continue
+
+        # Display extracted data
+        if len(args.image_paths) > 1:
+            print(f"\n📄 {image_path}")
+        display_receipt_data(receipt)
+
+        # Get user confirmation
+        if not args.auto_confirm:
+            confirm = input("\n✅ Save this data to Google Sheets? (y/N): ").lower().strip()
+            if confirm not in ['y', 'yes']:
+                print("❌ Skipped")
+                continue
+        to_save.append(receipt)
+
+    if not to_save:
+        print("❌ Operation cancelled")
+        sys.exit(0)
+
+    # Save every confirmed receipt to Google Sheets in one append
+    if save_receipts_to_sheets(to_save, args.sheet):
         print("🎉 Receipt processing completed successfully!")
     else:
         sys.exit(1)
 
+    # Some images failed to extract
+    if not all(extracted):
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file